@@ -0,0 +1,176 @@
+"""
+Persistent result cache for resume analysis.
+
+Results are stored in a small SQLite database keyed by a content hash of
+everything that influences the LLM output: the extracted resume text, the
+normalized job description, the prompt template versions and the model name.
+Entries expire after a TTL and the least recently used rows are evicted once
+the cache grows past its size limit.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_CACHE_PATH = os.getenv("ANALYSIS_CACHE_PATH", "analysis_cache.db")
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "500"))
+ANALYSIS_CACHE_TTL_HOURS = float(os.getenv("ANALYSIS_CACHE_TTL_HOURS", "72"))
+ANALYSIS_CACHE_DISABLED = os.getenv("ANALYSIS_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+
+def normalize_job_description(text: str) -> str:
+    """Collapse whitespace so copy/paste differences don't change the cache key."""
+    return re.sub(r'\s+', ' ', text or "").strip()
+
+
+def make_cache_key(resume_text: str, job_description: str, model: str, prompt_versions: Iterable[str]) -> str:
+    """
+    Build a content-addressed key for an analysis request.
+
+    Args:
+        resume_text: Text extracted from the resume
+        job_description: Raw job description (normalized before hashing)
+        model: Name of the LLM model producing the result
+        prompt_versions: Versions of every prompt template involved
+
+    Returns:
+        Hex SHA-256 digest identifying the request
+    """
+    digest = hashlib.sha256()
+    for part in (resume_text or "", normalize_job_description(job_description), model, *prompt_versions):
+        digest.update(part.encode("utf-8"))
+        # Separator so ("ab", "c") and ("a", "bc") hash differently
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """SQLite-backed JSON cache with TTL and LRU size eviction."""
+
+    def __init__(
+        self,
+        namespace: str,
+        path: str = ANALYSIS_CACHE_PATH,
+        max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = ANALYSIS_CACHE_TTL_HOURS * 3600,
+        enabled: bool = not ANALYSIS_CACHE_DISABLED,
+    ):
+        self.namespace = namespace
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS result_cache ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for key, or None on a miss or expired entry."""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT value, created_at FROM result_cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+                if row and now - row[1] <= self.ttl_seconds:
+                    conn.execute(
+                        "UPDATE result_cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                        (now, self.namespace, key)
+                    )
+                    conn.commit()
+                    with self._lock:
+                        self.hits += 1
+                    return json.loads(row[0])
+            finally:
+                conn.close()
+        except (sqlite3.Error, json.JSONDecodeError) as e:
+            logger.error(f"Cache read failed ({self.namespace}): {e}")
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store value under key, then apply TTL and size eviction."""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO result_cache (namespace, key, value, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(value), now, now)
+                )
+                removed = conn.execute(
+                    "DELETE FROM result_cache WHERE namespace = ? AND created_at < ?",
+                    (self.namespace, now - self.ttl_seconds)
+                ).rowcount
+                removed += conn.execute(
+                    "DELETE FROM result_cache WHERE namespace = ? AND key NOT IN ("
+                    " SELECT key FROM result_cache WHERE namespace = ?"
+                    " ORDER BY accessed_at DESC LIMIT ?)",
+                    (self.namespace, self.namespace, self.max_entries)
+                ).rowcount
+                conn.commit()
+            finally:
+                conn.close()
+            if removed:
+                with self._lock:
+                    self.evictions += removed
+        except sqlite3.Error as e:
+            logger.error(f"Cache write failed ({self.namespace}): {e}")
+
+    def clear(self):
+        """Remove every entry in this namespace."""
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM result_cache WHERE namespace = ?", (self.namespace,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
@@ -0,0 +1,206 @@
+"""
+Local ATS keyword-coverage scoring.
+
+Scores a resume against a job description without an LLM call. The JD is
+tokenized into keyword clusters (stemmed unigrams plus repeated bigrams),
+each weighted by how often the JD uses it. The resume is scored by how well
+it covers those clusters, using BM25-style term-frequency saturation and
+length normalization. The projected score applies the proposed edits'
+new_content to the resume text and scores the result the same way, so
+scores are deterministic and reproducible for the same inputs.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+# Bump when tokenization or weighting changes so cached scores are not reused
+SCORER_VERSION = "1"
+
+# BM25 parameters: K1 controls term-frequency saturation, B the length normalization
+K1 = 1.2
+B = 0.75
+AVG_RESUME_TOKENS = 600
+MAX_CLUSTERS = 40
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./-][a-z0-9+#]+)*")
+
+STOPWORDS = frozenset("""
+a about above across after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each either etc few for from further
+had has have having he her here hers him his how i if in into is it its itself just may me might more
+most must my no nor not of off on once only or other our ours out over own per same shall she should so
+some such than that the their them then there these they this those through to too under until up upon
+us very via was we were what when where which while who whom why will with within without would you
+your yours
+ability able additional apply applicant applicants candidate candidates company day days demonstrated
+desired equal excellent employer environment experience experiences familiarity good great highly ideal
+including job join looking new nice opportunity plus position preferred proven provide related required
+requirement requirements responsibilities responsible role seeking skill skills strong team teams understanding
+using well work working year years
+""".split())
+
+
+class KeywordCluster(NamedTuple):
+    # Stemmed unigram, or two stems joined by a space for a bigram
+    key: str
+    # Surface forms seen in the JD, for reporting
+    terms: Tuple[str, ...]
+    weight: float
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, keeping tech terms like c++, c#, node.js and ci/cd intact."""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        token = token.rstrip(".")
+        if token and not token.isdigit():
+            tokens.append(token)
+    return tokens
+
+
+def stem(token: str) -> str:
+    """Light suffix stripping so plural and verb forms land in the same cluster."""
+    if not token.isalpha() or len(token) <= 4:
+        return token
+    for suffix, replacement in (("ies", "y"), ("ing", ""), ("ed", ""), ("es", ""), ("s", "")):
+        if token.endswith(suffix) and not token.endswith("ss") and len(token) - len(suffix) >= 3:
+            return token[: len(token) - len(suffix)] + replacement
+    return token
+
+
+def _terms(text: str) -> Tuple[Counter, Counter, Dict[str, set], int]:
+    """Count stemmed unigrams and adjacent content bigrams."""
+    tokens = tokenize(text)
+    unigrams: Counter = Counter()
+    bigrams: Counter = Counter()
+    surfaces: Dict[str, set] = {}
+    previous = None
+    for token in tokens:
+        if token in STOPWORDS or len(token) < 2:
+            previous = None
+            continue
+        key = stem(token)
+        unigrams[key] += 1
+        surfaces.setdefault(key, set()).add(token)
+        if previous is not None:
+            bigram = f"{previous[0]} {key}"
+            bigrams[bigram] += 1
+            surfaces.setdefault(bigram, set()).add(f"{previous[1]} {token}")
+        previous = (key, token)
+    return unigrams, bigrams, surfaces, len(tokens)
+
+
+def extract_keyword_clusters(job_description: str, max_clusters: int = MAX_CLUSTERS) -> List[KeywordCluster]:
+    """
+    Extract the weighted keyword clusters an ATS would match a resume against.
+
+    Args:
+        job_description: Job description text
+        max_clusters: Maximum number of clusters to keep
+
+    Returns:
+        Clusters ordered by descending weight
+    """
+    unigrams, bigrams, surfaces, _ = _terms(job_description)
+
+    clusters = []
+    for key, count in unigrams.items():
+        weight = 1 + math.log(count)
+        # Tech terms (c++, node.js, s3) are more specific than plain words
+        if not key.isalpha():
+            weight *= 1.25
+        clusters.append(KeywordCluster(key, tuple(sorted(surfaces[key])), weight))
+    for key, count in bigrams.items():
+        # A phrase the JD repeats is a skill name rather than incidental wording
+        if count >= 2:
+            clusters.append(KeywordCluster(key, tuple(sorted(surfaces[key])), 1.5 * (1 + math.log(count))))
+
+    clusters.sort(key=lambda cluster: (-cluster.weight, cluster.key))
+    return clusters[:max_clusters]
+
+
+def score_text(resume_text: str, clusters: List[KeywordCluster]) -> Tuple[int, List[KeywordCluster]]:
+    """
+    Score resume text against keyword clusters.
+
+    Each cluster earns a BM25-saturated credit in [0, 1] for its frequency in
+    the resume; the score is the weighted mean credit on a 0-100 scale.
+
+    Returns:
+        Tuple of (score, clusters missing from the resume)
+    """
+    if not clusters:
+        return 0, []
+
+    unigrams, bigrams, _, length = _terms(resume_text)
+    norm = 1 - B + B * (length / AVG_RESUME_TOKENS)
+
+    total = 0.0
+    earned = 0.0
+    missing = []
+    for cluster in clusters:
+        tf = (bigrams if " " in cluster.key else unigrams).get(cluster.key, 0)
+        total += cluster.weight
+        if tf:
+            earned += cluster.weight * min(1.0, tf * (K1 + 1) / (tf + K1 * norm))
+        else:
+            missing.append(cluster)
+    return round(100 * earned / total), missing
+
+
+def apply_edits_to_text(resume_text: str, sections: Iterable[Dict]) -> str:
+    """
+    Apply the proposed edits to plain resume text.
+
+    A "replace" edit swaps its target_text for new_content and an "append"
+    edit adds new_content after its target. Edits whose target cannot be
+    located are appended so their content still counts. Edits with any
+    other action, or none, are skipped: /generate does not apply them, so
+    they must not raise the projected score.
+    """
+    text = re.sub(r'\s+', ' ', resume_text)
+    appended = []
+    for section in sections:
+        for edit in section.get("edits", []):
+            action = edit.get("action")
+            if action not in ("replace", "append"):
+                continue
+            target = re.sub(r'\s+', ' ', edit.get("target_text", "")).strip()
+            new_content = edit.get("new_content", "")
+            if target and target in text:
+                replacement = new_content if action == "replace" else f"{target} {new_content}"
+                text = text.replace(target, replacement, 1)
+            elif new_content:
+                appended.append(new_content)
+    return " ".join([text] + appended)
+
+
+def score_analysis(resume_text: str, job_description: str, result: Dict) -> Dict:
+    """
+    Compute initial and projected scores for an analysis result.
+
+    Args:
+        resume_text: Original resume text
+        job_description: Job description text
+        result: Analysis result whose sections carry the proposed edits
+
+    Returns:
+        Dict with initial_score, projected_score and reasoning
+    """
+    clusters = extract_keyword_clusters(job_description)
+    initial_score, initial_missing = score_text(resume_text, clusters)
+    projected_text = apply_edits_to_text(resume_text, result.get("sections", []))
+    projected_score, projected_missing = score_text(projected_text, clusters)
+
+    covered = len(clusters) - len(initial_missing)
+    reasoning = f"Resume covers {covered} of {len(clusters)} job description keyword clusters"
+    if projected_missing:
+        reasoning += "; still missing after edits: " + ", ".join(c.terms[0] for c in projected_missing[:8])
+    return {
+        "initial_score": initial_score,
+        "projected_score": projected_score,
+        "reasoning": reasoning,
+    }
+
@@ -0,0 +1,250 @@
+"""
+Content-addressed cache of PDF conversions.
+
+Users upload the same resume PDF for every job they tailor against, and
+each upload used to pay for pdf_to_docx and sanitize_docx_layout again.
+Conversions are cached under the SHA-256 of the uploaded bytes: the
+sanitized DOCX as a file in CONVERSION_CACHE_DIR, and the PDF's text (see
+pdf_handler.extract_text_from_pdf) in a small SQLite index next to it.
+
+A hit copies the cached DOCX to the session's own path. Sessions never
+share a file, so the cleanup of one session's temp files cannot affect
+another's. shutil.copyfile copies in the kernel on Linux, and the parsed
+document is still shared through doc_cache, which is keyed by content. The
+least recently used entries are evicted once the files and texts together
+pass CONVERSION_CACHE_MAX_MB.
+
+Cache failures are logged and treated as misses; they never fail a conversion.
+"""
+
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CONVERSION_CACHE_DIR = os.getenv("CONVERSION_CACHE_DIR", "conversion_cache")
+CONVERSION_CACHE_MAX_MB = float(os.getenv("CONVERSION_CACHE_MAX_MB", "512"))
+CONVERSION_CACHE_DISABLED = os.getenv("CONVERSION_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+
+class ConversionCache:
+    """Disk-budgeted LRU of converted DOCX files and PDF texts keyed by upload hash."""
+
+    def __init__(
+        self,
+        directory: str = CONVERSION_CACHE_DIR,
+        max_mb: float = CONVERSION_CACHE_MAX_MB,
+        enabled: bool = not CONVERSION_CACHE_DISABLED,
+    ):
+        self.directory = directory
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.enabled = enabled
+        self.docx_hits = 0
+        self.docx_misses = 0
+        self.text_hits = 0
+        self.text_misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            os.makedirs(self.directory, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(self.directory, "index.db"), timeout=5)
+        if not self._initialized:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS conversions ("
+                " digest TEXT PRIMARY KEY,"
+                " docx_bytes INTEGER,"
+                " pdf_text TEXT,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _docx_path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.docx")
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def fetch_docx(self, digest: str, dest: str) -> bool:
+        """
+        Copy the cached DOCX for an upload to dest.
+
+        Returns:
+            True on a hit, False when the upload has not been converted yet
+        """
+        if not self.enabled:
+            return False
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT docx_bytes FROM conversions WHERE digest = ?", (digest,)
+                ).fetchone()
+                if row and row[0] is not None:
+                    shutil.copyfile(self._docx_path(digest), dest)
+                    conn.execute("UPDATE conversions SET accessed_at = ? WHERE digest = ?", (time.time(), digest))
+                    conn.commit()
+                    self._count("docx_hits")
+                    return True
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            # e.g. the file was evicted between the lookup and the copy
+            logger.error(f"Conversion cache read failed: {e}")
+        self._count("docx_misses")
+        return False
+
+    def has_docx(self, digest: str) -> bool:
+        """Whether a converted DOCX is cached for an upload, without counting a lookup."""
+        if not self.enabled:
+            return False
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT docx_bytes FROM conversions WHERE digest = ?", (digest,)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Conversion cache read failed: {e}")
+            return False
+        return bool(row and row[0] is not None)
+
+    def store_docx(self, digest: str, docx_path: str):
+        """Keep a copy of a freshly converted and sanitized DOCX for later uploads of the same PDF."""
+        if not self.enabled:
+            return
+        try:
+            conn = self._connect()
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".docx.tmp")
+                os.close(fd)
+                try:
+                    shutil.copyfile(docx_path, tmp_path)
+                    os.replace(tmp_path, self._docx_path(digest))
+                except BaseException:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+                now = time.time()
+                conn.execute(
+                    "INSERT INTO conversions (digest, docx_bytes, created_at, accessed_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(digest) DO UPDATE SET docx_bytes = excluded.docx_bytes, accessed_at = excluded.accessed_at",
+                    (digest, os.path.getsize(docx_path), now, now)
+                )
+                conn.commit()
+                self._evict(conn)
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Conversion cache write failed: {e}")
+
+    def pdf_text(self, digest: str) -> Optional[str]:
+        """The cached PDF text for an upload, or None."""
+        if not self.enabled:
+            return None
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT pdf_text FROM conversions WHERE digest = ?", (digest,)).fetchone()
+                if row and row[0] is not None:
+                    conn.execute("UPDATE conversions SET accessed_at = ? WHERE digest = ?", (time.time(), digest))
+                    conn.commit()
+                    self._count("text_hits")
+                    return row[0]
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Conversion cache read failed: {e}")
+        self._count("text_misses")
+        return None
+
+    def store_pdf_text(self, digest: str, text: str):
+        if not self.enabled:
+            return
+        try:
+            conn = self._connect()
+            try:
+                now = time.time()
+                conn.execute(
+                    "INSERT INTO conversions (digest, pdf_text, created_at, accessed_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(digest) DO UPDATE SET pdf_text = excluded.pdf_text, accessed_at = excluded.accessed_at",
+                    (digest, text, now, now)
+                )
+                conn.commit()
+                self._evict(conn)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Conversion cache write failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until files and texts fit the disk budget."""
+        rows = conn.execute(
+            "SELECT digest, COALESCE(docx_bytes, 0) + COALESCE(LENGTH(CAST(pdf_text AS BLOB)), 0) "
+            "FROM conversions ORDER BY accessed_at DESC"
+        ).fetchall()
+        total = 0
+        evicted = []
+        for i, (digest, size) in enumerate(rows):
+            total += size
+            # The most recently used entry stays even if it alone is over budget
+            if i and total > self.max_bytes:
+                evicted.append(digest)
+        if not evicted:
+            return
+        conn.executemany("DELETE FROM conversions WHERE digest = ?", [(digest,) for digest in evicted])
+        conn.commit()
+        for digest in evicted:
+            try:
+                os.remove(self._docx_path(digest))
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self.evictions += len(evicted)
+        logger.info(f"Evicted {len(evicted)} cached conversions")
+
+    def stats(self) -> Dict:
+        entries, stored_bytes = 0, 0
+        if self.enabled:
+            try:
+                conn = self._connect()
+                try:
+                    entries, stored_bytes = conn.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(COALESCE(docx_bytes, 0) + "
+                        "COALESCE(LENGTH(CAST(pdf_text AS BLOB)), 0)), 0) FROM conversions"
+                    ).fetchone()
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                logger.error(f"Conversion cache stats failed: {e}")
+        with self._lock:
+            docx_lookups = self.docx_hits + self.docx_misses
+            text_lookups = self.text_hits + self.text_misses
+            return {
+                "enabled": self.enabled,
+                "entries": entries,
+                "bytes": stored_bytes,
+                "max_bytes": self.max_bytes,
+                "docx_hits": self.docx_hits,
+                "docx_misses": self.docx_misses,
+                "docx_hit_rate": round(self.docx_hits / docx_lookups, 3) if docx_lookups else 0.0,
+                "text_hits": self.text_hits,
+                "text_misses": self.text_misses,
+                "text_hit_rate": round(self.text_hits / text_lookups, 3) if text_lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+conversions = ConversionCache()
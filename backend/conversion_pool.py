@@ -0,0 +1,432 @@
+"""
+Process pool for PDF to DOCX conversion.
+
+pdf2docx is CPU-bound Python: run in the API's threadpool, one multi-page
+conversion holds the GIL for seconds and slows every other request served
+by the process. Conversions run here instead, in CONVERSION_WORKERS
+separate worker processes:
+
+- A document of CONVERSION_PARALLEL_MIN_PAGES pages or more is split into
+  contiguous page ranges parsed on several workers at once, and one more job
+  builds the DOCX from the parsed pages. This is the store/restore hand-off
+  pdf2docx's own multi_processing mode uses, on long-lived workers.
+- Every conversion has a deadline (CONVERSION_TIMEOUT_SECONDS) and can be
+  cancelled. Either way the workers running it are killed and replaced.
+- Workers are recycled after CONVERSION_MAX_JOBS_PER_WORKER jobs, or once
+  their resident memory passes CONVERSION_MAX_WORKER_RSS_MB, since
+  pdf2docx and PyMuPDF memory grows over many documents.
+- At most CONVERSION_WORKERS + CONVERSION_MAX_QUEUE conversions are admitted
+  at once; beyond that convert() raises ExecutorSaturatedError (answered
+  with 503 and Retry-After).
+
+CONVERSION_WORKERS=0 converts in the calling thread, as before.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from executors import Admission
+
+logger = logging.getLogger(__name__)
+
+CONVERSION_WORKERS = int(os.getenv("CONVERSION_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+CONVERSION_TIMEOUT_SECONDS = float(os.getenv("CONVERSION_TIMEOUT_SECONDS", "120"))
+CONVERSION_MAX_JOBS_PER_WORKER = int(os.getenv("CONVERSION_MAX_JOBS_PER_WORKER", "50"))
+CONVERSION_MAX_WORKER_RSS_MB = float(os.getenv("CONVERSION_MAX_WORKER_RSS_MB", "1024"))
+CONVERSION_PARALLEL_MIN_PAGES = int(os.getenv("CONVERSION_PARALLEL_MIN_PAGES", "4"))
+CONVERSION_MAX_QUEUE = int(os.getenv("CONVERSION_MAX_QUEUE", "16"))
+
+# How often a waiting caller checks its deadline and cancellation
+_POLL_SECONDS = 0.05
+
+
+class ConversionError(Exception):
+    """Raised when a conversion job fails or its worker dies."""
+
+
+class ConversionTimeoutError(ConversionError):
+    """Raised when a conversion does not finish before its deadline."""
+
+
+class ConversionCancelledError(ConversionError):
+    """Raised when a conversion is cancelled while queued or running."""
+
+
+def _rss_bytes() -> int:
+    """Resident memory of the current process, or 0 where it cannot be read."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _worker_main(conn):
+    """Worker loop: run (fn, args) jobs until told to stop or the pipe closes."""
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        fn, args = job
+        try:
+            conn.send(("ok", fn(*args), _rss_bytes()))
+        except Exception as e:
+            # Exceptions from pdf2docx are not always picklable; their message is enough
+            conn.send(("error", f"{type(e).__name__}: {e}", _rss_bytes()))
+
+
+def _convert(pdf_path: str, docx_path: str, start: int = 0, end: int = None):
+    from pdf2docx import Converter
+
+    cv = Converter(pdf_path)
+    try:
+        cv.convert(docx_path, start=start, end=end)
+    finally:
+        cv.close()
+
+
+def _parse_pages(pdf_path: str, pages: List[int]) -> Dict:
+    """Parse a range of pages and return them in pdf2docx's stored form."""
+    from pdf2docx import Converter
+
+    cv = Converter(pdf_path)
+    try:
+        settings = cv.default_settings
+        cv.load_pages(pages=pages).parse_document(**settings).parse_pages(**settings)
+        return cv.store()
+    finally:
+        cv.close()
+
+
+def _make_docx(pdf_path: str, parsed: List[Dict], docx_path: str):
+    """Build the DOCX from page ranges parsed by _parse_pages."""
+    from pdf2docx import Converter
+
+    cv = Converter(pdf_path)
+    try:
+        settings = cv.default_settings
+        for data in parsed:
+            cv.restore(data)
+        cv.make_docx(docx_path, **settings)
+    finally:
+        cv.close()
+
+
+def _page_count(pdf_path: str) -> int:
+    import pymupdf
+
+    with pymupdf.open(pdf_path) as pdf:
+        return len(pdf)
+
+
+def split_pages(page_count: int, parts: int) -> List[List[int]]:
+    """Split page indexes into at most `parts` contiguous, near-equal ranges."""
+    parts = max(1, min(parts, page_count))
+    size, extra = divmod(page_count, parts)
+    ranges, start = [], 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+class _Worker:
+    """One worker process and the parent's end of its pipe."""
+
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), name="conversion-worker", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+        self.rss = 0
+
+    def stop(self):
+        # Only ever called on idle workers or ones being abandoned mid-job
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class ConversionPool:
+    """Bounded pool of conversion worker processes with deadlines, cancellation and recycling."""
+
+    def __init__(
+        self,
+        workers: int = CONVERSION_WORKERS,
+        timeout_seconds: float = CONVERSION_TIMEOUT_SECONDS,
+        max_jobs_per_worker: int = CONVERSION_MAX_JOBS_PER_WORKER,
+        max_worker_rss_mb: float = CONVERSION_MAX_WORKER_RSS_MB,
+        parallel_min_pages: int = CONVERSION_PARALLEL_MIN_PAGES,
+        max_queue: int = CONVERSION_MAX_QUEUE,
+    ):
+        self.size = workers
+        self.timeout_seconds = timeout_seconds
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_worker_rss_bytes = int(max_worker_rss_mb * 1024 * 1024)
+        self.parallel_min_pages = parallel_min_pages
+        self.max_queue = max_queue
+        # forkserver children start from a clean process rather than a fork of the threaded server
+        methods = multiprocessing.get_all_start_methods()
+        self._ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self._slots = threading.BoundedSemaphore(max(1, workers))
+        self._lock = threading.Lock()
+        self._idle: List[_Worker] = []
+        self._alive = 0
+        self._busy = 0
+        self._closed = False
+        self._admission = Admission(
+            "Conversion queue", self.size, max_queue,
+            "The server is busy converting other resumes. Please try again shortly.",
+        )
+        # Fans the page ranges of one conversion out to workers; its threads only wait on pipes
+        self._fanout = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="conversion-fanout")
+        # One thread per admitted conversion waits on it for convert_async
+        self._waiters = ThreadPoolExecutor(
+            max_workers=max(1, workers) + max(0, max_queue), thread_name_prefix="conversion-wait"
+        )
+        self.conversions = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.cancellations = 0
+        self.recycled = 0
+
+    def _checkout(self) -> _Worker:
+        with self._lock:
+            self._busy += 1
+            if self._idle:
+                return self._idle.pop()
+            self._alive += 1
+        try:
+            return _Worker(self._ctx)
+        except BaseException:
+            with self._lock:
+                self._alive -= 1
+                self._busy -= 1
+            raise
+
+    def _checkin(self, worker: _Worker):
+        recycle = worker.jobs >= self.max_jobs_per_worker or worker.rss > self.max_worker_rss_bytes
+        with self._lock:
+            self._busy -= 1
+            if not recycle and not self._closed:
+                self._idle.append(worker)
+                return
+            self._alive -= 1
+            if recycle:
+                self.recycled += 1
+        if recycle:
+            logger.info(f"Recycling conversion worker after {worker.jobs} jobs ({worker.rss // (1024 * 1024)} MB resident)")
+        worker.stop()
+
+    def _discard(self, worker: _Worker):
+        with self._lock:
+            self._busy -= 1
+            self._alive -= 1
+        worker.stop()
+
+    def retry_after(self) -> float:
+        """Seconds until the conversions ahead of a new one have likely finished."""
+        return self._admission.retry_after()
+
+    def check_admission(self):
+        """
+        Raise ExecutorSaturatedError if a new conversion would not be admitted.
+
+        Lets an endpoint refuse a request up front instead of accepting an
+        upload it cannot convert.
+        """
+        self._admission.check()
+
+    @staticmethod
+    def _check(deadline: Optional[float], cancel: Optional[threading.Event]):
+        if cancel is not None and cancel.is_set():
+            raise ConversionCancelledError("Conversion cancelled")
+        if deadline is not None and time.monotonic() > deadline:
+            raise ConversionTimeoutError("Conversion did not finish in time")
+
+    def run(self, fn: Callable, *args, deadline: float = None, cancel: threading.Event = None):
+        """
+        Run fn(*args) on a worker process and return its result, blocking the calling thread.
+
+        Args:
+            fn: Module-level function (it is pickled by reference)
+            deadline: time.monotonic() by which the job must finish
+            cancel: Set to abandon the job
+
+        Raises:
+            ConversionTimeoutError, ConversionCancelledError: The worker is killed
+            ConversionError: The job raised, or its worker died
+        """
+        if self.size <= 0:
+            return fn(*args)
+
+        while not self._slots.acquire(timeout=_POLL_SECONDS):
+            self._check(deadline, cancel)
+        try:
+            self._check(deadline, cancel)
+            worker = self._checkout()
+            try:
+                worker.conn.send((fn, args))
+                while not worker.conn.poll(_POLL_SECONDS):
+                    self._check(deadline, cancel)
+                status, value, worker.rss = worker.conn.recv()
+            except (EOFError, ConnectionError):
+                # The worker died mid-job (killed for memory, crashed in MuPDF...)
+                self._discard(worker)
+                raise ConversionError(f"Conversion worker exited with code {worker.process.exitcode}")
+            except BaseException:
+                # Timed out, cancelled or interrupted mid-job: the worker's state is unknown
+                self._discard(worker)
+                raise
+            worker.jobs += 1
+            self._checkin(worker)
+        finally:
+            self._slots.release()
+
+        if status == "error":
+            raise ConversionError(value)
+        return value
+
+    def convert(
+        self,
+        pdf_path: str,
+        docx_path: str,
+        timeout: float = None,
+        cancel: threading.Event = None,
+        start: int = 0,
+        end: int = None,
+    ):
+        """
+        Convert a PDF to DOCX on the pool, page ranges in parallel for longer documents.
+
+        Args:
+            pdf_path: Source PDF
+            docx_path: DOCX to write
+            timeout: Seconds for the whole conversion; defaults to timeout_seconds
+            cancel: Set to abandon the conversion. It is also set when one page
+                range fails, so the others stop too.
+            start, end: Convert only pages [start, end), on a single worker
+
+        Raises:
+            ExecutorSaturatedError: Too many conversions are already queued
+        """
+        self._admission.admit()
+        self._convert_admitted(pdf_path, docx_path, timeout, cancel, start, end)
+
+    def _convert_admitted(self, pdf_path: str, docx_path: str, timeout: float, cancel: threading.Event, start: int, end: int):
+        started = time.perf_counter()
+        elapsed = None
+        try:
+            self._convert(pdf_path, docx_path, timeout, cancel, start, end)
+            elapsed = time.perf_counter() - started
+        finally:
+            self._admission.release(elapsed)
+
+    def _convert(self, pdf_path: str, docx_path: str, timeout: float, cancel: threading.Event, start: int, end: int):
+        deadline = time.monotonic() + (timeout or self.timeout_seconds)
+        cancel = cancel or threading.Event()
+        started = time.perf_counter()
+        parts = 1
+        try:
+            whole = start == 0 and end is None
+            page_count = _page_count(pdf_path) if whole and self.size >= 2 else 0
+            if page_count < max(2, self.parallel_min_pages):
+                self.run(_convert, pdf_path, docx_path, start, end, deadline=deadline, cancel=cancel)
+            else:
+                ranges = split_pages(page_count, self.size)
+                parts = len(ranges)
+                futures = [
+                    self._fanout.submit(self.run, _parse_pages, pdf_path, pages, deadline=deadline, cancel=cancel)
+                    for pages in ranges
+                ]
+                try:
+                    parsed = [future.result() for future in futures]
+                except BaseException:
+                    cancel.set()
+                    raise
+                self.run(_make_docx, pdf_path, parsed, docx_path, deadline=deadline, cancel=cancel)
+        except ConversionTimeoutError:
+            self._count("timeouts")
+            raise
+        except ConversionCancelledError:
+            self._count("cancellations")
+            raise
+        except Exception:
+            self._count("failures")
+            raise
+        elapsed = time.perf_counter() - started
+        self._count("conversions")
+        logger.info(f"Converted {os.path.basename(pdf_path)} in {elapsed:.2f}s ({parts} page ranges)")
+
+    async def convert_async(self, pdf_path: str, docx_path: str, timeout: float = None, start: int = 0, end: int = None):
+        """
+        convert() without blocking the event loop; cancelling the awaiting task cancels the conversion.
+
+        The conversion is admitted before it is handed to a waiter thread, so
+        a saturated pool rejects it straight away.
+
+        Raises:
+            ExecutorSaturatedError: Too many conversions are already queued
+        """
+        self._admission.admit()
+        cancel = threading.Event()
+        try:
+            future = self._waiters.submit(self._convert_admitted, pdf_path, docx_path, timeout, cancel, start, end)
+        except BaseException:
+            self._admission.release()
+            raise
+        future.add_done_callback(self._release_if_cancelled)
+        try:
+            await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+
+    def _release_if_cancelled(self, future: Future):
+        # A conversion cancelled before its waiter thread picked it up never reaches the release
+        if future.cancelled():
+            self._admission.release()
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def shutdown(self):
+        """Stop idle workers; busy ones are stopped when their job returns."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._alive -= len(idle)
+        for worker in idle:
+            worker.stop()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.size,
+                "alive": self._alive,
+                "busy": self._busy,
+                "utilization": round(self._busy / self.size, 2) if self.size > 0 else 0.0,
+                "queued": max(0, self._admission.pending - self.size),
+                "max_queue": self.max_queue,
+                "conversions": self.conversions,
+                "failures": self.failures,
+                "timeouts": self.timeouts,
+                "cancellations": self.cancellations,
+                "recycled": self.recycled,
+                "rejected": self._admission.rejected,
+            }
+
+
+pool = ConversionPool()
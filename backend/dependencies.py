@@ -116,3 +116,8 @@ async def get_optional_user(
         return result.first()
     except Exception:
         return None
+
+
+def client_scope(request: Request, user: Optional[User]) -> str:
+    """Who a request acts for: the account when logged in, otherwise the client address."""
+    return f"user:{user.id}" if user else f"ip:{request.client.host}"
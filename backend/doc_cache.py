@@ -0,0 +1,178 @@
+"""
+In-process cache of parsed DOCX packages and their extracted text.
+
+One upload is opened by sanitize_docx_layout, extract_text_from_docx,
+anchor_edits and the edit session in turn. The cache keeps the parsed story
+parts and the ExtractedText of each document so later steps skip the parse.
+
+Entries are keyed by the SHA-256 of the file contents. The hash of a path is
+remembered against its (size, mtime) so unchanged files are not re-read, and
+a file that changes on disk simply hashes to a different entry. The
+least recently used entries are evicted once the estimated size of the parsed
+trees passes DOC_CACHE_MAX_MB.
+
+Cached packages are shared and must not be modified: callers that edit a
+document take a private copy with checkout().
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from docx_extract import ExtractedText, extract_document
+from docx_package import DocxPackage
+
+logger = logging.getLogger(__name__)
+
+DOC_CACHE_MAX_MB = float(os.getenv("DOC_CACHE_MAX_MB", "256"))
+DOC_CACHE_DISABLED = os.getenv("DOC_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+# lxml trees take roughly ten times the size of the XML they were parsed from
+_TREE_BYTES_PER_XML_BYTE = 10
+_HASH_CHUNK_BYTES = 1 << 20
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _Entry(NamedTuple):
+    package: DocxPackage
+    extracted: ExtractedText
+    size: int
+    # (size, mtime) of the source file when the entry was made
+    stamp: Tuple[int, int]
+
+
+class ParsedDocumentCache:
+    """LRU of parsed DocxPackages and ExtractedTexts keyed by content hash, bounded by estimated memory."""
+
+    def __init__(self, max_mb: float = DOC_CACHE_MAX_MB, enabled: bool = not DOC_CACHE_DISABLED):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Absolute path -> (stamp, content hash)
+        self._hashes: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _content_hash(self, path: str) -> Tuple[str, Tuple[int, int]]:
+        stamp = _stamp(path)
+        key = os.path.abspath(path)
+        with self._lock:
+            known = self._hashes.get(key)
+        if known is not None and known[0] == stamp:
+            return known[1], stamp
+        digest = file_sha256(path)
+        with self._lock:
+            self._hashes[key] = (stamp, digest)
+        return digest, stamp
+
+    def _lookup(self, path: str) -> Tuple[str, Optional[_Entry]]:
+        digest, _ = self._content_hash(path)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                source = entry.package.source
+                # The entry reads unchanged parts from its source file, which must still hold this content
+                if os.path.exists(source) and _stamp(source) == entry.stamp:
+                    self._entries.move_to_end(digest)
+                    self.hits += 1
+                    return digest, entry
+                self._drop(digest)
+            self.misses += 1
+        return digest, None
+
+    def _load(self, path: str) -> _Entry:
+        """The cached entry for path, parsing the file on a miss."""
+        if not self.enabled:
+            package = DocxPackage(path)
+            return _Entry(package, extract_document(package), 0, _stamp(path))
+        digest, entry = self._lookup(path)
+        if entry is None:
+            # Parse outside the lock; a concurrent miss on the same file just parses twice
+            package = DocxPackage(path)
+            entry = self._store(digest, package, _stamp(path))
+        return entry
+
+    def _store(self, digest: str, package: DocxPackage, stamp: Tuple[int, int]) -> _Entry:
+        # Extraction parses every story part, so the size estimate covers the whole tree
+        extracted = extract_document(package)
+        size = package.parsed_xml_bytes() * _TREE_BYTES_PER_XML_BYTE + len(extracted.text) * 2
+        entry = _Entry(package, extracted, size, stamp)
+        with self._lock:
+            previous = self._entries.pop(digest, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[digest] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                logger.debug(f"Evicting parsed document {oldest[:12]} ({self._bytes} bytes cached)")
+                self._drop(oldest)
+                self.evictions += 1
+        return entry
+
+    def _drop(self, digest: str):
+        entry = self._entries.pop(digest, None)
+        if entry is not None:
+            self._bytes -= entry.size
+            for path in [p for p, (_, known) in self._hashes.items() if known == digest]:
+                del self._hashes[path]
+
+    def extract(self, path: str) -> ExtractedText:
+        """Extracted text and offset map of the DOCX at path (see docx_extract.extract_document)."""
+        return self._load(path).extracted
+
+    def checkout(self, path: str) -> DocxPackage:
+        """
+        A private, modifiable copy of the parsed DOCX at path.
+
+        The cached package may have been parsed from another file with the
+        same content, which its owner can delete at any time; the copy reads
+        its unchanged parts from path instead.
+        """
+        return self._load(path).package.clone(source=path)
+
+    def put(self, path: str, package: DocxPackage):
+        """
+        Cache a package that was just written to path, so the next reader of
+        that file does not parse it again. The package must not be modified
+        afterwards.
+        """
+        if not self.enabled:
+            return
+        digest, stamp = self._content_hash(path)
+        self._store(digest, package, stamp)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+def _stamp(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+documents = ParsedDocumentCache()
@@ -0,0 +1,193 @@
+"""
+Single-pass text extraction from DOCX story parts.
+
+Each story part (headers, the body, footers) is walked once in document
+order. Paragraphs become lines; a table cell becomes one line made of its
+paragraphs joined by spaces, with vertically merged continuation cells
+skipped; nested tables and text boxes (w:txbxContent) are picked up where
+they occur, and mc:Fallback copies are ignored.
+
+Alongside the text, an offset map records which paragraph every piece of
+text came from, as (part, paragraph index) in the same numbering
+edit_engine.iter_paragraphs uses, so edits can be resolved against the
+extraction without walking the document again.
+"""
+
+import bisect
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from docx.oxml.ns import qn
+
+from docx_package import MC_FALLBACK, DocxPackage
+
+W_P = qn('w:p')
+W_TBL = qn('w:tbl')
+W_TBL_PR = qn('w:tblPr')
+W_TBL_GRID = qn('w:tblGrid')
+W_TR = qn('w:tr')
+W_TR_PR = qn('w:trPr')
+W_TC = qn('w:tc')
+W_TC_PR = qn('w:tcPr')
+W_V_MERGE = qn('w:vMerge')
+W_VAL = qn('w:val')
+W_R = qn('w:r')
+W_HYPERLINK = qn('w:hyperlink')
+# Run children with a text equivalent, as python-docx's CT_R.text reads them
+_RUN_TEXT_TAGS = frozenset(qn(tag) for tag in ('w:br', 'w:cr', 'w:noBreakHyphen', 'w:ptab', 'w:t', 'w:tab'))
+
+
+class TextSpan(NamedTuple):
+    # Character range in ExtractedText.text
+    start: int
+    end: int
+    # Part name and paragraph index, as edit_engine.iter_paragraphs reports them
+    part: str
+    paragraph: int
+
+
+class ExtractedText(NamedTuple):
+    text: str
+    # One span per extracted paragraph, in text order
+    spans: List[TextSpan]
+
+    def paragraph_texts(self) -> Iterator[Tuple[Tuple[str, int], str]]:
+        """((part, paragraph index), paragraph text) for every non-empty paragraph."""
+        for span in self.spans:
+            yield (span.part, span.paragraph), self.text[span.start:span.end]
+
+    def locate(self, offset: int) -> Optional[TextSpan]:
+        """The span containing a character offset of the text, if any."""
+        i = bisect.bisect_right(self.spans, offset, key=lambda span: span.start) - 1
+        if i >= 0 and offset < self.spans[i].end:
+            return self.spans[i]
+        return None
+
+
+def paragraph_text(p) -> str:
+    """
+    Same text python-docx's Paragraph.text gives, read with plain child
+    iteration instead of one XPath query per run.
+    """
+    pieces = []
+    for child in p:
+        if child.tag == W_R:
+            runs = (child,)
+        elif child.tag == W_HYPERLINK:
+            runs = child.iterchildren(W_R)
+        else:
+            continue
+        for run in runs:
+            for item in run:
+                if item.tag in _RUN_TEXT_TAGS:
+                    # python-docx's element classes render tabs, breaks and hyphens as text
+                    pieces.append(str(item))
+    return "".join(pieces)
+
+
+# A line is a list of (paragraph text, paragraph index) segments
+_Line = List[Tuple[str, int]]
+
+
+class _PartWalker:
+    """Walks one part, numbering paragraphs in document order and collecting lines."""
+
+    def __init__(self, part: str):
+        self.part = part
+        self.next_index = 0
+
+    def walk(self, element, lines: List[_Line]):
+        for child in element:
+            tag = child.tag
+            if tag == W_P:
+                self.paragraph(child, lines)
+            elif tag == W_TBL:
+                self.table(child, lines)
+            elif tag != MC_FALLBACK:
+                # Runs, drawings, content controls, mc:Choice... may hold text boxes
+                self.walk(child, lines)
+
+    def paragraph(self, p, lines: List[_Line]):
+        index = self.next_index
+        self.next_index += 1
+        text = paragraph_text(p)
+        if text.strip():
+            lines.append([(text, index)])
+        # Text boxes anchored in this paragraph come after it
+        self.walk(p, lines)
+
+    def table(self, tbl, lines: List[_Line]):
+        for child in tbl:
+            if child.tag == W_TR:
+                self.row(child, lines)
+            elif child.tag not in (W_TBL_PR, W_TBL_GRID):
+                # Content controls wrapping rows
+                self.table(child, lines)
+
+    def row(self, tr, lines: List[_Line]):
+        for child in tr:
+            if child.tag == W_TC:
+                self.cell(child, lines)
+            elif child.tag != W_TR_PR:
+                # Content controls wrapping cells
+                self.row(child, lines)
+
+    def cell(self, tc, lines: List[_Line]):
+        segments: _Line = []
+        nested: List[_Line] = []
+        for child in tc:
+            if child.tag == W_P:
+                index = self.next_index
+                self.next_index += 1
+                text = paragraph_text(child)
+                if text.strip():
+                    segments.append((text, index))
+                self.walk(child, nested)
+            elif child.tag == W_TBL:
+                self.table(child, nested)
+            elif child.tag != W_TC_PR:
+                self.walk(child, nested)
+        # A vertically merged continuation cell repeats the cell above it
+        if segments and not _continues_merge(tc):
+            lines.append(segments)
+        lines.extend(nested)
+
+
+def _continues_merge(tc) -> bool:
+    tc_pr = tc.find(W_TC_PR)
+    v_merge = tc_pr.find(W_V_MERGE) if tc_pr is not None else None
+    return v_merge is not None and v_merge.get(W_VAL, "continue") == "continue"
+
+
+def extract_document(source: Union[str, DocxPackage]) -> ExtractedText:
+    """
+    Extract resume text and its offset map.
+
+    Args:
+        source: DOCX path or an open DocxPackage
+
+    Returns:
+        ExtractedText with lines joined by newlines
+    """
+    package = source if isinstance(source, DocxPackage) else DocxPackage(source)
+    names = (package.story_part_names("header") + package.story_part_names("document")
+             + package.story_part_names("footer"))
+
+    pieces: List[str] = []
+    spans: List[TextSpan] = []
+    offset = 0
+    for name in names:
+        part = "/" + name
+        lines: List[_Line] = []
+        _PartWalker(part).walk(package.xml_part(name), lines)
+        for line in lines:
+            if pieces:
+                pieces.append("\n")
+                offset += 1
+            for i, (text, index) in enumerate(line):
+                if i:
+                    pieces.append(" ")
+                    offset += 1
+                pieces.append(text)
+                spans.append(TextSpan(offset, offset + len(text), part, index))
+                offset += len(text)
+    return ExtractedText("".join(pieces), spans)
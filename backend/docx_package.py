@@ -0,0 +1,197 @@
+"""
+Zip-level access to DOCX packages.
+
+python-docx loads every part of a package (fonts, images, styles, theme)
+and re-serializes all of them on save. Edits and layout cleanup only touch
+the story parts: the main document, headers and footers. DocxPackage parses
+just the XML parts it is asked for, with python-docx's element classes so
+the usual Paragraph/Run API still works on them, and writes a new package
+by copying every other zip entry through byte for byte, still compressed.
+Only the parts that were actually changed are re-serialized.
+"""
+
+import copy
+import io
+import os
+import struct
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, List, Tuple, Union
+
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml.parser import parse_xml
+
+DOCUMENT_PART = "word/document.xml"
+DOCUMENT_RELS = "word/_rels/document.xml.rels"
+_RELS_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+# Alternate content Word does not render when it understands the mc:Choice branch
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+# Local file header: fixed 30 bytes, then the file name and extra field
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_USES_DATA_DESCRIPTOR = 0x08
+_COPY_CHUNK_BYTES = 1 << 20
+
+_STORY_RELATIONSHIPS = {RT.HEADER: "header", RT.FOOTER: "footer"}
+
+
+class DocxPackage:
+    """A DOCX zip whose XML parts are parsed on demand and written back only when changed."""
+
+    def __init__(self, source: Union[str, bytes]):
+        """
+        Args:
+            source: Path of the DOCX, or its bytes. A path is reopened for each
+                read and write rather than held open or loaded into memory.
+        """
+        self._source = bytes(source) if isinstance(source, (bytes, bytearray)) else source
+        self._parts: Dict[str, object] = {}
+        self._changed = set()
+        with self._open() as (_, zf):
+            self._names = zf.namelist()
+            self._sizes = {info.filename: info.file_size for info in zf.infolist()}
+            self._story_kinds = self._find_story_parts(zf)
+
+    @contextmanager
+    def _open(self):
+        """Yield (raw file, ZipFile) over the source."""
+        raw = io.BytesIO(self._source) if isinstance(self._source, bytes) else open(self._source, "rb")
+        try:
+            with zipfile.ZipFile(raw) as zf:
+                yield raw, zf
+        finally:
+            raw.close()
+
+    @property
+    def source(self) -> Union[str, bytes]:
+        return self._source
+
+    def names(self) -> List[str]:
+        return list(self._names)
+
+    def xml_part(self, name: str):
+        """Root element of an XML part, parsed once and shared by later calls."""
+        if name not in self._parts:
+            with self._open() as (_, zf):
+                self._parts[name] = parse_xml(zf.read(name))
+        return self._parts[name]
+
+    def mark_changed(self, name: str):
+        self._changed.add(name)
+
+    def parsed_xml_bytes(self) -> int:
+        """Uncompressed size of the XML parts parsed so far, a proxy for the memory their trees use."""
+        return sum(self._sizes[name] for name in self._parts)
+
+    def clone(self, source: Union[str, bytes] = None) -> "DocxPackage":
+        """
+        An independent copy with the parts parsed so far deep-copied (much
+        cheaper than parsing them again) and no pending changes.
+
+        Args:
+            source: Read unchanged parts from here instead of this package's
+                source; it must hold the same content
+        """
+        twin = copy.copy(self)
+        if source is not None:
+            twin._source = bytes(source) if isinstance(source, (bytes, bytearray)) else source
+        twin._parts = {name: copy.deepcopy(root) for name, root in self._parts.items()}
+        twin._changed = set()
+        return twin
+
+    def _find_story_parts(self, zf: zipfile.ZipFile) -> Dict[str, str]:
+        kinds = {DOCUMENT_PART: "document"}
+        if DOCUMENT_RELS not in self._names:
+            return kinds
+        rels = parse_xml(zf.read(DOCUMENT_RELS))
+        for rel in rels.iter(f"{_RELS_NS}Relationship"):
+            kind = _STORY_RELATIONSHIPS.get(rel.get("Type"))
+            if kind and rel.get("TargetMode") != "External":
+                target = os.path.normpath(os.path.join("word", rel.get("Target"))).replace(os.sep, "/")
+                if target in self._names:
+                    kinds.setdefault(target, kind)
+        return kinds
+
+    def story_part_names(self, kind: str = None) -> List[str]:
+        """
+        The main document part followed by its header and footer parts, in relationship order.
+
+        Args:
+            kind: Only parts of this kind ("document", "header" or "footer")
+        """
+        return [name for name, part_kind in self._story_kinds.items() if kind is None or part_kind == kind]
+
+    def story_parts(self) -> List[Tuple[str, object]]:
+        """(part name as python-docx reports it, root element) for every story part."""
+        return [("/" + name, self.xml_part(name)) for name in self._story_kinds]
+
+    def write(self, dest: Union[str, BinaryIO]):
+        """
+        Write the package with changed parts re-serialized and everything else copied as is.
+
+        Args:
+            dest: File path (written atomically) or writable binary stream
+        """
+        if isinstance(dest, str):
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(dest)), suffix=".docx.tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    self.write(f)
+                os.replace(tmp_path, dest)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            if isinstance(self._source, str) and os.path.abspath(dest) == os.path.abspath(self._source):
+                # The file now holds exactly these parts, so nothing is pending any more
+                self._changed.clear()
+            return
+
+        with self._open() as (raw, zin), zipfile.ZipFile(dest, "w") as out:
+            for info in zin.infolist():
+                if info.filename in self._changed:
+                    # Keep the entry's metadata (name, timestamp, compression) but not its old sizes
+                    new_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+                    new_info.compress_type = info.compress_type
+                    new_info.external_attr = info.external_attr
+                    out.writestr(new_info, serialize_part_xml(self._parts[info.filename]))
+                elif info.flag_bits & 0x01 or info.file_size > zipfile.ZIP64_LIMIT:
+                    # Encrypted or zip64 entries are rare enough to take the slow path
+                    out.writestr(copy.copy(info), zin.read(info.filename))
+                else:
+                    _copy_raw(raw, info, out)
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        self.write(buffer)
+        return buffer.getvalue()
+
+
+def _copy_raw(raw: BinaryIO, info: zipfile.ZipInfo, out: zipfile.ZipFile):
+    """Copy an entry's compressed bytes from the source file into out without decompressing them."""
+    raw.seek(info.header_offset)
+    fields = _LOCAL_HEADER.unpack(raw.read(_LOCAL_HEADER.size))
+    name_length, extra_length = fields[-2], fields[-1]
+    raw.seek(name_length + extra_length, io.SEEK_CUR)
+
+    new_info = copy.copy(info)
+    # Sizes and CRC are known, so the header carries them and no data descriptor follows
+    new_info.flag_bits &= ~_USES_DATA_DESCRIPTOR
+    new_info.extra = b""
+    new_info.header_offset = out.fp.tell()
+    out.fp.write(new_info.FileHeader(zip64=False))
+    remaining = info.compress_size
+    while remaining:
+        chunk = raw.read(min(remaining, _COPY_CHUNK_BYTES))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated entry {info.filename}")
+        out.fp.write(chunk)
+        remaining -= len(chunk)
+    out.filelist.append(new_info)
+    out.NameToInfo[new_info.filename] = new_info
+    # Keep ZipFile's bookkeeping in step: the next entry and the central
+    # directory go after this one, and the directory is written on close
+    out.start_dir = out.fp.tell()
+    out._didModify = True
@@ -0,0 +1,512 @@
+"""
+Single-pass application of resume edits to a DOCX.
+
+Every edit target is normalized once and compiled into an Aho-Corasick
+automaton. The document is then walked once: each paragraph's text is
+normalized once and scanned for all targets in a single pass, and the edits
+it matches are applied to it in their original order. Generation cost is
+proportional to document size plus matches rather than edits x paragraphs.
+
+Analysis resolves edits to anchors up front (resolve_anchors), so generation
+can go straight to each edit's paragraph and only falls back to searching
+for edits whose anchors no longer verify.
+"""
+
+import difflib
+import hashlib
+import re
+import unicodedata
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Pattern, Tuple
+
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+
+from doc_cache import documents
+from docx_extract import ExtractedText
+from docx_package import MC_FALLBACK, DocxPackage
+
+# How similar (on letters and digits) an unmatched target and a whole DOCX
+# paragraph must be for reconcile_edits to re-target the edit at it
+_RECONCILE_MIN_RATIO = 0.9
+
+
+def normalize_text(text: str) -> str:
+    """Normalize whitespace for robust matching."""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def safe_replace_text(paragraph, target: str, replacement: str):
+    """
+    Attempts to replace 'target' with 'replacement' in the paragraph while preserving formatting.
+    Uses normalized matching to ignore whitespace differences from PDF conversion.
+    """
+    norm_target = normalize_text(target)
+    norm_para_text = normalize_text(paragraph.text)
+
+    if norm_target not in norm_para_text:
+        return False
+
+    # Check for multi-line or bulleted content
+    # If the LLM returned markdown bullets, we want to strip them because
+    # pasting "* Item" into a DOCX doesn't make it a bullet list, just text.
+    # We will strip them to keep it clean.
+    clean_replacement = replacement
+    if '\n' in replacement or any(line.strip().startswith(('* ', '- ', '• ')) for line in replacement.split('\n')):
+         clean_replacement = re.sub(r'(^|\n)[\*\-\•]\s+', r'\1', replacement)
+
+    # Use the cleaned replacement for the actual operation
+    final_replacement = clean_replacement
+
+    # 1. Try single run replacement (exact match first)
+    for run in paragraph.runs:
+        if target in run.text:
+            run.text = run.text.replace(target, final_replacement)
+            return True
+
+    # 2. Relaxed match: Check if normalized target is in normalized run text
+    for run in paragraph.runs:
+        if norm_target in normalize_text(run.text):
+            pattern = re.escape(target).replace(r'\ ', r'\s+')
+            run.text = re.sub(pattern, final_replacement, run.text)
+            return True
+
+    # 3. Fallback: Full paragraph reconstruction
+    style_run = paragraph.runs[0] if paragraph.runs else None
+    font_name = style_run.font.name if style_run else None
+    font_size = style_run.font.size if style_run else None
+    bold = style_run.bold if style_run else None
+    italic = style_run.italic if style_run else None
+
+    pattern = re.escape(target).replace(r'\ ', r'\s+')
+    new_text = re.sub(pattern, final_replacement, paragraph.text)
+
+    if new_text != paragraph.text:
+        paragraph.text = new_text
+        for run in paragraph.runs:
+            if font_name: run.font.name = font_name
+            if font_size: run.font.size = font_size
+            if bold is not None: run.bold = bold
+            if italic is not None: run.italic = italic
+        return True
+
+    return False
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher over a fixed set of patterns."""
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+        # Trie as per-state transition dicts; state 0 is the root
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = next_state
+            self._out[state].append(pattern_id)
+
+        # Breadth-first failure links; each state also inherits the outputs of its failure state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text: str) -> List[int]:
+        """Ids of the patterns occurring in text, in ascending order."""
+        found = set()
+        state = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found.update(out[state])
+        return sorted(found)
+
+
+class _PartStory:
+    """Parent for paragraphs wrapped straight from a part's XML, so they resolve their part."""
+
+    def __init__(self, part):
+        self.part = part
+
+
+def _story_parts(doc) -> List[Tuple[str, object, object]]:
+    """(part name, root element, python-docx part or None) for the body, headers and footers."""
+    if isinstance(doc, DocxPackage):
+        return [(name, element, None) for name, element in doc.story_parts()]
+    parts = [doc.part]
+    for rel in doc.part.rels.values():
+        if rel.reltype in (RT.HEADER, RT.FOOTER) and not rel.is_external:
+            parts.append(rel.target_part)
+    return [(str(part.partname), part.element, part) for part in parts]
+
+
+def iter_paragraphs(doc) -> Iterator[Tuple[str, int, Paragraph]]:
+    """
+    Walk every paragraph of the document once, in document order.
+
+    Covers the body (including table cells, nested tables and text boxes)
+    followed by each header and footer part. Paragraphs inside mc:Fallback
+    are skipped because they duplicate the mc:Choice content Word renders.
+
+    Args:
+        doc: python-docx Document or DocxPackage
+
+    Yields:
+        Tuples of (part name, paragraph index within the part, paragraph)
+    """
+    for part_name, element, part in _story_parts(doc):
+        story = _PartStory(part)
+        index = 0
+        for p in element.iter(qn('w:p')):
+            if next(p.iterancestors(MC_FALLBACK), None) is not None:
+                continue
+            yield part_name, index, Paragraph(p, story)
+            index += 1
+
+
+def paragraph_hash(normalized_text: str) -> str:
+    """Short content hash of a paragraph's normalized text, used to verify anchors."""
+    return hashlib.sha1(normalized_text.encode("utf-8")).hexdigest()[:16]
+
+
+def _target_regex(norm_target: str) -> Pattern:
+    """Regex matching a normalized target in raw paragraph text with any whitespace runs."""
+    return re.compile(r"\s+".join(re.escape(word) for word in norm_target.split(" ")))
+
+
+def index_paragraphs(doc) -> List[Tuple[Tuple[str, int], Paragraph, str]]:
+    """(anchor key, paragraph, normalized text) for every paragraph, in iter_paragraphs order."""
+    return [((part, index), para, normalize_text(para.text)) for part, index, para in iter_paragraphs(doc)]
+
+
+def edit_fields(edit) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    if isinstance(edit, dict):
+        return edit.get("action"), edit.get("target_text"), edit.get("new_content")
+    return edit.action, edit.target_text, edit.new_content
+
+
+def _edit_anchors(edit) -> List[Dict]:
+    anchors = edit.get("anchors") if isinstance(edit, dict) else getattr(edit, "anchors", None)
+    return anchors or []
+
+
+def _compile_targets(edits: List, indices: List[int]) -> Tuple[AhoCorasick, List[List[int]]]:
+    """Build one matcher over the normalized targets of edits[i] for i in indices."""
+    patterns: List[str] = []
+    pattern_ids: Dict[str, int] = {}
+    # Edits sharing a normalized target share one pattern
+    edits_by_pattern: List[List[int]] = []
+    for i in indices:
+        norm_target = normalize_text(edit_fields(edits[i])[1] or "")
+        if norm_target not in pattern_ids:
+            pattern_ids[norm_target] = len(patterns)
+            patterns.append(norm_target)
+            edits_by_pattern.append([])
+        edits_by_pattern[pattern_ids[norm_target]].append(i)
+    return AhoCorasick(patterns), edits_by_pattern
+
+
+def _is_applicable(edit) -> bool:
+    _, target, content = edit_fields(edit)
+    return bool(normalize_text(target or "")) and bool(content)
+
+
+def resolve_anchors(source, edits: List) -> List[List[Dict]]:
+    """
+    Locate every edit target in the document in a single walk.
+
+    An anchor records where a target occurs: the part and paragraph index
+    (as enumerated by iter_paragraphs), the character offsets of the first
+    occurrence in the paragraph text and a hash of the paragraph's
+    normalized text, so a later lookup can tell whether the paragraph is
+    still the one the edit was resolved against.
+
+    Args:
+        source: ExtractedText (whose offset map already names every paragraph),
+            python-docx Document or DocxPackage
+        edits: Edit dicts or models
+
+    Returns:
+        List of anchors per edit, in input order; empty when the target was not found
+    """
+    anchors: List[List[Dict]] = [[] for _ in edits]
+    indices = [i for i, edit in enumerate(edits) if _is_applicable(edit)]
+    if not indices:
+        return anchors
+
+    if isinstance(source, ExtractedText):
+        paragraphs = source.paragraph_texts()
+    else:
+        paragraphs = (((part, index), para.text) for part, index, para in iter_paragraphs(source))
+
+    matcher, edits_by_pattern = _compile_targets(edits, indices)
+    for (part, index), text in paragraphs:
+        norm_text = normalize_text(text)
+        matched = matcher.find(norm_text)
+        if not matched:
+            continue
+        digest = paragraph_hash(norm_text)
+        for pattern_id in matched:
+            match = _target_regex(matcher.patterns[pattern_id]).search(text)
+            for i in edits_by_pattern[pattern_id]:
+                anchors[i].append({
+                    "part": part,
+                    "paragraph": index,
+                    "start": match.start() if match else None,
+                    "end": match.end() if match else None,
+                    "hash": digest,
+                })
+    return anchors
+
+
+def anchor_edits(source, sections: List[Dict]) -> int:
+    """
+    Resolve the edits of analysis sections against the DOCX they were proposed for.
+
+    Each edit dict gets "anchors" (see resolve_anchors) and "matched", which is
+    False when the target text does not occur in the document, e.g. because
+    the model paraphrased it.
+
+    Args:
+        source: DOCX path, or the ExtractedText of it
+        sections: Analysis sections whose edits are updated in place
+
+    Returns:
+        Number of unmatched edits
+    """
+    edits = [edit for section in sections for edit in section.get("edits", []) if isinstance(edit, dict)]
+    if not edits:
+        return 0
+    if isinstance(source, str):
+        # Usually already extracted for the analysis itself
+        source = documents.extract(source)
+    for edit, anchors in zip(edits, resolve_anchors(source, edits)):
+        edit["anchors"] = anchors
+        edit["matched"] = bool(anchors)
+    return sum(1 for edit in edits if not edit["matched"])
+
+
+def _loose_text(text: str) -> Tuple[str, List[int]]:
+    """
+    Lowercased letters and digits of text after NFKC normalization (which
+    splits ligatures), and the index in text each of them came from.
+    """
+    chars: List[str] = []
+    origin: List[int] = []
+    for i, char in enumerate(text):
+        for c in unicodedata.normalize("NFKC", char).lower():
+            if c.isalnum():
+                chars.append(c)
+                origin.append(i)
+    return "".join(chars), origin
+
+
+def reconcile_edits(source, sections: List[Dict]) -> int:
+    """
+    Re-target unmatched edits at the DOCX text they were meant for.
+
+    When the analysis ran on text read directly from the PDF, a target can
+    differ from the converted DOCX in ways that do not matter: ligatures,
+    words hyphenated across lines, bullet glyphs, spacing around
+    punctuation. Each edit anchor_edits left unmatched is compared with the
+    DOCX paragraphs on letters and digits only. The first paragraph that
+    contains it supplies the corresponding stretch of its text as the new
+    target; failing that, the paragraph most similar to it as a whole does,
+    if at least _RECONCILE_MIN_RATIO similar. Re-targeted edits are
+    anchored again.
+
+    Args:
+        source: DOCX path, or the ExtractedText of it
+        sections: Analysis sections already passed through anchor_edits, updated in place
+
+    Returns:
+        Number of edits re-targeted
+    """
+    edits = [
+        edit for section in sections for edit in section.get("edits", [])
+        if isinstance(edit, dict) and not edit.get("matched", True) and _is_applicable(edit)
+    ]
+    if not edits:
+        return 0
+    if isinstance(source, str):
+        source = documents.extract(source)
+
+    paragraphs = [(text, *_loose_text(text)) for _, text in source.paragraph_texts()]
+    retargeted = []
+    for edit in edits:
+        target, _ = _loose_text(edit["target_text"])
+        if not target:
+            continue
+        best, best_ratio = None, _RECONCILE_MIN_RATIO
+        for text, loose, origin in paragraphs:
+            at = loose.find(target)
+            if at >= 0:
+                best = text[origin[at]:origin[at + len(target) - 1] + 1]
+                break
+            matcher = difflib.SequenceMatcher(None, target, loose, autojunk=False)
+            # Cheap upper bounds first; most paragraphs are nowhere near
+            if matcher.real_quick_ratio() >= best_ratio and matcher.quick_ratio() >= best_ratio:
+                ratio = matcher.ratio()
+                if ratio >= best_ratio:
+                    best, best_ratio = text, ratio
+        if best is not None:
+            edit["target_text"] = best.strip()
+            retargeted.append(edit)
+
+    for edit, anchors in zip(retargeted, resolve_anchors(source, retargeted)):
+        edit["anchors"] = anchors
+        edit["matched"] = bool(anchors)
+    return len(retargeted)
+
+
+def locate_edits(entries: List[Tuple[Tuple[str, int], Paragraph, str]], edits: List) -> List[Tuple[List[int], Optional[str]]]:
+    """
+    Find the paragraphs each edit applies to.
+
+    Edits carrying anchors from resolve_anchors are looked up directly by
+    (part, paragraph) once every anchor's paragraph hash is verified. The
+    remaining edits, and anchored ones whose paragraphs no longer match, are
+    located by a single multi-pattern search over the paragraphs.
+
+    Args:
+        entries: Paragraph index from index_paragraphs
+        edits: Edit dicts or models
+
+    Returns:
+        Per edit, (positions in entries, "anchor" or "search"); ([], None) when
+        the edit is not applicable or its target was not found
+    """
+    position = {key: pos for pos, (key, _, _) in enumerate(entries)}
+    located: List[Tuple[List[int], Optional[str]]] = [([], None) for _ in edits]
+    search = []
+    for i, edit in enumerate(edits):
+        if not _is_applicable(edit):
+            continue
+        anchors = _edit_anchors(edit)
+        positions = [position.get((anchor.get("part"), anchor.get("paragraph"))) for anchor in anchors]
+        if anchors and all(
+            pos is not None and paragraph_hash(entries[pos][2]) == anchor.get("hash")
+            for pos, anchor in zip(positions, anchors)
+        ):
+            located[i] = (positions, "anchor")
+        else:
+            search.append(i)
+
+    if search:
+        matcher, edits_by_pattern = _compile_targets(edits, search)
+        for pos, (_, _, norm_text) in enumerate(entries):
+            for pattern_id in matcher.find(norm_text):
+                for i in edits_by_pattern[pattern_id]:
+                    located[i][0].append(pos)
+        for i in search:
+            if located[i][0]:
+                located[i] = (located[i][0], "search")
+    return located
+
+
+def apply_edit(paragraph: Paragraph, edit) -> bool:
+    """Apply one edit to a paragraph it was located in; False when nothing changed."""
+    action, target, content = edit_fields(edit)
+    if action == "replace":
+        return safe_replace_text(paragraph, target, content)
+    if action == "append":
+        paragraph.add_run(" " + content)
+        return True
+    return False
+
+
+def new_report_entry(index: int, edit, located_by: Optional[str]) -> Dict:
+    action, target, _ = edit_fields(edit)
+    return {
+        "index": index,
+        "action": action,
+        "target_text": target,
+        "status": "not_found" if _is_applicable(edit) else "skipped",
+        "located_by": located_by,
+        "applied": 0,
+    }
+
+
+def record_outcome(entry: Dict, changed: bool):
+    """Fold the outcome of applying an edit to one paragraph into its report entry."""
+    if changed:
+        entry["status"] = "applied"
+        entry["applied"] += 1
+    elif entry["status"] == "not_found":
+        # The target was located but could not be rewritten (unknown action,
+        # or an earlier edit on the same paragraph consumed it)
+        entry["status"] = "failed"
+
+
+def apply_edits(doc, edits: List) -> List[Dict]:
+    """
+    Apply edits to an open document in a single walk.
+
+    Edits are located with locate_edits. A target may occur in several
+    paragraphs (e.g. name, contact info); the edit is applied to each of
+    them. Edits on the same paragraph are applied in their original order.
+
+    Args:
+        doc: python-docx Document or DocxPackage, modified in place
+        edits: Edit dicts or models with action, target_text and new_content
+
+    Returns:
+        One report entry per edit, in input order, with its status
+        (applied, not_found, failed or skipped), how it was located
+        (anchor or search) and the number of paragraphs changed
+    """
+    entries = index_paragraphs(doc)
+    located = locate_edits(entries, edits)
+    report = [new_report_entry(i, edit, located_by) for i, (edit, (_, located_by)) in enumerate(zip(edits, located))]
+
+    # Paragraph position -> indices of the edits to apply there
+    plan: Dict[int, List[int]] = {}
+    for i, (positions, _) in enumerate(located):
+        for pos in positions:
+            plan.setdefault(pos, []).append(i)
+
+    for pos in sorted(plan):
+        para = entries[pos][1]
+        for i in plan[pos]:
+            record_outcome(report[i], apply_edit(para, edits[i]))
+    if isinstance(doc, DocxPackage):
+        for part_name in {entries[pos][0][0] for pos in plan}:
+            doc.mark_changed(part_name.lstrip("/"))
+    return report
+
+
+def apply_edits_to_docx(docx_path: str, edits: List, output_path: str) -> List[Dict]:
+    """
+    Write a copy of docx_path with edits applied to output_path.
+
+    Only the story parts that changed are re-serialized; every other part
+    of the package is copied through unchanged.
+
+    Returns:
+        Per-edit report from apply_edits
+    """
+    package = documents.checkout(docx_path)
+    report = apply_edits(package, edits)
+    package.write(output_path)
+    return report
@@ -0,0 +1,204 @@
+"""
+In-memory editing sessions for iterative regeneration.
+
+Reviewing an analysis means toggling edits and regenerating over and over
+against the same DOCX. A session keeps the parsed document in memory with a
+pristine copy of every paragraph (checked out of doc_cache, so a freshly
+analyzed upload is not parsed again), and a journal of the edits currently
+applied and the paragraphs each one touched. An update diffs the requested
+edits against the journal: only paragraphs whose set of edits changed are
+restored from their pristine copy and have their edits re-applied, and
+everything else is left as it is.
+
+Sessions are keyed by DOCX path, evicted least recently used past
+EDIT_SESSION_MAX_ENTRIES or after EDIT_SESSION_TTL_MINUTES idle, and
+rebuilt when the file on disk changes.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+
+from doc_cache import documents
+from docx_package import MC_FALLBACK
+from edit_engine import (
+    apply_edit,
+    edit_fields,
+    index_paragraphs,
+    locate_edits,
+    new_report_entry,
+    record_outcome,
+)
+
+logger = logging.getLogger(__name__)
+
+EDIT_SESSION_MAX_ENTRIES = int(os.getenv("EDIT_SESSION_MAX_ENTRIES", "32"))
+EDIT_SESSION_TTL_MINUTES = float(os.getenv("EDIT_SESSION_TTL_MINUTES", "30"))
+
+
+def _nested_paragraphs(p) -> List:
+    """Paragraphs inside p (text boxes), in iter_paragraphs order."""
+    return [d for d in p.iter(qn('w:p')) if d is not p and next(d.iterancestors(MC_FALLBACK), None) is None]
+
+
+def edit_keys(edits: List) -> List[str]:
+    """Stable identity for each edit; repeats of the same edit are numbered so they stay distinct."""
+    keys = []
+    seen: Dict[str, int] = {}
+    for edit in edits:
+        digest = hashlib.sha1(json.dumps(edit_fields(edit)).encode("utf-8")).hexdigest()[:16]
+        seen[digest] = seen.get(digest, 0) + 1
+        keys.append(f"{digest}:{seen[digest]}")
+    return keys
+
+
+class EditSession:
+    """A parsed DOCX plus the journal of edits currently applied to it."""
+
+    def __init__(self, docx_path: str):
+        self.docx_path = docx_path
+        self.mtime = os.path.getmtime(docx_path)
+        self.doc = documents.checkout(docx_path)
+        entries = index_paragraphs(self.doc)
+        # The index (keys and normalized texts) always describes the original document
+        self.entries = [(key, None, norm_text) for key, _, norm_text in entries]
+        self.paragraphs: List[Paragraph] = [para for _, para, _ in entries]
+        self.pristine = [copy.deepcopy(para._p) for para in self.paragraphs]
+        position = {para._p: pos for pos, para in enumerate(self.paragraphs)}
+        self.nested: Dict[int, List[int]] = {}
+        for pos, para in enumerate(self.paragraphs):
+            inner = [position[p] for p in _nested_paragraphs(para._p) if p in position]
+            if inner:
+                self.nested[pos] = inner
+
+        # Edit key -> (positions, located_by), kept across updates
+        self.located: Dict[str, Tuple[List[int], str]] = {}
+        # Journal: ordered edit keys currently applied, and the outcome per (key, position)
+        self.applied: List[str] = []
+        self.outcomes: Dict[Tuple[str, int], bool] = {}
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+    def _restore(self, pos: int):
+        """Swap the paragraph back to its pristine XML, re-pointing any paragraphs nested in it."""
+        current = self.paragraphs[pos]._p
+        parent = current.getparent()
+        if parent is None:
+            return
+        fresh = copy.deepcopy(self.pristine[pos])
+        parent.replace(current, fresh)
+        self.paragraphs[pos] = Paragraph(fresh, self.paragraphs[pos]._parent)
+        for inner_pos, inner in zip(self.nested.get(pos, []), _nested_paragraphs(fresh)):
+            self.paragraphs[inner_pos] = Paragraph(inner, self.paragraphs[inner_pos]._parent)
+
+    def update(self, edits: List) -> List[Dict]:
+        """
+        Bring the document to the state of applying exactly these edits.
+
+        Returns:
+            Per-edit report in the same shape as edit_engine.apply_edits
+        """
+        keys = edit_keys(edits)
+        unseen = [i for i, key in enumerate(keys) if key not in self.located]
+        if unseen:
+            for i, located in zip(unseen, locate_edits(self.entries, [edits[i] for i in unseen])):
+                self.located[keys[i]] = located
+
+        # Paragraphs whose list of edits differs from what is applied now
+        by_position: Dict[int, List[int]] = {}
+        for i, key in enumerate(keys):
+            for pos in self.located[key][0]:
+                by_position.setdefault(pos, []).append(i)
+        previous: Dict[int, List[str]] = {}
+        for key in self.applied:
+            for pos in self.located[key][0]:
+                previous.setdefault(pos, []).append(key)
+        affected = {
+            pos for pos in set(by_position) | set(previous)
+            if [keys[i] for i in by_position.get(pos, [])] != previous.get(pos, [])
+        }
+        # Restoring a paragraph also restores the text boxes inside it
+        for pos in list(affected):
+            affected.update(self.nested.get(pos, []))
+
+        for pos in sorted(affected):
+            self._restore(pos)
+            self.doc.mark_changed(self.entries[pos][0][0].lstrip("/"))
+        outcomes = {k: v for k, v in self.outcomes.items() if k[1] not in affected}
+        for pos in sorted(affected):
+            for i in by_position.get(pos, []):
+                outcomes[(keys[i], pos)] = apply_edit(self.paragraphs[pos], edits[i])
+
+        self.applied = keys
+        self.outcomes = outcomes
+        self.last_used = time.monotonic()
+        if affected:
+            logger.info(f"Edit session {os.path.basename(self.docx_path)}: re-applied {len(affected)} paragraphs")
+
+        report = []
+        for i, (edit, key) in enumerate(zip(edits, keys)):
+            positions, located_by = self.located[key]
+            entry = new_report_entry(i, edit, located_by)
+            for pos in positions:
+                record_outcome(entry, outcomes.get((key, pos), False))
+            report.append(entry)
+        return report
+
+    def save(self, dest):
+        """Write the edited DOCX to a path or binary stream (see DocxPackage.write)."""
+        self.doc.write(dest)
+
+
+class EditSessionStore:
+    """Bounded LRU of EditSessions keyed by DOCX path."""
+
+    def __init__(self, max_entries: int = EDIT_SESSION_MAX_ENTRIES, ttl_minutes: float = EDIT_SESSION_TTL_MINUTES):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_minutes * 60
+        self._sessions: "OrderedDict[str, EditSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, docx_path: str) -> EditSession:
+        """Return the session for docx_path, creating it (and parsing the file) when needed."""
+        key = os.path.abspath(docx_path)
+        now = time.monotonic()
+        with self._lock:
+            for stale in [k for k, s in self._sessions.items() if now - s.last_used > self.ttl_seconds]:
+                del self._sessions[stale]
+            session = self._sessions.get(key)
+            if session is not None and session.mtime == os.path.getmtime(docx_path):
+                self._sessions.move_to_end(key)
+                self.hits += 1
+                return session
+            self.misses += 1
+
+        # Parse outside the store lock so other sessions are not held up
+        session = EditSession(docx_path)
+        with self._lock:
+            self._sessions[key] = session
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_entries:
+                self._sessions.popitem(last=False)
+        return session
+
+    def discard(self, docx_path: str):
+        with self._lock:
+            self._sessions.pop(os.path.abspath(docx_path), None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"sessions": len(self._sessions), "hits": self.hits, "misses": self.misses}
+
+
+sessions = EditSessionStore()
@@ -0,0 +1,217 @@
+"""
+Named, bounded thread pools for blocking work.
+
+Blocking calls used to share Starlette's default threadpool, so a burst of
+slow page fetches could hold every thread while a cheap /generate waited
+behind them. Each kind of work now has a pool of its own:
+
+- file_io: disk-bound work such as saving uploads, rendering thumbnails,
+  extracting resume text, anchoring edits, analysis cache reads and
+  writes, and writing tailored DOCX files (FILE_IO_WORKERS threads).
+- network_io: blocking HTTP calls, e.g. scraping a job posting
+  (NETWORK_IO_WORKERS threads).
+
+CPU-bound PDF conversion runs in worker processes (conversion_pool), and
+LLM calls are async, bounded by llm_client's semaphore and admitted by
+llm_scheduler.
+
+Each pool admits at most its worker count plus its *_MAX_QUEUE calls
+(Admission, which conversion_pool uses for its worker processes too).
+Beyond that run() raises ExecutorSaturatedError, which the API answers
+with 503 and a Retry-After estimated from recent call durations.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+FILE_IO_WORKERS = int(os.getenv("FILE_IO_WORKERS", "8"))
+FILE_IO_MAX_QUEUE = int(os.getenv("FILE_IO_MAX_QUEUE", "64"))
+NETWORK_IO_WORKERS = int(os.getenv("NETWORK_IO_WORKERS", "8"))
+NETWORK_IO_MAX_QUEUE = int(os.getenv("NETWORK_IO_MAX_QUEUE", "16"))
+
+# Weight of the latest call in the running average duration
+_EWMA_ALPHA = 0.2
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when a pool's queue is full; retry_after is the suggested wait in seconds."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Admission:
+    """
+    Admits at most workers + max_queue units of work at a time.
+
+    Shared by the thread pools here and by conversion_pool's worker
+    processes. A pool with no workers of its own (workers <= 0) admits
+    everything.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int, message: str):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max(0, max_queue)
+        self.message = message
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+        self.avg_seconds = 0.0
+        self._timed = 0
+
+    def _has_room(self) -> bool:
+        return self.workers <= 0 or self.pending < self.workers + self.max_queue
+
+    def retry_after(self) -> float:
+        """Seconds until the work ahead of a new unit has likely drained."""
+        with self._lock:
+            waves = math.ceil(self.pending / max(1, self.workers))
+            return max(1.0, waves * self.avg_seconds)
+
+    def saturated(self) -> ExecutorSaturatedError:
+        return ExecutorSaturatedError(self.message, retry_after=self.retry_after())
+
+    def check(self):
+        """Raise ExecutorSaturatedError if admit() would, without taking a place."""
+        with self._lock:
+            if self._has_room():
+                return
+        raise self.saturated()
+
+    def admit(self):
+        """
+        Take a place; release() must give it back.
+
+        Raises:
+            ExecutorSaturatedError: workers + max_queue units are already admitted
+        """
+        with self._lock:
+            if self._has_room():
+                self.pending += 1
+                return
+            self.rejected += 1
+            pending = self.pending
+        error = self.saturated()
+        logger.warning(f"{self.name} saturated ({pending} admitted); rejecting (retry after {error.retry_after:.0f}s)")
+        raise error
+
+    def release(self, elapsed: float = None):
+        """Give a place back; elapsed, when given, feeds the Retry-After estimate."""
+        with self._lock:
+            self.pending -= 1
+            if elapsed is not None:
+                self._timed += 1
+                if self._timed == 1:
+                    self.avg_seconds = elapsed
+                else:
+                    self.avg_seconds += _EWMA_ALPHA * (elapsed - self.avg_seconds)
+
+
+class BoundedExecutor:
+    """Thread pool with a bounded queue and utilization counters."""
+
+    def __init__(self, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=name)
+        self._admission = Admission(
+            f"{name} pool", self.workers, self.max_queue,
+            "The server is busy right now. Please try again shortly.",
+        )
+        self._lock = threading.Lock()
+        self._running = 0
+        self._busy_seconds = 0.0
+        self.completed = 0
+        self.failed = 0
+
+    def retry_after(self) -> float:
+        """Seconds until the queue ahead of a new call has likely drained."""
+        return self._admission.retry_after()
+
+    def _call(self, fn: Callable, args, kwargs):
+        with self._lock:
+            self._running += 1
+        started = time.perf_counter()
+        ok = False
+        try:
+            result = fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            self._admission.release(elapsed)
+            with self._lock:
+                self._running -= 1
+                self._busy_seconds += elapsed
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) on the pool and return its result.
+
+        Cancelling the awaiting task drops a call that is still queued and
+        gives its place back. A call already running finishes on its thread
+        and keeps its place until it does.
+
+        Raises:
+            ExecutorSaturatedError: The pool's queue is full
+        """
+        self._admission.admit()
+        try:
+            future = self._executor.submit(self._call, fn, args, kwargs)
+        except BaseException:
+            self._admission.release()
+            raise
+        future.add_done_callback(self._release_if_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def _release_if_cancelled(self, future: Future):
+        # A future cancelled before it started never reaches _call's release
+        if future.cancelled():
+            self._admission.release()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": max(0, self._admission.pending - self._running),
+                "utilization": round(self._running / self.workers, 2),
+                "busy_seconds": round(self._busy_seconds, 3),
+                "avg_call_ms": round(self._admission.avg_seconds * 1000, 1),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self._admission.rejected,
+            }
+
+
+file_io = BoundedExecutor("file-io", FILE_IO_WORKERS, FILE_IO_MAX_QUEUE)
+network_io = BoundedExecutor("network-io", NETWORK_IO_WORKERS, NETWORK_IO_MAX_QUEUE)
+
+
+def stats() -> Dict:
+    return {"file_io": file_io.stats(), "network_io": network_io.stats()}
+
+
+def shutdown():
+    """Stop the pools' threads (called on app shutdown)."""
+    file_io.shutdown()
+    network_io.shutdown()
@@ -0,0 +1,139 @@
+"""
+Benchmark for DOCX text extraction.
+
+Compares the single-pass extractor (docx_extract.extract_document) with the
+previous python-docx traversal on real resumes or on a generated document
+shaped like large pdf2docx output (many paragraphs, layout tables, text
+boxes):
+
+    python extract_benchmark.py --pages 30 --runs 5
+    python extract_benchmark.py temp_*.docx
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+from docx_extract import extract_document
+
+_TEXTBOX_RUN = (
+    '<w:r {w} xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+    'xmlns:v="urn:schemas-microsoft-com:vml"><mc:AlternateContent>'
+    '<mc:Choice Requires="wps"><w:pict><v:textbox><w:txbxContent>'
+    '<w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:txbxContent></v:textbox></w:pict></mc:Choice>'
+    '<mc:Fallback><w:pict><v:textbox><w:txbxContent>'
+    '<w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:txbxContent></v:textbox></w:pict></mc:Fallback>'
+    '</mc:AlternateContent></w:r>'
+)
+
+
+def legacy_extract_text(docx_path: str) -> str:
+    """The python-docx traversal extract_text_from_docx used before the single-pass extractor."""
+    doc = Document(docx_path)
+    full_text = []
+    processed_elements = set()
+
+    def add_to_full_text(elements):
+        for element in elements:
+            element_id = element._element if hasattr(element, '_element') else element
+            if element_id in processed_elements:
+                continue
+            processed_elements.add(element_id)
+
+            if hasattr(element, 'text'):
+                if element.text.strip():
+                    full_text.append(element.text)
+            elif hasattr(element, 'rows'):
+                for row in element.rows:
+                    for cell in row.cells:
+                        tc_id = cell._element
+                        if tc_id not in processed_elements:
+                            processed_elements.add(tc_id)
+                            cell_text = " ".join([p.text for p in cell.paragraphs if p.text.strip()])
+                            if cell_text.strip():
+                                full_text.append(cell_text)
+
+    for section in doc.sections:
+        add_to_full_text(section.header.paragraphs)
+        add_to_full_text(section.header.tables)
+    add_to_full_text(doc.paragraphs)
+    add_to_full_text(doc.tables)
+    for section in doc.sections:
+        add_to_full_text(section.footer.paragraphs)
+        add_to_full_text(section.footer.tables)
+    for element in doc.element.body.iter():
+        if element.tag.endswith('txbxContent'):
+            for p in element.findall(qn('w:p')):
+                text = ""
+                for r in p.findall(qn('w:r')):
+                    for t in r.findall(qn('w:t')):
+                        if t.text:
+                            text += t.text
+                if text.strip():
+                    full_text.append(text)
+    return '\n'.join(full_text)
+
+
+def make_converted_resume(path: str, pages: int):
+    """Write a document shaped like pdf2docx output: per page, text paragraphs, a layout table and a text box."""
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Jane Doe | jane@example.com | +1 555 0100"
+    for page in range(pages):
+        doc.add_paragraph(f"PROFESSIONAL EXPERIENCE {page}")
+        for line in range(30):
+            para = doc.add_paragraph()
+            # Converted PDFs split lines into many small runs
+            for word in f"Delivered project {page}-{line} improving throughput by {line}% across teams".split():
+                para.add_run(word + " ")
+        table = doc.add_table(rows=4, cols=3)
+        for r, row in enumerate(table.rows):
+            for c, cell in enumerate(row.cells):
+                cell.text = f"Skill {page}.{r}.{c}"
+        table.cell(0, 0).merge(table.cell(0, 1))
+        doc.add_paragraph()._p.append(parse_xml(_TEXTBOX_RUN.format(w=nsdecls("w"), text=f"Sidebar note {page}")))
+    doc.save(path)
+
+
+def time_runs(fn: Callable[[str], object], path: str, runs: int) -> List[float]:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn(path)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare DOCX text extraction speed")
+    parser.add_argument("paths", nargs="*", help="DOCX files to extract (a large one is generated by default)")
+    parser.add_argument("--pages", type=int, default=30, help="Pages in the generated document")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = args.paths
+        if not paths:
+            generated = os.path.join(tmpdir, f"converted_{args.pages}_pages.docx")
+            make_converted_resume(generated, args.pages)
+            paths = [generated]
+
+        for path in paths:
+            legacy = statistics.median(time_runs(legacy_extract_text, path, args.runs))
+            single = statistics.median(time_runs(extract_document, path, args.runs))
+            extracted = extract_document(path)
+            print(f"{os.path.basename(path)}: {len(extracted.text)} chars, {len(extracted.spans)} paragraphs")
+            print(f"  python-docx traversal  {legacy:9.1f} ms")
+            print(f"  single pass            {single:9.1f} ms  ({legacy / single:.1f}x faster)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+"""
+Deterministic stand-in for the OpenAI chat-completions API.
+
+Point the backend at it to load-test /analyze, /generate and /fetch-jd
+without spending real tokens:
+
+    python fake_llm_server.py --port 9000 --latency-ms 800 --error-rate 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:9000/v1 OPENAI_API_KEY=fake uvicorn main:app
+
+Each request is classified by the prompt template it was built from. Job
+metadata is replayed from the llm_response.json artifacts recorded under
+mlruns when there are any; every other response is generated from the
+prompt itself (keywords from the JD, edits whose target_text is an exact
+line of the resume) so the result validates as an AnalysisResult and the
+edits apply cleanly. The server also serves synthetic job postings at
+/jobs/{job_id} for /fetch-jd to scrape.
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from typing import Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+
+from ats_scorer import extract_keyword_clusters
+from resume_sections import split_resume_sections
+
+logger = logging.getLogger(__name__)
+
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "500"))
+FAKE_LLM_JITTER_MS = float(os.getenv("FAKE_LLM_JITTER_MS", "200"))
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+FAKE_LLM_STREAM_CHUNK_CHARS = int(os.getenv("FAKE_LLM_STREAM_CHUNK_CHARS", "24"))
+FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", "0"))
+MLRUNS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mlruns")
+
+# Injected failures, in the shape the OpenAI API returns them
+ERROR_RESPONSES = (
+    (429, "rate_limit_exceeded", "Rate limit reached for requests"),
+    (500, "server_error", "The server had an error while processing your request"),
+    (503, "service_unavailable", "The engine is currently overloaded"),
+)
+
+SAMPLE_JOB_DESCRIPTION = """Senior Backend Engineer - Acme Health
+We are hiring a Senior Backend Engineer to build the data platform behind our digital health products.
+You will design Python services on AWS, own CI/CD pipelines and run Kubernetes workloads.
+Requirements: 5+ years with Python, SQL and distributed systems; experience with FastAPI,
+PostgreSQL and Terraform; clear communication with clinical and product stakeholders."""
+
+
+def load_recorded_responses(mlruns_dir: str = MLRUNS_DIR) -> Dict[str, List[Dict]]:
+    """Group recorded llm_response.json artifacts by the kind of call that produced them."""
+    recorded: Dict[str, List[Dict]] = {}
+    for path in sorted(glob.glob(os.path.join(mlruns_dir, "*", "*", "artifacts", "llm_response.json"))):
+        try:
+            with open(path, encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Skipping unreadable artifact {path}: {e}")
+            continue
+        if isinstance(payload, dict) and {"company", "role"} <= payload.keys():
+            recorded.setdefault("job_metadata", []).append(payload)
+        elif isinstance(payload, dict) and "sections" in payload:
+            recorded.setdefault("analysis", []).append(payload)
+    return recorded
+
+
+def classify_prompt(prompt: str) -> str:
+    """Name the prompt template a request was built from."""
+    if "Extract the 'Company Name'" in prompt:
+        return "job_metadata"
+    if "currently scores" in prompt:
+        return "projected_score"
+    if "ATS Score" in prompt:
+        return "initial_score"
+    if "Also extract the hiring company" in prompt:
+        return "role_analysis"
+    if "You are tailoring ONE section" in prompt:
+        return "section_rewrite"
+    if '"sections": [' in prompt:
+        return "analysis"
+    if "RESUME DIAGNOSIS" in prompt:
+        return "resume_overview"
+    return "unknown"
+
+
+def _between(text: str, start: str, end: str = None) -> str:
+    if start not in text:
+        return ""
+    text = text.split(start, 1)[1]
+    if end and end in text:
+        text = text.split(end, 1)[0]
+    return text.strip()
+
+
+def _role_analysis(job_description: str) -> Dict:
+    keywords = [cluster.terms[0] for cluster in extract_keyword_clusters(job_description, max_clusters=7)]
+    return {
+        "identity": f"Engineer working with {', '.join(keywords[:2]) or 'the listed stack'}",
+        "keywords": keywords,
+        "seniority_signals": ["ownership", "cross-functional collaboration"],
+        "industry_context": "Technology",
+        "geographic_expectations": "Not specified",
+    }
+
+
+def _diagnosis(keywords: List[str]) -> Dict:
+    return {
+        "strong_matches": keywords[:2],
+        "gaps": keywords[2:5],
+        "misalignments": [],
+        "ats_risks": [],
+    }
+
+
+def _section_analysis(name: str, section_type: str, text: str, keywords: List[str]) -> Dict:
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    edits = []
+    if lines:
+        edits.append({
+            "target_text": lines[0],
+            "new_content": f"{lines[0]} ({', '.join(keywords[:2]) or 'role-aligned'})",
+            "action": "replace",
+            "rationale": "Surfaces job description keywords",
+        })
+    return {
+        "section_name": name,
+        "section_type": section_type,
+        "original_text": text,
+        "gaps": keywords[2:4],
+        "suggestions": [f"Mention {keyword} where it is true" for keyword in keywords[2:4]],
+        "edits": edits,
+    }
+
+
+def generate_response(kind: str, prompt: str, recorded: Dict[str, List[Dict]], rng: random.Random) -> Dict:
+    """Build a schema-valid JSON response for a classified prompt."""
+    if recorded.get(kind):
+        return rng.choice(recorded[kind])
+
+    job_description = _between(prompt, "Job Description:", "\n\nOriginal Resume Content:")
+    job_description = job_description.rsplit('\n\nSection "', 1)[0]
+    keywords = [cluster.terms[0] for cluster in extract_keyword_clusters(job_description, max_clusters=7)]
+
+    if kind == "job_metadata":
+        return {"company": "Acme Health", "role": "Senior Backend Engineer"}
+    if kind == "initial_score":
+        return {"initial_score": 55 + rng.randint(0, 10), "reasoning": "Partial keyword coverage"}
+    if kind == "projected_score":
+        return {"projected_score": 75 + rng.randint(0, 10), "reasoning": "Edits close the main gaps"}
+    if kind == "role_analysis":
+        return {"role_analysis": _role_analysis(job_description), "company_name": "Acme Health",
+                "job_title": "Senior Backend Engineer"}
+    if kind == "resume_overview":
+        return {"diagnosis": _diagnosis(keywords), "proposed_title": "Senior Backend Engineer",
+                "proposed_summary": f"Backend engineer experienced with {', '.join(keywords[:3])}."}
+    if kind == "section_rewrite":
+        header = prompt.rsplit('\nSection "', 1)[-1]
+        name = header.split('"', 1)[0]
+        section_type = _between(header, "(", ")")
+        text = header.split(":\n", 1)[1] if ":\n" in header else ""
+        return _section_analysis(name, section_type or "Other", text, keywords)
+    if kind == "analysis":
+        resume_text = _between(prompt, "Original Resume Content:")
+        result = {
+            "diagnosis": _diagnosis(keywords),
+            "proposed_title": "Senior Backend Engineer",
+            "proposed_summary": f"Backend engineer experienced with {', '.join(keywords[:3])}.",
+            "sections": [
+                _section_analysis(section.name, section.section_type, section.text, keywords)
+                for section in split_resume_sections(resume_text)
+            ],
+        }
+        # The role-aware prompt receives the role analysis instead of asking for it
+        if "STEP 1 — ROLE" in prompt:
+            result["role_analysis"] = _role_analysis(job_description)
+            result["company_name"] = "Acme Health"
+            result["job_title"] = "Senior Backend Engineer"
+        return result
+    return {}
+
+
+def create_app(
+    latency_ms: float = FAKE_LLM_LATENCY_MS,
+    jitter_ms: float = FAKE_LLM_JITTER_MS,
+    error_rate: float = FAKE_LLM_ERROR_RATE,
+    stream_chunk_chars: int = FAKE_LLM_STREAM_CHUNK_CHARS,
+    seed: int = FAKE_LLM_SEED,
+    mlruns_dir: str = MLRUNS_DIR,
+) -> FastAPI:
+    """
+    Build the fake API app.
+
+    Args:
+        latency_ms: Base latency of every completion (spread across chunks when streaming)
+        jitter_ms: Uniform random latency added on top of latency_ms
+        error_rate: Fraction of requests answered with an injected 429/500/503
+        stream_chunk_chars: Characters per streamed delta
+        seed: Seed for latency, error and response choices
+        mlruns_dir: Directory searched for recorded llm_response.json artifacts
+    """
+    app = FastAPI()
+    rng = random.Random(seed)
+    recorded = load_recorded_responses(mlruns_dir)
+    stats = {"requests": 0, "errors": 0, "by_kind": {}}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        kind = classify_prompt(prompt)
+        stats["requests"] += 1
+        stats["by_kind"][kind] = stats["by_kind"].get(kind, 0) + 1
+        delay = (latency_ms + rng.uniform(0, jitter_ms)) / 1000
+
+        if rng.random() < error_rate:
+            stats["errors"] += 1
+            status, code, message = rng.choice(ERROR_RESPONSES)
+            await asyncio.sleep(delay / 4)
+            return JSONResponse(
+                status_code=status,
+                content={"error": {"message": message, "type": code, "param": None, "code": code}},
+            )
+
+        content = json.dumps(generate_response(kind, prompt, recorded, rng), ensure_ascii=False)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get("model", "gpt-4o")
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": (len(prompt) + len(content)) // 4,
+        }
+
+        if not body.get("stream"):
+            await asyncio.sleep(delay)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            }
+
+        chunks = [content[i:i + stream_chunk_chars] for i in range(0, len(content), stream_chunk_chars)]
+
+        async def event_stream():
+            for i, text in enumerate(chunks):
+                await asyncio.sleep(delay / len(chunks))
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "delta": {"role": "assistant", "content": text} if i == 0 else {"content": text},
+                        "finish_reason": None,
+                    }],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+            final = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+    @app.get("/jobs/{job_id}", response_class=HTMLResponse)
+    async def job_posting(job_id: int):
+        description = SAMPLE_JOB_DESCRIPTION.replace("\n", "<br>\n")
+        return f"""<html><head><title>Job {job_id}</title></head>
+<body><div class="job-description"><p>Posting #{job_id}</p><p>{description}</p></div></body></html>"""
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI chat-completions server for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=FAKE_LLM_LATENCY_MS)
+    parser.add_argument("--jitter-ms", type=float, default=FAKE_LLM_JITTER_MS)
+    parser.add_argument("--error-rate", type=float, default=FAKE_LLM_ERROR_RATE)
+    parser.add_argument("--stream-chunk-chars", type=int, default=FAKE_LLM_STREAM_CHUNK_CHARS)
+    parser.add_argument("--seed", type=int, default=FAKE_LLM_SEED)
+    parser.add_argument("--mlruns-dir", default=MLRUNS_DIR)
+    args = parser.parse_args()
+
+    import uvicorn
+    app = create_app(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        stream_chunk_chars=args.stream_chunk_chars,
+        seed=args.seed,
+        mlruns_dir=args.mlruns_dir,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
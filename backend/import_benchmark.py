@@ -0,0 +1,162 @@
+"""
+Cold-start benchmark for the backend.
+
+Measures two things in fresh interpreter processes:
+- import time of a module (main by default), from python -X importtime,
+  with the slowest imports by cumulative time
+- time to first request: interpreter start, app import and startup events
+  until the first response to a real endpoint comes back
+
+Run from the backend directory:
+
+    python import_benchmark.py --runs 3 --max-import-ms 1500 --max-first-request-ms 4000
+
+The exit code is 1 when the median of either measurement exceeds its
+budget. There is no CI pipeline in this repository; verify_lazy_imports.py
+runs one measurement of each against COLD_START_MAX_IMPORT_MS and
+COLD_START_MAX_FIRST_REQUEST_MS as part of the test suite.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Heavy dependencies that must stay off the startup import path
+DEFERRED_MODULES = ("openai", "pdf2docx", "pymupdf", "docx2pdf", "pythoncom", "mlflow", "bs4", "requests")
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+FIRST_REQUEST_SNIPPET = """
+import json, sys, time
+import main
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    response = client.get(sys.argv[1])
+print(json.dumps({"done": time.time(), "status": response.status_code,
+                  "loaded": [m for m in sys.argv[2:] if m in sys.modules]}))
+"""
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [BACKEND_DIR, env.get("PYTHONPATH")]))
+    return env
+
+
+def measure_import(module: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    Import module in a fresh interpreter under -X importtime.
+
+    Returns:
+        Tuple of (cumulative import ms of the module, [(module, cumulative ms)] of its direct imports)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=BACKEND_DIR, env=_env(),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    total_ms = 0.0
+    children: List[Tuple[str, float]] = []
+    # Direct imports are listed before the module itself, indented by two spaces
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        cumulative_ms = int(match.group(2)) / 1000
+        depth = len(match.group(3)) - 1
+        name = match.group(4)
+        if depth == 0 and name == module:
+            total_ms = cumulative_ms
+        elif depth == 2:
+            children.append((name, cumulative_ms))
+    return total_ms, children
+
+
+def measure_first_request(path: str) -> Dict:
+    """Start a fresh interpreter, import main, run startup and time the first response to path."""
+    with tempfile.TemporaryDirectory() as workdir:
+        # Startup creates the SQLite database and sweeps temp files in the working directory
+        started = time.time()
+        result = subprocess.run(
+            [sys.executable, "-c", FIRST_REQUEST_SNIPPET, path, *DEFERRED_MODULES],
+            capture_output=True, text=True, cwd=workdir, env=_env(),
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"First request failed:\n{result.stderr[-2000:]}")
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return {
+        "first_request_ms": round((report["done"] - started) * 1000, 1),
+        "status": report["status"],
+        "deferred_modules_loaded": report["loaded"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure backend import time and time to first request")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--path", default="/api/usage", help="Endpoint used for the first request")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Slowest direct imports to list")
+    parser.add_argument("--max-import-ms", type=float, help="Fail when the median import time exceeds this")
+    parser.add_argument("--max-first-request-ms", type=float, help="Fail when the median first request exceeds this")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    import_runs = []
+    first_request_runs = []
+    children: List[Tuple[str, float]] = []
+    loaded: List[str] = []
+    for _ in range(args.runs):
+        total_ms, children = measure_import(args.module)
+        import_runs.append(total_ms)
+        first = measure_first_request(args.path)
+        first_request_runs.append(first["first_request_ms"])
+        loaded = first["deferred_modules_loaded"]
+
+    report = {
+        "module": args.module,
+        "import_ms_median": round(statistics.median(import_runs), 1),
+        "import_ms_runs": [round(ms, 1) for ms in import_runs],
+        "first_request_ms_median": round(statistics.median(first_request_runs), 1),
+        "first_request_ms_runs": first_request_runs,
+        "slowest_imports": [
+            {"module": name, "cumulative_ms": round(ms, 1)}
+            for name, ms in sorted(children, key=lambda item: -item[1])[:args.top]
+        ],
+        "deferred_modules_loaded": loaded,
+    }
+
+    print(f"import {args.module}: median {report['import_ms_median']} ms {report['import_ms_runs']}")
+    print(f"first request {args.path}: median {report['first_request_ms_median']} ms {first_request_runs}")
+    print("slowest direct imports:")
+    for entry in report["slowest_imports"]:
+        print(f"  {entry['cumulative_ms']:>9.1f} ms  {entry['module']}")
+    if loaded:
+        print(f"WARNING: deferred modules loaded by the first request: {', '.join(loaded)}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    over_budget = (
+        (args.max_import_ms is not None and report["import_ms_median"] > args.max_import_ms)
+        or (args.max_first_request_ms is not None and report["first_request_ms_median"] > args.max_first_request_ms)
+    )
+    if over_budget:
+        print("FAILED: cold start is over budget")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
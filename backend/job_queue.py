@@ -0,0 +1,550 @@
+"""
+Durable queue for long-running jobs.
+
+POST /analyze used to hold its request open through the PDF conversion and
+the LLM calls. The work was lost if the server restarted or a proxy gave up
+first, and throughput was set by how many connections clients kept open.
+Analyses now run as jobs: the endpoint stores one in a SQLite table
+(JOB_QUEUE_PATH) and answers with its id, JOB_WORKERS worker tasks claim
+and run queued jobs, and clients follow them through GET /jobs/{id}.
+
+- A claimed job holds a lease its worker renews while it runs. A job whose
+  lease runs out, because the process running it died, is claimed again.
+  On a clean shutdown running jobs are put back in the queue.
+- A failed job is retried up to JOB_MAX_ATTEMPTS times with exponential
+  backoff, or after the error's retry_after (e.g. LLMOverloadedError).
+  Handlers raise PermanentJobError for failures a retry cannot fix.
+- Handlers report per-stage progress (Job.track), which GET /jobs/{id} returns.
+- enqueue_once attaches a request to an equivalent job that is still
+  queued or running instead of starting another, and returns the job
+  stored under a client's idempotency key for JOB_IDEMPOTENCY_WINDOW_HOURS.
+- Finished jobs are purged after JOB_RESULT_TTL_HOURS.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "jobs.db")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "2"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_RESULT_TTL_HOURS = float(os.getenv("JOB_RESULT_TTL_HOURS", "24"))
+JOB_IDEMPOTENCY_WINDOW_HOURS = float(os.getenv("JOB_IDEMPOTENCY_WINDOW_HOURS", "24"))
+
+# How often idle workers look for jobs enqueued by other processes or due for a retry
+_POLL_SECONDS = 1.0
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class PermanentJobError(Exception):
+    """Raised by a job handler for a failure that retrying cannot fix."""
+
+
+class IdempotencyConflictError(Exception):
+    """Raised when an idempotency key is reused for a different request."""
+
+
+class Job:
+    """A claimed job, as its handler sees it."""
+
+    def __init__(self, queue: "JobQueue", job_id: str, kind: str, payload: Dict, attempts: int, stages: Dict):
+        self.queue = queue
+        self.id = job_id
+        self.kind = kind
+        self.payload = payload
+        self.attempts = attempts
+        self.stages = stages
+
+    async def _save(self, stage: str):
+        await asyncio.to_thread(self.queue._update_progress, self.id, stage, self.stages)
+
+    async def track(self, stage: str, awaitable: Awaitable) -> Any:
+        """
+        Await a stage of the job, recording when it starts and finishes.
+
+        Stages may overlap; each is reported separately.
+        """
+        self.stages[stage] = {"status": RUNNING, "started_at": time.time()}
+        await self._save(stage)
+        try:
+            result = await awaitable
+        except asyncio.CancelledError:
+            raise
+        except BaseException:
+            self.stages[stage]["status"] = FAILED
+            await self._save(stage)
+            raise
+        entry = self.stages[stage]
+        entry["status"] = SUCCEEDED
+        entry["seconds"] = round(time.time() - entry["started_at"], 3)
+        await self._save(stage)
+        return result
+
+
+JobHandler = Callable[[Job], Awaitable[Dict]]
+
+
+class JobQueue:
+    """SQLite-backed job queue and the worker tasks that drain it."""
+
+    def __init__(
+        self,
+        path: str = JOB_QUEUE_PATH,
+        workers: int = JOB_WORKERS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retry_base_seconds: float = JOB_RETRY_BASE_SECONDS,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        result_ttl_seconds: float = JOB_RESULT_TTL_HOURS * 3600,
+        idempotency_window_seconds: float = JOB_IDEMPOTENCY_WINDOW_HOURS * 3600,
+    ):
+        self.path = path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lease_seconds = lease_seconds
+        self.result_ttl_seconds = result_ttl_seconds
+        self.idempotency_window_seconds = idempotency_window_seconds
+        # Identifies this process's claims, so a worker that lost its lease cannot overwrite the new owner's work
+        self.owner = uuid.uuid4().hex
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._lock = threading.Lock()
+        self._initialized = False
+        self.running = 0
+        self.enqueued = 0
+        self.coalesced = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        self.recovered = 0
+
+    def register(self, kind: str, handler: JobHandler):
+        """Run jobs of this kind with handler(job), whose return value becomes the job's result."""
+        self._handlers[kind] = handler
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " kind TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " stage TEXT,"
+                " stages TEXT NOT NULL DEFAULT '{}',"
+                " payload TEXT NOT NULL,"
+                " result TEXT,"
+                " error TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " run_after REAL NOT NULL,"
+                " owner TEXT,"
+                " lease_expires REAL,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " finished_at REAL,"
+                " dedup_key TEXT,"
+                " idempotency_key TEXT,"
+                " client TEXT)"
+            )
+            # Tables created before request deduplication and job ownership
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column in ("dedup_key", "idempotency_key", "client"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, run_after)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_dedup ON jobs (dedup_key)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_idempotency ON jobs (idempotency_key)")
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _count(self, counter: str, n: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    # Storage. These run on worker threads (asyncio.to_thread); sqlite3 calls block.
+
+    @staticmethod
+    def _insert_row(conn: sqlite3.Connection, kind: str, payload: Dict, client: str = None,
+                    dedup_key: str = None, idempotency_key: str = None) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn.execute(
+            "INSERT INTO jobs (id, kind, status, payload, run_after, created_at, updated_at, dedup_key, idempotency_key,"
+            " client) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, QUEUED, json.dumps(payload), now, now, now, dedup_key, idempotency_key, client)
+        )
+        return job_id
+
+    def _insert(self, kind: str, payload: Dict, client: str = None) -> str:
+        conn = self._connect()
+        try:
+            job_id = self._insert_row(conn, kind, payload, client)
+            conn.commit()
+        finally:
+            conn.close()
+        return job_id
+
+    def _insert_once(
+        self, kind: str, payload: Dict, dedup_key: str, idempotency_key: Optional[str], client: Optional[str]
+    ) -> Tuple[str, bool]:
+        conn = self._connect()
+        try:
+            # Lookup and insert in one write transaction, so concurrent duplicates cannot both insert
+            conn.execute("BEGIN IMMEDIATE")
+            if idempotency_key is not None:
+                row = conn.execute(
+                    "SELECT id, dedup_key FROM jobs WHERE idempotency_key = ? AND created_at >= ?"
+                    " ORDER BY created_at DESC LIMIT 1",
+                    (idempotency_key, time.time() - self.idempotency_window_seconds)
+                ).fetchone()
+                if row is not None:
+                    conn.commit()
+                    if row[1] != dedup_key:
+                        raise IdempotencyConflictError("Idempotency-Key was already used for a different request")
+                    return row[0], False
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE dedup_key = ? AND status IN (?, ?) ORDER BY created_at DESC LIMIT 1",
+                (dedup_key, QUEUED, RUNNING)
+            ).fetchone()
+            if row is not None:
+                conn.commit()
+                return row[0], False
+            job_id = self._insert_row(conn, kind, payload, client, dedup_key, idempotency_key)
+            conn.commit()
+            return job_id, True
+        finally:
+            conn.close()
+
+    def _claim(self) -> Optional[Job]:
+        """Take the next due job of a registered kind, or one whose owner's lease ran out."""
+        kinds = list(self._handlers)
+        if not kinds:
+            return None
+        now = time.time()
+        conn = self._connect()
+        try:
+            while True:
+                # BEGIN IMMEDIATE takes the write lock, so two processes cannot claim the same row
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT id, kind, status, payload, attempts, stages FROM jobs"
+                    " WHERE ((status = ? AND run_after <= ?) OR (status = ? AND lease_expires < ?))"
+                    f" AND kind IN ({', '.join('?' * len(kinds))})"
+                    " ORDER BY run_after LIMIT 1",
+                    (QUEUED, now, RUNNING, now, *kinds)
+                ).fetchone()
+                if row is None:
+                    conn.commit()
+                    return None
+                job_id, kind, status, payload, attempts, stages = row
+                if status == RUNNING:
+                    self._count("recovered")
+                    logger.warning(f"Job {job_id} lost its worker after attempt {attempts}")
+                    if attempts >= self.max_attempts:
+                        conn.execute(
+                            "UPDATE jobs SET status = ?, error = ?, owner = NULL, lease_expires = NULL,"
+                            " updated_at = ?, finished_at = ? WHERE id = ?",
+                            (FAILED, "Worker lost while running the job", now, now, job_id)
+                        )
+                        conn.commit()
+                        self._count("failed")
+                        continue
+                conn.execute(
+                    "UPDATE jobs SET status = ?, owner = ?, lease_expires = ?, attempts = attempts + 1,"
+                    " updated_at = ? WHERE id = ?",
+                    (RUNNING, self.owner, now + self.lease_seconds, now, job_id)
+                )
+                conn.commit()
+                return Job(self, job_id, kind, json.loads(payload), attempts + 1, json.loads(stages))
+        finally:
+            conn.close()
+
+    def _owned_update(self, job_id: str, assignments: str, params: tuple) -> bool:
+        conn = self._connect()
+        try:
+            updated = conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE id = ? AND owner = ?",
+                (*params, time.time(), job_id, self.owner)
+            ).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        if not updated:
+            logger.warning(f"Job {job_id} is no longer owned by this worker; dropping its update")
+        return bool(updated)
+
+    def _renew(self, job_id: str):
+        self._owned_update(job_id, "lease_expires = ?", (time.time() + self.lease_seconds,))
+
+    def _update_progress(self, job_id: str, stage: str, stages: Dict):
+        self._owned_update(job_id, "stage = ?, stages = ?", (stage, json.dumps(stages)))
+
+    def _finish(self, job_id: str, result: Dict):
+        self._owned_update(
+            job_id,
+            "status = ?, result = ?, error = NULL, owner = NULL, lease_expires = NULL, finished_at = ?",
+            (SUCCEEDED, json.dumps(result), time.time())
+        )
+
+    def _fail(self, job_id: str, error: str, retry_at: Optional[float]):
+        if retry_at is None:
+            self._owned_update(
+                job_id,
+                "status = ?, error = ?, owner = NULL, lease_expires = NULL, finished_at = ?",
+                (FAILED, error, time.time())
+            )
+        else:
+            self._owned_update(
+                job_id,
+                "status = ?, error = ?, run_after = ?, owner = NULL, lease_expires = NULL",
+                (QUEUED, error, retry_at)
+            )
+
+    def _release(self, job_id: str):
+        """Put an interrupted job back in the queue without counting the attempt."""
+        self._owned_update(
+            job_id,
+            "status = ?, attempts = attempts - 1, run_after = ?, owner = NULL, lease_expires = NULL",
+            (QUEUED, time.time())
+        )
+
+    def _read(self, job_id: str, client: Optional[str]) -> Optional[Dict]:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT id, kind, status, stage, stages, result, error, attempts, created_at, updated_at, finished_at,"
+                " client FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        job_id, kind, status, stage, stages, result, error, attempts, created_at, updated_at, finished_at, owner = row
+        if client is not None and owner != client:
+            return None
+        return {
+            "id": job_id,
+            "kind": kind,
+            "status": status,
+            "stage": stage,
+            "stages": json.loads(stages),
+            "attempts": attempts,
+            "result": json.loads(result) if result else None,
+            "error": error,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "finished_at": finished_at,
+        }
+
+    def purge(self) -> int:
+        """Delete finished jobs older than the result TTL; returns how many."""
+        conn = self._connect()
+        try:
+            removed = conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (SUCCEEDED, FAILED, time.time() - self.result_ttl_seconds)
+            ).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        if removed:
+            logger.info(f"Purged {removed} finished jobs")
+        return removed
+
+    # Event loop side
+
+    async def enqueue(self, kind: str, payload: Dict, client: str = None) -> str:
+        """
+        Store a job for the workers.
+
+        Args:
+            kind: A kind registered with register()
+            payload: JSON-serializable arguments for the handler
+            client: Who submitted the job; get() only shows it to them
+
+        Returns:
+            The job's id
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for {kind} jobs")
+        job_id = await asyncio.to_thread(self._insert, kind, payload, client)
+        self._count("enqueued")
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    async def enqueue_once(
+        self, kind: str, payload: Dict, dedup_key: str, idempotency_key: str = None, client: str = None
+    ) -> Tuple[str, bool]:
+        """
+        Store a job unless an equivalent one makes it unnecessary.
+
+        Args:
+            kind: A kind registered with register()
+            payload: JSON-serializable arguments for the handler
+            dedup_key: Identifies equivalent requests; a queued or running job
+                with the same key is returned instead of a new one
+            idempotency_key: Client-chosen key, already scoped to the client. A
+                job stored under it within the idempotency window is returned
+                whatever its status.
+            client: Who submitted the job; get() only shows it to them. Both
+                keys must already be scoped to the client, so a job returned
+                instead of a new one belongs to the same client.
+
+        Returns:
+            The job's id, and whether it was created by this call
+
+        Raises:
+            IdempotencyConflictError: idempotency_key belongs to a job with another dedup_key
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for {kind} jobs")
+        job_id, created = await asyncio.to_thread(
+            self._insert_once, kind, payload, dedup_key, idempotency_key, client
+        )
+        if not created:
+            self._count("coalesced")
+            return job_id, False
+        self._count("enqueued")
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id, True
+
+    async def get(self, job_id: str, client: str = None) -> Optional[Dict]:
+        """
+        The job's status, stages and, once finished, its result or error.
+
+        Args:
+            job_id: The id enqueue() returned
+            client: When given, the job must have been submitted by this client
+
+        Returns:
+            None if the job is unknown, or belongs to another client
+        """
+        return await asyncio.to_thread(self._read, job_id, client)
+
+    def start(self):
+        """Start the worker tasks. Call from the running event loop."""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work(), name=f"job-worker-{i}") for i in range(self.workers)]
+        logger.info(f"Started {self.workers} job workers")
+
+    async def stop(self):
+        """Stop the workers; jobs they were running go back to the queue."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _work(self):
+        while True:
+            try:
+                job = await asyncio.to_thread(self._claim)
+            except sqlite3.Error as e:
+                logger.error(f"Claiming a job failed: {e}")
+                job = None
+            if job is None:
+                # Not wait_for: on 3.11 it swallows a stop() that lands as the event is set
+                wakeup = asyncio.ensure_future(self._wakeup.wait())
+                try:
+                    await asyncio.wait([wakeup], timeout=_POLL_SECONDS)
+                finally:
+                    wakeup.cancel()
+                # Cleared only after waking: a job enqueued meanwhile is found by the next claim
+                self._wakeup.clear()
+                continue
+            try:
+                await self._run(job)
+            except sqlite3.Error as e:
+                # The job's lease runs out and another worker picks it up
+                logger.error(f"Recording the outcome of job {job.id} failed: {e}")
+
+    async def _heartbeat(self, job: Job):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await asyncio.to_thread(self._renew, job.id)
+            except sqlite3.Error as e:
+                logger.error(f"Renewing the lease of job {job.id} failed: {e}")
+
+    async def _run(self, job: Job):
+        handler = self._handlers.get(job.kind)
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        self._count("running")
+        started = time.perf_counter()
+        try:
+            if handler is None:
+                raise PermanentJobError(f"No handler registered for {job.kind} jobs")
+            result = await handler(job)
+        except asyncio.CancelledError:
+            # Shutting down: not the job's fault, so it keeps its attempt. Shielded so
+            # the cancellation that got us here cannot abandon the release halfway.
+            await asyncio.shield(asyncio.to_thread(self._release, job.id))
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}" if not isinstance(e, PermanentJobError) else str(e)
+            if isinstance(e, PermanentJobError) or job.attempts >= self.max_attempts:
+                logger.error(f"Job {job.id} ({job.kind}) failed after {job.attempts} attempts: {error}")
+                await asyncio.to_thread(self._fail, job.id, error, None)
+                self._count("failed")
+            else:
+                delay = getattr(e, "retry_after", None) or self.retry_base_seconds * 2 ** (job.attempts - 1)
+                logger.warning(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed, retrying in {delay:.1f}s: {error}")
+                await asyncio.to_thread(self._fail, job.id, error, time.time() + delay)
+                self._count("retried")
+        else:
+            await asyncio.to_thread(self._finish, job.id, result)
+            self._count("succeeded")
+            logger.info(f"Job {job.id} ({job.kind}) succeeded in {time.perf_counter() - started:.2f}s")
+        finally:
+            heartbeat.cancel()
+            self._count("running", -1)
+
+    def stats(self) -> Dict:
+        counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+        try:
+            conn = self._connect()
+            try:
+                for status, count in conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+                    counts[status] = count
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Job stats failed: {e}")
+        with self._lock:
+            return {
+                "workers": len(self._tasks),
+                "running_here": self.running,
+                "queued": counts[QUEUED],
+                "running": counts[RUNNING],
+                "stored_succeeded": counts[SUCCEEDED],
+                "stored_failed": counts[FAILED],
+                "enqueued": self.enqueued,
+                "coalesced": self.coalesced,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "retried": self.retried,
+                "recovered": self.recovered,
+            }
+
+
+jobs = JobQueue()
@@ -0,0 +1,137 @@
+"""
+Incremental JSON parsing for streamed LLM responses.
+
+The parser is fed the model output chunk by chunk and reports each top-level
+field of the response object as soon as its value is complete. Arrays listed
+in stream_arrays additionally report every element as soon as that element
+closes, so a long "sections" list can be rendered one section at a time.
+"""
+
+import json
+from typing import Any, Iterable, List, NamedTuple, Optional
+
+_WHITESPACE = " \t\r\n"
+
+
+class JSONEvent(NamedTuple):
+    key: str
+    # Position within a streamed array, None for a completed top-level field
+    index: Optional[int]
+    value: Any
+
+
+class IncrementalJSONParser:
+    """Character-level scanner over a single top-level JSON object."""
+
+    def __init__(self, stream_arrays: Iterable[str] = ()):
+        self.stream_arrays = set(stream_arrays)
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        # Top-level object state
+        self._expect = "key"
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+        # Streamed array state
+        self._streaming = False
+        self._elem_start: Optional[int] = None
+        self._elem_index = 0
+        self.done = False
+
+    def feed(self, chunk: str) -> List[JSONEvent]:
+        """Consume the next chunk and return the events it completed."""
+        events: List[JSONEvent] = []
+        self._buf += chunk
+        buf = self._buf
+
+        for i in range(self._pos, len(buf)):
+            if self.done:
+                break
+            c = buf[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._on_string_end(i, events)
+                continue
+
+            if self._depth == 0:
+                # Skip anything before the opening brace
+                if c == "{":
+                    self._depth = 1
+                    self._expect = "key"
+                continue
+
+            if self._streaming and self._depth == 2 and self._elem_start is None and c not in _WHITESPACE + ",]":
+                self._elem_start = i
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c in "{[":
+                self._depth += 1
+                if self._depth == 2 and c == "[" and self._key in self.stream_arrays:
+                    self._streaming = True
+                    self._elem_index = 0
+            elif c in "}]":
+                if self._depth == 1 and self._value_start is not None:
+                    self._emit_value(buf[self._value_start:i], events)
+                if self._depth == 2 and self._streaming and c == "]" and self._elem_start is not None:
+                    self._emit_element(buf[self._elem_start:i], events)
+
+                self._depth -= 1
+                if self._depth == 2 and self._streaming and self._elem_start is not None:
+                    self._emit_element(buf[self._elem_start:i + 1], events)
+                elif self._depth == 1 and self._value_start is not None:
+                    self._emit_value(buf[self._value_start:i + 1], events)
+                    self._streaming = False
+                elif self._depth == 0:
+                    self.done = True
+            elif c == ",":
+                if self._depth == 1:
+                    if self._value_start is not None:
+                        self._emit_value(buf[self._value_start:i], events)
+                    self._expect = "key"
+                elif self._depth == 2 and self._streaming and self._elem_start is not None:
+                    self._emit_element(buf[self._elem_start:i], events)
+            elif c == ":" and self._depth == 1 and self._expect == "colon":
+                self._expect = "value"
+                self._value_start = i + 1
+
+        self._pos = len(buf)
+        return events
+
+    def _on_string_end(self, i: int, events: List[JSONEvent]):
+        if self._depth == 1:
+            if self._expect == "key":
+                self._key = json.loads(self._buf[self._string_start:i + 1])
+                self._expect = "colon"
+            elif self._expect == "value" and self._value_start is not None:
+                self._emit_value(self._buf[self._value_start:i + 1], events)
+        elif self._depth == 2 and self._streaming and self._elem_start == self._string_start:
+            self._emit_element(self._buf[self._elem_start:i + 1], events)
+
+    def _emit_value(self, text: str, events: List[JSONEvent]):
+        self._value_start = None
+        self._expect = "comma"
+        try:
+            events.append(JSONEvent(self._key, None, json.loads(text)))
+        except json.JSONDecodeError:
+            # Malformed field: leave it to the final full-document parse
+            pass
+
+    def _emit_element(self, text: str, events: List[JSONEvent]):
+        self._elem_start = None
+        index = self._elem_index
+        self._elem_index += 1
+        try:
+            events.append(JSONEvent(self._key, index, json.loads(text)))
+        except json.JSONDecodeError:
+            pass
@@ -0,0 +1,203 @@
+"""
+Shared async LLM client.
+
+Every chat-completion call in the backend goes through this module. One
+AsyncOpenAI client is kept per event loop so HTTP connections stay alive
+between requests, a semaphore bounds how many calls are in flight at once,
+and each call carries its own timeout. Before taking a concurrency slot,
+every call is admitted by the rate-limiting LLMScheduler.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import weakref
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional
+
+from llm_scheduler import LLMScheduler, estimate_tokens
+
+if TYPE_CHECKING:
+    import openai
+
+logger = logging.getLogger(__name__)
+
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o")
+# Point at fake_llm_server.py (e.g. http://127.0.0.1:9000/v1) for load tests
+LLM_BASE_URL = os.getenv("OPENAI_BASE_URL")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "16"))
+LLM_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "60"))
+
+
+class _LoopResources:
+    """Client, scheduler and concurrency gate bound to a single event loop."""
+
+    def __init__(self):
+        self.client: Optional["openai.AsyncOpenAI"] = None
+        self.scheduler = LLMScheduler()
+        self.semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        self.in_flight = 0
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """Hold one of the LLM_MAX_CONCURRENCY concurrency slots."""
+        async with self.semaphore:
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+    def get_client(self) -> "openai.AsyncOpenAI":
+        if self.client is None:
+            # openai takes about a second to import, so it is loaded on the first call
+            import httpx
+            import openai
+
+            http_client = openai.DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONCURRENCY,
+                    max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=LLM_KEEPALIVE_EXPIRY_SECONDS,
+                )
+            )
+            self.client = openai.AsyncOpenAI(
+                api_key=os.environ.get("OPENAI_API_KEY"),
+                base_url=LLM_BASE_URL,
+                http_client=http_client,
+            )
+        return self.client
+
+
+# httpx clients and semaphores cannot be shared across event loops, so scripts
+# that call the sync wrappers (asyncio.run per call) get their own resources.
+_resources: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopResources]" = weakref.WeakKeyDictionary()
+
+
+def _get_resources() -> _LoopResources:
+    loop = asyncio.get_running_loop()
+    resources = _resources.get(loop)
+    if resources is None:
+        resources = _LoopResources()
+        _resources[loop] = resources
+    return resources
+
+
+def get_client() -> "openai.AsyncOpenAI":
+    """Return the process-wide async client for the running event loop."""
+    return _get_resources().get_client()
+
+
+def get_scheduler() -> LLMScheduler:
+    """Return the rate-limiting scheduler for the running event loop."""
+    return _get_resources().scheduler
+
+
+def _total_tokens(response) -> Optional[int]:
+    usage = getattr(response, "usage", None)
+    total = getattr(usage, "total_tokens", None)
+    return total if isinstance(total, int) else None
+
+
+async def chat_completion(
+    prompt: str,
+    temperature: float,
+    json_mode: bool = True,
+    timeout: Optional[float] = None,
+    model: str = LLM_MODEL,
+) -> str:
+    """
+    Run a single-message chat completion and return the message content.
+
+    Args:
+        prompt: User message sent to the model
+        temperature: Sampling temperature
+        json_mode: Request a JSON object response
+        timeout: Per-call timeout in seconds (defaults to LLM_TIMEOUT_SECONDS)
+        model: Model name
+
+    Returns:
+        Content of the first choice
+
+    Raises:
+        LLMOverloadedError: The scheduler could not admit the call in time
+    """
+    resources = _get_resources()
+    kwargs: Dict[str, Any] = {}
+    if json_mode:
+        kwargs["response_format"] = {"type": "json_object"}
+
+    tokens = estimate_tokens(prompt)
+    await resources.scheduler.acquire(tokens)
+    async with resources.slot():
+        response = await get_client().chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            timeout=timeout or LLM_TIMEOUT_SECONDS,
+            **kwargs
+        )
+    resources.scheduler.settle(tokens, _total_tokens(response))
+    return response.choices[0].message.content
+
+
+async def chat_json(prompt: str, temperature: float, timeout: Optional[float] = None, model: str = LLM_MODEL) -> Dict:
+    """Run a JSON-mode chat completion and decode the response."""
+    content = await chat_completion(prompt, temperature, json_mode=True, timeout=timeout, model=model)
+    return json.loads(content)
+
+
+async def stream_chat_completion(
+    prompt: str,
+    temperature: float,
+    json_mode: bool = True,
+    timeout: Optional[float] = None,
+    model: str = LLM_MODEL,
+) -> AsyncIterator[str]:
+    """
+    Stream a single-message chat completion, yielding content deltas as they arrive.
+
+    The concurrency slot is held until the stream is exhausted or closed.
+    """
+    resources = _get_resources()
+    kwargs: Dict[str, Any] = {}
+    if json_mode:
+        kwargs["response_format"] = {"type": "json_object"}
+
+    await resources.scheduler.acquire(estimate_tokens(prompt))
+    async with resources.slot():
+        stream = await get_client().chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            timeout=timeout or LLM_TIMEOUT_SECONDS,
+            stream=True,
+            **kwargs
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+
+
+def stats() -> Dict:
+    """Concurrency-slot usage of the client bound to the running loop."""
+    resources = _get_resources()
+    return {
+        "max_concurrency": LLM_MAX_CONCURRENCY,
+        "in_flight": resources.in_flight,
+        "utilization": round(resources.in_flight / LLM_MAX_CONCURRENCY, 2),
+    }
+
+
+async def aclose():
+    """Close the client bound to the running loop (called on app shutdown)."""
+    loop = asyncio.get_running_loop()
+    resources = _resources.pop(loop, None)
+    if resources is not None and resources.client is not None:
+        await resources.client.close()
@@ -0,0 +1,246 @@
+"""
+Rate-limited, prioritized admission for LLM calls.
+
+Every call made through llm_client first asks the scheduler for a slot. The
+scheduler keeps two token buckets sized from the provider limits, one for
+requests per minute and one for tokens per minute. Calls that fit the
+buckets go straight through. The rest wait in a priority queue, where
+authenticated interactive requests go ahead of anonymous ones and both go
+ahead of background work. A call whose estimated queue wait exceeds its
+deadline is rejected up front with LLMOverloadedError instead of timing out
+at the provider.
+"""
+
+import asyncio
+import collections
+import contextlib
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import time
+from enum import IntEnum
+from typing import Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LLM_RPM_LIMIT = float(os.getenv("LLM_RPM_LIMIT", "500"))
+LLM_TPM_LIMIT = float(os.getenv("LLM_TPM_LIMIT", "150000"))
+# Completion tokens assumed per call until the response reports actual usage
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "1000"))
+LLM_QUEUE_DEADLINE_SECONDS = float(os.getenv("LLM_QUEUE_DEADLINE_SECONDS", "30"))
+LLM_BACKGROUND_DEADLINE_SECONDS = float(os.getenv("LLM_BACKGROUND_DEADLINE_SECONDS", "600"))
+
+
+class Priority(IntEnum):
+    """Queue order for waiting calls; lower values are admitted first."""
+    AUTHENTICATED = 0
+    ANONYMOUS = 1
+    BACKGROUND = 2
+
+
+class LLMOverloadedError(Exception):
+    """Raised when an LLM call cannot be admitted before its deadline."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+_priority: contextvars.ContextVar = contextvars.ContextVar("llm_priority", default=Priority.ANONYMOUS)
+
+
+@contextlib.contextmanager
+def use_priority(priority: Priority):
+    """Run LLM calls made in this context (and tasks it spawns) at the given priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+def priority_for_user(user) -> Priority:
+    return Priority.AUTHENTICATED if user is not None else Priority.ANONYMOUS
+
+
+def estimate_tokens(prompt: str) -> int:
+    """Rough prompt size (about four characters per token) plus expected completion."""
+    return len(prompt) // 4 + LLM_EXPECTED_OUTPUT_TOKENS
+
+
+class TokenBucket:
+    """Continuously refilling bucket; the balance may go negative to record debt."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.balance = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.balance = min(self.capacity, self.balance + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def seconds_until(self, amount: float) -> float:
+        """Time until the balance covers amount, assuming nothing else is taken."""
+        # A single call larger than the whole bucket is admitted once it is full
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.balance) / self.rate)
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "tokens", "future", "enqueued")
+
+    def __init__(self, priority: Priority, seq: int, tokens: int, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.future = future
+        self.enqueued = time.monotonic()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class LLMScheduler:
+    """Token-bucket admission with a priority queue, bound to one event loop."""
+
+    def __init__(self, rpm_limit: float = LLM_RPM_LIMIT, tpm_limit: float = LLM_TPM_LIMIT):
+        self.requests = TokenBucket(rpm_limit)
+        self.tokens = TokenBucket(tpm_limit)
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        # Metrics
+        self.admitted = 0
+        self.shed = 0
+        self.max_queue_depth = 0
+        self.wait_ms: Deque[float] = collections.deque(maxlen=1000)
+
+    def _fits(self, tokens: int) -> bool:
+        return self.requests.seconds_until(1) == 0 and self.tokens.seconds_until(tokens) == 0
+
+    def _take(self, tokens: int):
+        self.requests.balance -= 1
+        self.tokens.balance -= tokens
+
+    def _estimated_wait(self, priority: Priority, tokens: int) -> float:
+        """Seconds until a new call at this priority would be admitted, if nothing else arrives."""
+        ahead = [w for w in self._queue if w.priority <= priority]
+        request_wait = self.requests.seconds_until(len(ahead) + 1)
+        token_wait = self.tokens.seconds_until(sum(w.tokens for w in ahead) + tokens)
+        return max(request_wait, token_wait)
+
+    def _dispatch(self):
+        """Admit queued calls in priority order while the buckets allow."""
+        self._wakeup = None
+        now = time.monotonic()
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        while self._queue:
+            head = self._queue[0]
+            if head.future.done():
+                heapq.heappop(self._queue)
+                continue
+            if not self._fits(head.tokens):
+                delay = max(self.requests.seconds_until(1), self.tokens.seconds_until(head.tokens))
+                self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._queue)
+            self._take(head.tokens)
+            head.future.set_result(None)
+
+    async def acquire(self, tokens: int, priority: Optional[Priority] = None, deadline: Optional[float] = None):
+        """
+        Wait for budget to make one call.
+
+        Args:
+            tokens: Estimated total tokens (prompt plus completion) of the call
+            priority: Queue priority (defaults to the priority of the current context)
+            deadline: Longest acceptable queue wait in seconds
+
+        Raises:
+            LLMOverloadedError: The call would wait longer than its deadline
+        """
+        priority = current_priority() if priority is None else priority
+        if deadline is None:
+            deadline = LLM_BACKGROUND_DEADLINE_SECONDS if priority == Priority.BACKGROUND else LLM_QUEUE_DEADLINE_SECONDS
+
+        now = time.monotonic()
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        if not self._queue and self._fits(tokens):
+            self._take(tokens)
+            self.admitted += 1
+            self.wait_ms.append(0.0)
+            return
+
+        estimated = self._estimated_wait(priority, tokens)
+        if estimated > deadline:
+            self.shed += 1
+            logger.warning(f"Shedding LLM call: estimated queue wait {estimated:.1f}s exceeds {deadline:.0f}s")
+            raise LLMOverloadedError(
+                "The AI service is busy right now. Please try again shortly.", retry_after=estimated
+            )
+
+        waiter = _Waiter(priority, next(self._seq), tokens, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, waiter)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+        if self._queue[0] is waiter and self._wakeup is not None:
+            # The pending wakeup was timed for the previous head
+            self._wakeup.cancel()
+            self._wakeup = None
+        if self._wakeup is None:
+            self._dispatch()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=deadline)
+        except asyncio.TimeoutError:
+            waiter.future.cancel()
+            self.shed += 1
+            raise LLMOverloadedError(
+                "The AI service is busy right now. Please try again shortly.",
+                retry_after=self._estimated_wait(priority, tokens)
+            )
+        except asyncio.CancelledError:
+            waiter.future.cancel()
+            raise
+        finally:
+            # A waiter leaving from the head may unblock the ones behind it
+            if self._wakeup is None and self._queue:
+                self._dispatch()
+
+        self.admitted += 1
+        self.wait_ms.append((time.monotonic() - waiter.enqueued) * 1000)
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Correct the token bucket once the response reports its real usage."""
+        if actual_tokens is not None:
+            self.tokens.balance -= actual_tokens - estimated_tokens
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        waits = sorted(self.wait_ms)
+        depth_by_priority = collections.Counter(
+            w.priority.name.lower() for w in self._queue if not w.future.done()
+        )
+        return {
+            "queue_depth": sum(depth_by_priority.values()),
+            "queue_depth_by_priority": dict(depth_by_priority),
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "wait_ms_p50": round(waits[len(waits) // 2], 1) if waits else 0.0,
+            "wait_ms_p95": round(waits[int(len(waits) * 0.95)], 1) if waits else 0.0,
+            "wait_ms_max": round(waits[-1], 1) if waits else 0.0,
+            "rpm_available": round(self.requests.balance, 1),
+            "tpm_available": round(self.tokens.balance),
+        }
@@ -0,0 +1,301 @@
+"""
+Load driver for the resume tailoring API.
+
+Fires a fixed number of requests per endpoint at a configurable concurrency
+and reports p50/p95/p99 latency, throughput and error counts. Run it against
+a backend pointed at fake_llm_server.py to measure the pipeline itself:
+
+    python fake_llm_server.py --port 9000 &
+    OPENAI_BASE_URL=http://127.0.0.1:9000/v1 OPENAI_API_KEY=fake uvicorn main:app --port 8000 &
+    python load_test.py --endpoints analyze generate fetch-jd --requests 200 --concurrency 20 \\
+        --job-url http://127.0.0.1:9000/jobs/{i}
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import httpx
+
+ENDPOINTS = ("analyze", "analyze-stream", "generate", "fetch-jd")
+
+# /analyze queues a job; how often its status is checked
+JOB_POLL_SECONDS = 0.25
+
+DEFAULT_JOB_DESCRIPTION = """Senior Backend Engineer
+We are hiring a Senior Backend Engineer to design Python services on AWS, own CI/CD pipelines and
+run Kubernetes workloads. Requirements: Python, SQL, distributed systems, FastAPI and PostgreSQL."""
+
+DEFAULT_RESUME_LINES = [
+    "Jane Doe",
+    "jane@example.com",
+    "SUMMARY",
+    "Backend engineer with 8 years of experience building web services.",
+    "EXPERIENCE",
+    "Senior Engineer, Acme Payments (2019 - 2024)",
+    "Built payment APIs in Java used by 2M customers.",
+    "Maintained CI pipelines on Jenkins.",
+    "SKILLS",
+    "Java, SQL, Docker",
+    "EDUCATION",
+    "BSc Computer Science",
+]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of samples (0 for an empty list)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class EndpointStats:
+    """Latencies and outcomes collected for one endpoint."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies_ms: List[float] = []
+        self.first_event_ms: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self.wall_seconds = 0.0
+
+    def record(self, started: float, error: Optional[str] = None):
+        self.latencies_ms.append((time.perf_counter() - started) * 1000)
+        if error:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def summary(self) -> Dict:
+        count = len(self.latencies_ms)
+        summary = {
+            "endpoint": self.name,
+            "requests": count,
+            "errors": sum(self.errors.values()),
+            "error_breakdown": self.errors,
+            "throughput_rps": round(count / self.wall_seconds, 2) if self.wall_seconds else 0.0,
+            "p50_ms": round(percentile(self.latencies_ms, 50), 1),
+            "p95_ms": round(percentile(self.latencies_ms, 95), 1),
+            "p99_ms": round(percentile(self.latencies_ms, 99), 1),
+        }
+        if self.first_event_ms:
+            summary["first_event_p50_ms"] = round(percentile(self.first_event_ms, 50), 1)
+            summary["first_event_p95_ms"] = round(percentile(self.first_event_ms, 95), 1)
+        return summary
+
+
+def make_resume_pdf(path: str):
+    """Write a small single-page resume PDF (PyMuPDF ships with pdf2docx)."""
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf
+
+    doc = pymupdf.open()
+    page = doc.new_page()
+    y = 72
+    for line in DEFAULT_RESUME_LINES:
+        page.insert_text((72, y), line, fontsize=11)
+        y += 18
+    doc.save(path)
+    doc.close()
+
+
+async def login(client: httpx.AsyncClient) -> Dict[str, str]:
+    """Register a throwaway user so the anonymous daily limit does not apply."""
+    email = f"loadtest_{uuid.uuid4().hex[:12]}@example.com"
+    password = "LoadTest123!"
+    response = await client.post("/auth/register", json={"email": email, "password": password})
+    if response.status_code != 200:
+        response = await client.post("/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, headers: Dict[str, str], args: argparse.Namespace):
+        self.client = client
+        self.headers = headers
+        self.args = args
+        with open(args.resume, "rb") as f:
+            self.resume_bytes = f.read()
+        # /generate writes <handle>_tailored.docx, so concurrent requests each
+        # need their own handle or they overwrite each other's output
+        self.generate_payloads: Optional[asyncio.Queue] = None
+
+    def _analyze_form(self):
+        files = {"resume": (os.path.basename(self.args.resume), self.resume_bytes, "application/pdf")}
+        data = {"job_description": self.args.job_description, "bypass_cache": str(not self.args.use_cache).lower()}
+        return files, data
+
+    async def run_analysis(self) -> Dict:
+        """Queue an analysis and wait for its job; returns the job as GET /jobs/{id} reports it."""
+        files, data = self._analyze_form()
+        response = await self.client.post("/analyze", headers=self.headers, files=files, data=data)
+        response.raise_for_status()
+        status_url = response.json()["status_url"]
+        while True:
+            response = await self.client.get(status_url, headers=self.headers)
+            response.raise_for_status()
+            job = response.json()
+            if job["status"] in ("succeeded", "failed"):
+                return job
+            await asyncio.sleep(JOB_POLL_SECONDS)
+
+    async def analyze(self, i: int, stats: EndpointStats):
+        started = time.perf_counter()
+        try:
+            job = await self.run_analysis()
+            stats.record(started, None if job["status"] == "succeeded" else "job failed")
+        except httpx.HTTPStatusError as e:
+            stats.record(started, f"HTTP {e.response.status_code}")
+        except httpx.HTTPError as e:
+            stats.record(started, type(e).__name__)
+
+    async def analyze_stream(self, i: int, stats: EndpointStats):
+        files, data = self._analyze_form()
+        started = time.perf_counter()
+        error = None
+        first_event = True
+        try:
+            async with self.client.stream(
+                "POST", "/analyze/stream", headers=self.headers, files=files, data=data
+            ) as response:
+                if response.status_code != 200:
+                    error = f"HTTP {response.status_code}"
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    # Status events arrive before any analysis output, so they don't count
+                    if first_event and event.get("event") not in (None, "status"):
+                        stats.first_event_ms.append((time.perf_counter() - started) * 1000)
+                        first_event = False
+                    if event.get("event") == "error":
+                        error = "stream error"
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        stats.record(started, error)
+
+    async def prepare_generate(self):
+        """Analyses provide the file handles and edits that /generate replays, one per concurrent slot."""
+        async def analyze_once() -> Dict:
+            job = await self.run_analysis()
+            if job["status"] != "succeeded":
+                raise RuntimeError(f"Analysis job failed: {job['error']}")
+            body = job["result"]
+            return {"filename": body["filename"], "sections": body["sections"]}
+
+        slots = min(self.args.concurrency, self.args.requests)
+        self.generate_payloads = asyncio.Queue()
+        for payload in await asyncio.gather(*(analyze_once() for _ in range(slots))):
+            self.generate_payloads.put_nowait(payload)
+
+    async def generate(self, i: int, stats: EndpointStats):
+        payload = await self.generate_payloads.get()
+        started = time.perf_counter()
+        try:
+            response = await self.client.post("/generate", json=payload)
+            body = response.json() if response.status_code == 200 else {}
+            stats.record(started, None if response.status_code == 200 and "error" not in body
+                         else f"HTTP {response.status_code}")
+        except httpx.HTTPError as e:
+            stats.record(started, type(e).__name__)
+        finally:
+            self.generate_payloads.put_nowait(payload)
+
+    async def fetch_jd(self, i: int, stats: EndpointStats):
+        started = time.perf_counter()
+        try:
+            response = await self.client.post("/fetch-jd", data={"url": self.args.job_url.format(i=i)})
+            body = response.json() if response.status_code == 200 else {}
+            failed = response.status_code != 200 or str(body.get("job_description", "")).startswith("Error fetching JD")
+            stats.record(started, f"HTTP {response.status_code}" if failed else None)
+        except httpx.HTTPError as e:
+            stats.record(started, type(e).__name__)
+
+    async def run_endpoint(self, name: str) -> EndpointStats:
+        stats = EndpointStats(name)
+        if name == "generate" and self.generate_payloads is None:
+            await self.prepare_generate()
+        handler = {
+            "analyze": self.analyze,
+            "analyze-stream": self.analyze_stream,
+            "generate": self.generate,
+            "fetch-jd": self.fetch_jd,
+        }[name]
+
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+
+        async def one(i: int):
+            async with semaphore:
+                await handler(i, stats)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(self.args.requests)))
+        stats.wall_seconds = time.perf_counter() - started
+        return stats
+
+
+def print_report(summaries: List[Dict]):
+    header = f"{'endpoint':<16}{'reqs':>7}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for s in summaries:
+        print(f"{s['endpoint']:<16}{s['requests']:>7}{s['errors']:>8}{s['throughput_rps']:>9}"
+              f"{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}")
+        if "first_event_p50_ms" in s:
+            print(f"{'  first event':<40}{s['first_event_p50_ms']:>10}{s['first_event_p95_ms']:>10}")
+        for error, count in s["error_breakdown"].items():
+            print(f"  {error}: {count}")
+
+
+async def main_async(args: argparse.Namespace) -> List[Dict]:
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits) as client:
+        headers = await login(client)
+        test = LoadTest(client, headers, args)
+        summaries = []
+        for name in args.endpoints:
+            stats = await test.run_endpoint(name)
+            summaries.append(stats.summary())
+        return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the resume tailoring API")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=["analyze"])
+    parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--resume", help="Resume PDF to upload (a sample one is generated by default)")
+    parser.add_argument("--job-description", default=DEFAULT_JOB_DESCRIPTION)
+    parser.add_argument("--job-url", default="http://127.0.0.1:9000/jobs/{i}",
+                        help="URL posted to /fetch-jd; {i} is replaced with the request number")
+    parser.add_argument("--use-cache", action="store_true", help="Allow cached analyses to be served")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    if not args.resume:
+        args.resume = "loadtest_resume.pdf"
+        make_resume_pdf(args.resume)
+
+    summaries = asyncio.run(main_async(args))
+    print_report(summaries)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(summaries, f, indent=2)
+
+    return 1 if any(s["errors"] for s in summaries) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import os
+import asyncio
 import logging
 from dotenv import load_dotenv
 
@@ -17,7 +18,10 @@ from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from database import init_db
-from routers import auth, applications, resume, survey
+from routers import auth, applications, resume, survey, metrics, jobs
+from llm_scheduler import LLMOverloadedError
+from executors import ExecutorSaturatedError
+from uploads import UploadError
 import uvicorn
 
 app = FastAPI()
@@ -30,6 +34,32 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"message": "Internal Server Error", "detail": str(exc)},
     )
 
+@app.exception_handler(LLMOverloadedError)
+async def llm_overloaded_handler(request: Request, exc: LLMOverloadedError):
+    logger.warning(f"LLM overloaded on {request.url.path}: retry after {exc.retry_after:.0f}s")
+    return JSONResponse(
+        status_code=503,
+        content={"message": "Service Busy", "detail": str(exc)},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+    )
+
+@app.exception_handler(ExecutorSaturatedError)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturatedError):
+    logger.warning(f"Executor saturated on {request.url.path}: retry after {exc.retry_after:.0f}s")
+    return JSONResponse(
+        status_code=503,
+        content={"message": "Service Busy", "detail": str(exc)},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+    )
+
+@app.exception_handler(UploadError)
+async def upload_error_handler(request: Request, exc: UploadError):
+    logger.warning(f"Rejected upload on {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"message": "Upload Rejected", "detail": str(exc)},
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -43,6 +73,8 @@ app.include_router(auth.router)
 app.include_router(applications.router)
 app.include_router(resume.router)
 app.include_router(survey.router)
+app.include_router(metrics.router)
+app.include_router(jobs.router)
 
 @app.on_event("startup")
 def on_startup():
@@ -69,18 +101,45 @@ def on_startup():
         id='temp_file_cleanup',
         replace_existing=True
     )
+    from job_queue import jobs as job_queue
+    scheduler.add_job(
+        job_queue.purge,
+        'interval',
+        hours=6,
+        id='finished_job_purge',
+        replace_existing=True
+    )
     scheduler.start()
     logger.info("Scheduled temp file cleanup every 6 hours")
+
+    # Jobs left by a previous run are picked up once their leases run out
+    job_queue.start()
     
     # Store scheduler in app state for shutdown
     app.state.scheduler = scheduler
 
 @app.on_event("shutdown")
-def on_shutdown():
+async def on_shutdown():
     """Cleanup on application shutdown."""
     if hasattr(app.state, 'scheduler'):
         app.state.scheduler.shutdown()
         logger.info("Scheduler shut down successfully")
 
+    import llm_client
+    await llm_client.aclose()
+
+    import telemetry
+    await asyncio.to_thread(telemetry.flush)
+
+    # Before the pool: running jobs are put back in the queue rather than failed by it
+    from job_queue import jobs as job_queue
+    await job_queue.stop()
+
+    import conversion_pool
+    conversion_pool.pool.shutdown()
+
+    import executors
+    executors.shutdown()
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,70 +1,140 @@
-from pdf2docx import Converter
-from docx2pdf import convert
-import pythoncom
-from docx import Document
+# pdf2docx, PyMuPDF, docx2pdf and the Windows-only pythoncom are imported
+# where they are used so that importing this module stays cheap
 from docx.oxml.ns import qn
 
+import conversion_pool
+from conversion_cache import conversions
+from doc_cache import documents, file_sha256
+from docx_package import DOCUMENT_PART, DocxPackage
+from executors import file_io
+
+# Flow properties that pin paragraphs to page positions in converted PDFs
+_RESTRICTIVE_FLOW_PROPERTIES = ('w:pageBreakBefore', 'w:keepNext', 'w:keepLines')
+
+
+def _clean_para(p):
+    # Reset restrictive flow properties
+    pPr = p.find(qn('w:pPr'))
+    if pPr is not None:
+        for tag in _RESTRICTIVE_FLOW_PROPERTIES:
+            prop = pPr.find(qn(tag))
+            if prop is not None and prop.get(qn('w:val'), 'true') not in ('0', 'false', 'off'):
+                prop.set(qn('w:val'), '0')
+
+    # Remove manual breaks (<w:br>) in runs
+    for br in p.findall(f"{qn('w:r')}/{qn('w:br')}"):
+        br.getparent().remove(br)
+
+
 def sanitize_docx_layout(docx_path: str):
     """
     Removes manual page breaks, section breaks, and restrictive paragraph properties 
     to allow content to flow naturally.
+
+    Works on word/document.xml directly; every other part of the package is
+    copied through unchanged. The cleaned package stays in the parsed-document
+    cache, so analysis and generation do not parse the file again.
     """
-    doc = Document(docx_path)
-    
-    def clean_para(para):
-        # Reset restrictive flow properties
-        if para.paragraph_format.page_break_before:
-            para.paragraph_format.page_break_before = False
-        if para.paragraph_format.keep_with_next:
-            para.paragraph_format.keep_with_next = False
-        if para.paragraph_format.keep_together:
-            para.paragraph_format.keep_together = False
-            
-        # Remove manual breaks (<w:br>) in runs
-        for run in para.runs:
-            if 'lastRenderedPageBreak' in run._element.xml:
-                pass
-            brs = run._element.findall(qn('w:br'))
-            for br in brs:
-                run._element.remove(br)
+    package = DocxPackage(docx_path)
+    body = package.xml_part(DOCUMENT_PART).find(qn('w:body'))
 
     # 1. Clean Main Document Paragraphs
-    for para in doc.paragraphs:
-        clean_para(para)
-        
+    for p in body.findall(qn('w:p')):
+        _clean_para(p)
+
         # Remove Section Breaks (w:sectPr) stored in paragraph properties
         # This effectively merges sections into a continuous flow
-        if para._element.pPr is not None:
-            sectPr = para._element.pPr.find(qn('w:sectPr'))
+        pPr = p.find(qn('w:pPr'))
+        if pPr is not None:
+            sectPr = pPr.find(qn('w:sectPr'))
             if sectPr is not None:
-                para._element.pPr.remove(sectPr)
-
-    # 2. Clean Tables (Recursively clean paragraphs in cells)
-    for table in doc.tables:
-        for row in table.rows:
-            # Table rows also have height properties that might cause splits
-            # We can't easily reset trHeight without low-level access, usually okay.
-            for cell in row.cells:
-                for para in cell.paragraphs:
-                    clean_para(para)
-                
-                # Check for nested tables? python-docx only goes one level deep easily 
-                # but usually pdf2docx doesn't nest deeply.
-                
-    doc.save(docx_path)
-
-def pdf_to_docx(pdf_path: str) -> str:
+                pPr.remove(sectPr)
+
+    # 2. Clean Tables (paragraphs in the cells of top-level tables)
+    for p in body.iterfind(f"{qn('w:tbl')}/{qn('w:tr')}/{qn('w:tc')}/{qn('w:p')}"):
+        _clean_para(p)
+
+    package.mark_changed(DOCUMENT_PART)
+    package.write(docx_path)
+    documents.put(docx_path, package)
+
+def extract_text_from_pdf(pdf_path: str, content_hash: str = None) -> str:
+    """
+    Text of every page, read directly with PyMuPDF (the engine pdf2docx is
+    built on) in a fraction of the time a full DOCX conversion takes.
+
+    Lines follow reading order, top to bottom and left to right, and blank
+    lines are dropped. The text is close to, but not always identical with,
+    what the converted DOCX yields: ligatures, hyphenation and bullet glyphs
+    can differ (see edit_engine.reconcile_edits).
+
+    Args:
+        pdf_path: Uploaded PDF
+        content_hash: SHA-256 of the PDF if already known; keys the conversion cache
+    """
+    import pymupdf
+
+    digest = content_hash or file_sha256(pdf_path)
+    cached = conversions.pdf_text(digest)
+    if cached is not None:
+        return cached
+
+    lines = []
+    with pymupdf.open(pdf_path) as pdf:
+        for page in pdf:
+            lines.extend(line.rstrip() for line in page.get_text("text", sort=True).splitlines() if line.strip())
+    text = "\n".join(lines)
+    conversions.store_pdf_text(digest, text)
+    return text
+
+def pdf_to_docx(pdf_path: str, content_hash: str = None) -> str:
+    """
+    Convert the PDF to a sanitized DOCX next to it on the conversion pool
+    (see conversion_pool), blocking the calling thread until it is done.
+    A PDF converted before is served from the conversion cache instead.
+
+    Args:
+        pdf_path: Uploaded PDF
+        content_hash: SHA-256 of the PDF if already known; keys the conversion cache
+
+    Returns:
+        Path of the DOCX
+    """
     docx_path = pdf_path.replace(".pdf", ".docx")
-    cv = Converter(pdf_path)
-    cv.convert(docx_path, start=0, end=None)
-    cv.close()
+    digest = content_hash or file_sha256(pdf_path)
+    if conversions.fetch_docx(digest, docx_path):
+        return docx_path
+
+    conversion_pool.pool.convert(pdf_path, docx_path)
     
     # Sanitize immediately after conversion
     sanitize_docx_layout(docx_path)
+    conversions.store_docx(digest, docx_path)
     
     return docx_path
 
+async def pdf_to_docx_async(pdf_path: str, content_hash: str = None) -> str:
+    """
+    pdf_to_docx for the event loop: the conversion runs on the pool's worker
+    processes while one of the pool's waiter threads waits for them, and
+    hashing, cache I/O and sanitizing run on the file_io pool, so the loop
+    is never blocked. Cancelling the awaiting task kills the conversion.
+    """
+    docx_path = pdf_path.replace(".pdf", ".docx")
+    digest = content_hash or await file_io.run(file_sha256, pdf_path)
+    if await file_io.run(conversions.fetch_docx, digest, docx_path):
+        return docx_path
+
+    await conversion_pool.pool.convert_async(pdf_path, docx_path)
+    # Sanitizing is quick and seeds the parsed-document cache of this process
+    await file_io.run(sanitize_docx_layout, docx_path)
+    await file_io.run(conversions.store_docx, digest, docx_path)
+    return docx_path
+
 def docx_to_pdf(docx_path: str) -> str:
+    import pythoncom
+    from docx2pdf import convert
+
     # Initialize COM library for Windows
     pythoncom.CoInitialize()
     pdf_path = docx_path.replace(".docx", ".pdf")
@@ -0,0 +1,215 @@
+"""
+Early previews of uploaded resumes.
+
+/analyze only answers once the whole PDF is converted and analyzed, so the
+upload step had nothing to show until then. POST /preview takes the PDF as
+soon as it is picked and starts a Preview:
+
+- The page count and the first page as HTML come straight from PyMuPDF,
+  in milliseconds, before the endpoint returns.
+- Page thumbnails are rasterized by PyMuPDF when first requested and kept
+  in a small LRU keyed by upload hash.
+- In the background, the first page alone is converted to DOCX on the
+  conversion pool (pdf2docx's page range), then the whole document. The
+  full conversion lands in the conversion cache, so analyzing the same PDF
+  afterwards does not convert it again.
+
+The frontend polls GET /preview/{token} until the document is ready.
+Previews are only touched from the event loop, so the store needs no lock.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import conversion_pool
+from conversion_cache import conversions
+from executors import file_io
+from pdf_handler import pdf_to_docx_async
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_TTL_SECONDS = float(os.getenv("PREVIEW_TTL_SECONDS", "1800"))
+PREVIEW_MAX_ENTRIES = int(os.getenv("PREVIEW_MAX_ENTRIES", "256"))
+PREVIEW_THUMBNAIL_WIDTH = int(os.getenv("PREVIEW_THUMBNAIL_WIDTH", "480"))
+PREVIEW_THUMBNAIL_CACHE = int(os.getenv("PREVIEW_THUMBNAIL_CACHE", "128"))
+
+
+class PreviewError(Exception):
+    """Raised when an upload cannot be previewed as a PDF."""
+
+
+def _inspect(pdf_path: str) -> Tuple[int, str]:
+    """Page count and first-page HTML of a PDF."""
+    import pymupdf
+
+    try:
+        pdf = pymupdf.open(pdf_path, filetype="pdf")
+    except Exception as e:
+        raise PreviewError(f"Not a readable PDF: {e}")
+    with pdf:
+        if pdf.needs_pass:
+            raise PreviewError("PDF is password protected")
+        if len(pdf) == 0:
+            raise PreviewError("PDF has no pages")
+        # Images would be inlined as base64; the thumbnails already show them
+        html = pdf[0].get_text("html", flags=pymupdf.TEXTFLAGS_HTML & ~pymupdf.TEXT_PRESERVE_IMAGES)
+        return len(pdf), html
+
+
+def render_thumbnail(pdf_path: str, page_number: int, width: int = PREVIEW_THUMBNAIL_WIDTH) -> bytes:
+    """
+    Rasterize one page of a PDF to PNG.
+
+    Args:
+        pdf_path: Source PDF
+        page_number: 1-based page number
+        width: Width of the image in pixels
+
+    Returns:
+        PNG bytes
+    """
+    import pymupdf
+
+    with pymupdf.open(pdf_path) as pdf:
+        page = pdf[page_number - 1]
+        zoom = width / page.rect.width
+        return page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False).tobytes("png")
+
+
+class Preview:
+    """One uploaded PDF and the state of its background conversions."""
+
+    def __init__(self, token: str, pdf_path: str, content_hash: str, pages: int, first_page_html: str):
+        self.token = token
+        self.pdf_path = pdf_path
+        self.content_hash = content_hash
+        self.pages = pages
+        self.first_page_html = first_page_html
+        self.created = time.monotonic()
+        self.first_page_docx: Optional[str] = None
+        self.docx_path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.docx_path is not None or self.error is not None
+
+
+class PreviewStore:
+    """Live previews by token, plus an LRU of rendered thumbnails."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = PREVIEW_TTL_SECONDS,
+        max_entries: int = PREVIEW_MAX_ENTRIES,
+        thumbnail_cache: int = PREVIEW_THUMBNAIL_CACHE,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.thumbnail_cache = thumbnail_cache
+        self._previews: "OrderedDict[str, Preview]" = OrderedDict()
+        self._thumbnails: "OrderedDict[Tuple[str, int, int], bytes]" = OrderedDict()
+        self.started = 0
+        self.expired = 0
+        self.thumbnail_hits = 0
+        self.thumbnail_misses = 0
+
+    async def start(self, pdf_path: str, content_hash: str) -> Preview:
+        """
+        Open an uploaded PDF for previewing and start converting it in the background.
+
+        Args:
+            pdf_path: Uploaded PDF
+            content_hash: SHA-256 of the upload
+
+        Raises:
+            PreviewError: The upload is not a PDF PyMuPDF can open
+            ExecutorSaturatedError: The file_io pool is saturated
+        """
+        pages, html = await file_io.run(_inspect, pdf_path)
+        preview = Preview(uuid.uuid4().hex, pdf_path, content_hash, pages, html)
+
+        self._expire()
+        self._previews[preview.token] = preview
+        while len(self._previews) > self.max_entries:
+            _, oldest = self._previews.popitem(last=False)
+            self._drop(oldest)
+        self.started += 1
+
+        preview.task = asyncio.create_task(self._convert(preview))
+        return preview
+
+    async def _convert(self, preview: Preview):
+        started = time.perf_counter()
+        try:
+            # A PDF converted before is served whole from the cache; skip the first-page pass
+            cached = await file_io.run(conversions.has_docx, preview.content_hash)
+            if not cached and preview.pages > 1:
+                first_page_docx = preview.pdf_path.replace(".pdf", "_page1.docx")
+                await conversion_pool.pool.convert_async(preview.pdf_path, first_page_docx, start=0, end=1)
+                preview.first_page_docx = first_page_docx
+                logger.info(f"First page of {os.path.basename(preview.pdf_path)} ready in {time.perf_counter() - started:.2f}s")
+            preview.docx_path = await pdf_to_docx_async(preview.pdf_path, preview.content_hash)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Preview conversion failed for {preview.pdf_path}: {e}")
+            preview.error = str(e)
+
+    def get(self, token: str) -> Optional[Preview]:
+        self._expire()
+        return self._previews.get(token)
+
+    async def thumbnail(self, preview: Preview, page_number: int, width: int = PREVIEW_THUMBNAIL_WIDTH) -> bytes:
+        """PNG of one page of a preview, rendered off the event loop on first request."""
+        key = (preview.content_hash, page_number, width)
+        image = self._thumbnails.get(key)
+        if image is not None:
+            self._thumbnails.move_to_end(key)
+            self.thumbnail_hits += 1
+            return image
+
+        self.thumbnail_misses += 1
+        image = await file_io.run(render_thumbnail, preview.pdf_path, page_number, width)
+        self._thumbnails[key] = image
+        while len(self._thumbnails) > self.thumbnail_cache:
+            self._thumbnails.popitem(last=False)
+        return image
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._previews:
+            token, oldest = next(iter(self._previews.items()))
+            if oldest.created > cutoff:
+                break
+            del self._previews[token]
+            self._drop(oldest)
+            self.expired += 1
+
+    @staticmethod
+    def _drop(preview: Preview):
+        # The files stay for cleanup.py; only a conversion nobody can poll any more is stopped
+        if preview.task is not None and not preview.task.done():
+            preview.task.cancel()
+
+    def stats(self) -> Dict:
+        lookups = self.thumbnail_hits + self.thumbnail_misses
+        return {
+            "previews": len(self._previews),
+            "started": self.started,
+            "expired": self.expired,
+            "converting": sum(1 for preview in self._previews.values() if not preview.done),
+            "thumbnails_cached": len(self._thumbnails),
+            "thumbnail_hits": self.thumbnail_hits,
+            "thumbnail_misses": self.thumbnail_misses,
+            "thumbnail_hit_rate": round(self.thumbnail_hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+previews = PreviewStore()
@@ -1,3 +1,16 @@
+# Bump the matching version whenever a template's wording changes so results
+# cached from the old prompt are no longer served.
+PROMPT_VERSIONS = {
+    "analyze_gaps": "1",
+    "analyze_gaps_with_role": "1",
+    "initial_score": "1",
+    "projected_score": "1",
+    "extract_job_metadata": "1",
+    "role_analysis": "1",
+    "resume_overview": "1",
+    "section_rewrite": "1",
+}
+
 ANALYZE_GAPS_PROMPT_TEMPLATE = """
 You are a senior career skills coach and ATS-aware resume advisor.
 
@@ -113,7 +126,112 @@ Original Resume Content:
 {resume_text}
 """
 
-CALCULATE_SCORES_PROMPT_TEMPLATE = """
+# Same task as ANALYZE_GAPS_PROMPT_TEMPLATE for a job description whose role
+# analysis is already cached, so the model does not regenerate it.
+ANALYZE_GAPS_WITH_ROLE_PROMPT_TEMPLATE = """
+You are a senior career skills coach and ATS-aware resume advisor.
+
+Your task is to TAILOR my resume for a specific job description.
+You must act like a recruiter + hiring manager at a large multinational company.
+
+IMPORTANT ROLE RULES:
+- You are NOT a resume writer-for-hire.
+- You must NOT invent experience, metrics, tools, titles, or education.
+- You must explain WHY changes are made.
+- You must optimize for BOTH ATS parsing and human recruiter scanning.
+- Use professional, senior, recruiter-calibrated language.
+- Prioritize clarity, relevance, and truthful framing over buzzwords.
+
+PROCESS YOU MUST FOLLOW:
+
+The job description has already been analyzed (role identity, ATS keyword
+clusters, seniority signals, industry and geographic context):
+{role_analysis}
+Use this analysis as given; do not repeat it.
+
+STEP 1 — RESUME DIAGNOSIS
+Review my resume and identify:
+- Strong alignment areas (keep & reinforce)
+- Gaps in keyword coverage
+- Misaligned titles or framing
+- Redundancy or overload
+- ATS risks (dates, formatting, phrasing)
+
+STEP 2 — TARGET TITLE & SUMMARY
+Propose:
+- A role-aligned professional title (even if different from official job title)
+- A concise professional summary optimized for ATS and recruiter scanning
+Rules:
+- Use job-description language
+- Show seniority and ownership
+- No generic fluff (e.g., "Results-oriented professional")
+- No exaggeration
+
+STEP 3 — EXPERIENCE SECTION REWRITE
+Rewrite EACH experience section using:
+- Action + Technical Context + Clinical/Business Impact
+- ATS keywords embedded naturally
+- Leadership and cross-functional collaboration where applicable
+- 6–8 bullets max per role
+Rules:
+- Preserve truth
+- Reframe, don’t fabricate
+- Emphasize ownership, scale, and decision-making
+
+STEP 4 — PROJECTS SECTION
+Rewrite projects to:
+- Complement (not duplicate) experience
+- Emphasize implementation depth, platforms, and clinical relevance
+- Use 2–3 bullets per project
+
+STEP 5 — SKILLS SECTION OPTIMIZATION
+Reorganize skills into ATS-friendly clusters:
+- Programming
+- AI / ML
+- Data Engineering
+- Cloud & Platforms
+- Domain (Healthcare / Clinical / Regulatory)
+Rules:
+- No dumping tools
+- Only include skills demonstrated in experience or projects
+
+OUTPUT FORMAT (JSON):
+{{
+    "diagnosis": {{
+        "strong_matches": ["<string>", ...],
+        "gaps": ["<string>", ...],
+        "misalignments": ["<string>", ...],
+        "ats_risks": ["<string>", ...]
+    }},
+    "proposed_title": "<Role-Aligned Title>",
+    "proposed_summary": "<Concise Professional Summary>",
+    "sections": [
+        {{
+            "section_name": "<Exact Header name from resume>",
+            "section_type": "<Summary|Experience|Projects|Skills|Education|Other>",
+            "original_text": "<full original text of this section>",
+            "gaps": ["<specific missing keyword/skill>"],
+            "suggestions": ["<strategic advice>"],
+            "edits": [
+                {{
+                    "target_text": "<exact substring to replace>",
+                    "new_content": "<improved content>",
+                    "action": "replace",
+                    "rationale": "<why this change is better>"
+                }}
+            ]
+        }}
+    ]
+}}
+
+Job Description:
+{job_description}
+
+Original Resume Content:
+{resume_text}
+"""
+
+INITIAL_SCORE_PROMPT_TEMPLATE = """
 You are a Hiring Manager and ATS Specialist.
 
 JOB DESCRIPTION:
@@ -122,21 +240,166 @@ JOB DESCRIPTION:
 CANDIDATE RESUME CONTENT:
 {resume_text}
 
+TASK:
+Evaluate the resume's match to the JD on a scale of 0-100 (ATS Score).
+
+OUTPUT JSON:
+{{
+    "initial_score": <int>,
+    "reasoning": "<short explanation>"
+}}
+"""
+
+PROJECTED_SCORE_PROMPT_TEMPLATE = """
+You are a Hiring Manager and ATS Specialist.
+
+JOB DESCRIPTION:
+{job_description}
+
+CANDIDATE RESUME CONTENT:
+{resume_text}
+
+The resume above currently scores {initial_score}/100 against the JD.
+
 PROPOSED IMPROVEMENTS TO RESUME:
 {changes_summary}
 
 TASK:
-1. Evaluate the *original* resume's match to the JD on a scale of 0-100 (ATS Score).
-2. Estimate the match score (0-100) assuming the proposed improvements are applied effectively.
+Estimate the match score (0-100) assuming the proposed improvements are applied effectively.
 
 OUTPUT JSON:
 {{
-    "initial_score": <int>,
     "projected_score": <int>,
     "reasoning": "<short explanation>"
 }}
 """
 
+# --- Section-sharded analysis -------------------------------------------------
+# The three prompts below split ANALYZE_GAPS_PROMPT_TEMPLATE into a JD-only
+# role analysis, a whole-resume overview and one rewrite call per section.
+
+ROLE_ANALYSIS_PROMPT_TEMPLATE = """
+You are a senior recruiter and ATS specialist at a large multinational company.
+
+Analyze the target job description and explicitly identify:
+- Core role identity (what they are REALLY hiring for)
+- Top 5–7 ATS keyword clusters
+- Required seniority signals
+- Industry context (e.g., pharma, digital health, regulated environment)
+- Geographic expectations (e.g., Singapore, US, EU norms)
+Also extract the hiring company's name and the job title.
+
+OUTPUT FORMAT (JSON):
+{{
+    "role_analysis": {{
+        "identity": "<Core role identity>",
+        "keywords": ["<keyword1>", "<keyword2>", ...],
+        "seniority_signals": ["<signal1>", ...],
+        "industry_context": "<string>",
+        "geographic_expectations": "<string>"
+    }},
+    "company_name": "<string>",
+    "job_title": "<string>"
+}}
+
+Job Description:
+{job_description}
+"""
+
+RESUME_OVERVIEW_PROMPT_TEMPLATE = """
+You are a senior career skills coach and ATS-aware resume advisor.
+You must act like a recruiter + hiring manager at a large multinational company.
+
+IMPORTANT ROLE RULES:
+- You must NOT invent experience, metrics, tools, titles, or education.
+- Use professional, senior, recruiter-calibrated language.
+- Prioritize clarity, relevance, and truthful framing over buzzwords.
+
+The job description has already been analyzed:
+{role_analysis}
+
+STEP 1 — RESUME DIAGNOSIS
+Review my resume and identify:
+- Strong alignment areas (keep & reinforce)
+- Gaps in keyword coverage
+- Misaligned titles or framing
+- ATS risks (dates, formatting, phrasing)
+
+STEP 2 — TARGET TITLE & SUMMARY
+Propose:
+- A role-aligned professional title (even if different from official job title)
+- A concise professional summary optimized for ATS and recruiter scanning
+Rules:
+- Use job-description language
+- Show seniority and ownership
+- No generic fluff (e.g., "Results-oriented professional")
+- No exaggeration
+
+OUTPUT FORMAT (JSON):
+{{
+    "diagnosis": {{
+        "strong_matches": ["<string>", ...],
+        "gaps": ["<string>", ...],
+        "misalignments": ["<string>", ...],
+        "ats_risks": ["<string>", ...]
+    }},
+    "proposed_title": "<Role-Aligned Title>",
+    "proposed_summary": "<Concise Professional Summary>"
+}}
+
+Job Description:
+{job_description}
+
+Original Resume Content:
+{resume_text}
+"""
+
+SECTION_REWRITE_PROMPT_TEMPLATE = """
+You are a senior career skills coach and ATS-aware resume advisor.
+You are tailoring ONE section of my resume for a specific job description.
+
+IMPORTANT ROLE RULES:
+- You must NOT invent experience, metrics, tools, titles, or education.
+- You must explain WHY changes are made.
+- You must optimize for BOTH ATS parsing and human recruiter scanning.
+- Preserve truth: reframe, don’t fabricate.
+
+The job description has already been analyzed:
+{role_analysis}
+
+REWRITE GUIDANCE BY SECTION TYPE:
+- Experience: Action + Technical Context + Business Impact, ATS keywords embedded naturally, 6–8 bullets max per role
+- Projects: complement (not duplicate) experience, emphasize implementation depth, 2–3 bullets per project
+- Skills: ATS-friendly clusters; only skills demonstrated elsewhere in the resume
+- Summary: job-description language, seniority and ownership, no generic fluff
+- Other: only fix clear ATS risks or framing problems
+
+Every "target_text" MUST be an exact substring of the section text below.
+
+OUTPUT FORMAT (JSON):
+{{
+    "section_name": "{section_name}",
+    "section_type": "{section_type}",
+    "original_text": "<full original text of this section>",
+    "gaps": ["<specific missing keyword/skill>"],
+    "suggestions": ["<strategic advice>"],
+    "edits": [
+        {{
+            "target_text": "<exact substring to replace>",
+            "new_content": "<improved content>",
+            "action": "replace",
+            "rationale": "<why this change is better>"
+        }}
+    ]
+}}
+
+Job Description:
+{job_description}
+
+Section "{section_name}" ({section_type}):
+{section_text}
+"""
+
 EXTRACT_JOB_METADATA_PROMPT = """
 Extract the 'Company Name' and 'Job Role' from the following Job Description text.
 Return ONLY a JSON object with keys "company" and "role".
@@ -0,0 +1,106 @@
+"""
+Local resume section splitting.
+
+Splits extracted resume text into sections by recognizing common section
+headings, so each section can be analyzed by its own LLM call. Text before
+the first heading (name, contact details) becomes a "Header" section.
+"""
+
+import re
+from typing import List, NamedTuple
+
+# Heading phrases per section type, matched against the normalized line
+SECTION_HEADINGS = {
+    "Summary": (
+        "summary", "professional summary", "career summary", "profile", "professional profile",
+        "about me", "objective", "career objective",
+    ),
+    "Experience": (
+        "experience", "work experience", "professional experience", "relevant experience",
+        "employment", "employment history", "work history", "career history",
+    ),
+    "Projects": ("projects", "key projects", "personal projects", "academic projects", "selected projects"),
+    "Skills": (
+        "skills", "technical skills", "core skills", "key skills", "skills and tools",
+        "core competencies", "competencies", "technologies", "tools and technologies",
+    ),
+    "Education": ("education", "academic background", "qualifications", "education and training"),
+    "Other": (
+        "certifications", "certificates", "licenses and certifications", "awards", "achievements",
+        "honors and awards", "publications", "languages", "interests", "volunteering",
+        "volunteer experience", "leadership", "activities", "courses", "training", "references",
+    ),
+}
+
+_PHRASE_TO_TYPE = {phrase: section_type for section_type, phrases in SECTION_HEADINGS.items() for phrase in phrases}
+
+# Single words that mark a heading line when it is styled like one (ALL CAPS or trailing colon)
+_KEYWORD_TO_TYPE = {
+    "summary": "Summary", "profile": "Summary", "objective": "Summary",
+    "experience": "Experience", "employment": "Experience",
+    "projects": "Projects",
+    "skills": "Skills", "competencies": "Skills",
+    "education": "Education",
+    "certifications": "Other", "awards": "Other", "publications": "Other",
+}
+
+
+class ResumeSection(NamedTuple):
+    name: str
+    section_type: str
+    text: str
+
+
+def _normalize_heading(line: str) -> str:
+    line = line.strip().strip(":|-–—•*").strip().lower()
+    line = line.replace("&", "and")
+    return re.sub(r'\s+', ' ', line)
+
+
+def classify_heading(line: str) -> str:
+    """Return the section type if line looks like a section heading, else an empty string."""
+    stripped = line.strip()
+    if not stripped or len(stripped) > 50:
+        return ""
+
+    normalized = _normalize_heading(stripped)
+    if normalized in _PHRASE_TO_TYPE:
+        return _PHRASE_TO_TYPE[normalized]
+
+    words = normalized.split()
+    styled_as_heading = stripped.isupper() or stripped.endswith(":")
+    if styled_as_heading and len(words) <= 5 and not any(ch.isdigit() for ch in stripped):
+        for word in words:
+            if word in _KEYWORD_TO_TYPE:
+                return _KEYWORD_TO_TYPE[word]
+    return ""
+
+
+def split_resume_sections(resume_text: str) -> List[ResumeSection]:
+    """
+    Split resume text into sections at recognized headings.
+
+    Args:
+        resume_text: Text extracted from the resume, one paragraph per line
+
+    Returns:
+        Sections in document order; headings with no body text are dropped
+    """
+    sections: List[ResumeSection] = []
+    name, section_type, body = "Header", "Other", []
+
+    def flush():
+        text = "\n".join(body).strip()
+        if text:
+            sections.append(ResumeSection(name, section_type, text))
+
+    for line in resume_text.splitlines():
+        heading_type = classify_heading(line)
+        if heading_type:
+            flush()
+            name, section_type, body = line.strip().rstrip(":").strip(), heading_type, []
+        else:
+            body.append(line)
+    flush()
+
+    return sections
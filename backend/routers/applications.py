@@ -1,22 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.concurrency import run_in_threadpool
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
 from sqlmodel import Session, select
 from typing import List
 from datetime import datetime
 import os
 from database import get_session
 from models import Application, TimelineEvent, User
-from dependencies import get_current_user
-from scraper import fetch_job_description, extract_job_metadata
+from dependencies import get_current_user, get_optional_user
+from scraper import fetch_job_description, extract_job_metadata_async
+from llm_scheduler import priority_for_user, use_priority
+from uploads import save_upload
+from executors import network_io
 
 router = APIRouter(tags=["applications"])
 
 @router.post("/fetch-jd")
-async def get_jd(url: str = Form(...)): 
-    # fetch_job_description is synchronous and IO bound (requests). 
-    description = await run_in_threadpool(fetch_job_description, url)
+async def get_jd(request: Request, url: str = Form(...), session: Session = Depends(get_session)):
+    # fetch_job_description is synchronous and IO bound (requests); it gets its own pool
+    # so slow job boards cannot starve file work
+    description = await network_io.run(fetch_job_description, url)
     # Extract metadata
-    metadata = extract_job_metadata(description)
+    user = await get_optional_user(request, session)
+    with use_priority(priority_for_user(user)):
+        metadata = await extract_job_metadata_async(description)
     return {
         "job_description": description,
         "company": metadata.get("company", ""),
@@ -49,13 +54,7 @@ async def create_application(
     timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
     safe_filename = f"{timestamp}_{resume.filename}"
     file_location = os.path.join("application_resumes", safe_filename)
-    
-    # file write is blocking sync IO usually. 
-    # Use await resume.read() (async). 
-    # write is sync. 
-    content = await resume.read()
-    with open(file_location, "wb+") as file_object:
-        file_object.write(content)
+    await save_upload(resume, file_location)
 
     application = Application(
         user_id=current_user.id,
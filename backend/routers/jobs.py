@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlmodel import Session
+from database import get_session
+from dependencies import client_scope, get_optional_user
+from job_queue import jobs
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, request: Request, session: Session = Depends(get_session)):
+    """
+    Status of a queued job: overall and per stage, then its result or error.
+
+    Only the client that submitted the job (the same account, or the same
+    address when anonymous) can see it; anyone else gets a 404.
+    """
+    user = await get_optional_user(request, session)
+    job = await jobs.get(job_id, client=client_scope(request, user))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
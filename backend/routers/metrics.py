@@ -0,0 +1,39 @@
+import asyncio
+from fastapi import APIRouter
+import conversion_pool
+import executors
+import llm_client
+import telemetry
+from conversion_cache import conversions
+from doc_cache import documents
+from edit_session import sessions as edit_sessions
+from job_queue import jobs
+from single_flight import flights
+from preview import previews
+from tailor import analysis_cache, role_cache
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+@router.get("")
+async def get_metrics():
+    # These two count rows in sqlite; the rest are in-memory counters, and the
+    # LLM ones belong to the event loop
+    conversion_cache_stats, job_stats = await asyncio.gather(
+        executors.file_io.run(conversions.stats),
+        executors.file_io.run(jobs.stats),
+    )
+    return {
+        "analysis_cache": analysis_cache.stats(),
+        "role_cache": role_cache.stats(),
+        "llm_scheduler": llm_client.get_scheduler().stats(),
+        "llm_calls": llm_client.stats(),
+        "executors": executors.stats(),
+        "telemetry": telemetry.sink.stats(),
+        "edit_sessions": edit_sessions.stats(),
+        "parsed_documents": documents.stats(),
+        "conversion_pool": conversion_pool.pool.stats(),
+        "conversion_cache": conversion_cache_stats,
+        "previews": previews.stats(),
+        "jobs": job_stats,
+        "analysis_streams": flights.stats()
+    }
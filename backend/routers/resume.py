@@ -1,18 +1,37 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Request
-from fastapi.responses import FileResponse
-from fastapi.concurrency import run_in_threadpool
+from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException, Depends, Request
+from fastapi.responses import FileResponse, HTMLResponse, Response, StreamingResponse
 from sqlmodel import Session, select
 from datetime import datetime
+from typing import Optional
+import asyncio
+import hashlib
 import shutil
 import os
 import uuid
 import json
+import logging
 from database import get_session
 from models import SavedResume, UsageLog, Application, User
-from dependencies import get_optional_user, get_current_user
+from dependencies import client_scope, get_optional_user, get_current_user
 from schemas import EditsRequest, SaveResumeRequest
-from pdf_handler import pdf_to_docx
-from tailor import analyze_gaps, generate_tailored_resume
+from pdf_handler import pdf_to_docx_async
+from preview import PreviewError, previews
+from uploads import UPLOAD_MAX_PAGES, SavedUpload, save_upload
+from tailor import (
+    ANALYSIS_TEXT_SOURCE,
+    analyze_gaps_async,
+    analyze_gaps_stream,
+    generate_tailored_resume,
+    render_tailored_resume,
+)
+from llm_scheduler import LLMOverloadedError, Priority, priority_for_user, use_priority
+from job_queue import IdempotencyConflictError, Job, PermanentJobError, jobs
+from single_flight import flights
+from executors import ExecutorSaturatedError, file_io
+from conversion_pool import pool as conversion_pool
+from analysis_cache import normalize_job_description
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -54,13 +73,8 @@ async def check_usage(
     
     return {"usage_count": usage_count, "remaining": remaining, "is_unlimited": False}
 
-@router.post("/analyze")
-async def analyze_resume(
-    request: Request,
-    resume: UploadFile = File(...), 
-    job_description: str = Form(...),
-    session: Session = Depends(get_session)
-):
+async def _check_usage_limit(request: Request, session: Session) -> Optional[User]:
+    """Reject anonymous users over the daily limit and return the user."""
     # Usage Tracking Logic
     user = await get_optional_user(request, session)
     client_ip = request.client.host
@@ -80,8 +94,11 @@ async def analyze_resume(
                 status_code=403, 
                 detail="Daily free limit reached. Please login for unlimited access."
             )
-        
-    # Log usage
+    return user
+
+async def _record_usage(request: Request, session: Session, user: Optional[User]):
+    """Count an analysis against the user's (or anonymous IP's) usage."""
+    client_ip = request.client.host
     new_log = UsageLog(
         ip_address=client_ip, 
         user_id=user.id if user else None,
@@ -90,21 +107,41 @@ async def analyze_resume(
     session.add(new_log)
     await session.commit()
 
+def _request_key(scope: str, upload: SavedUpload, job_description: str, use_cache: bool) -> str:
+    """Identifies analyses that would do the same work for the same client."""
+    digest = hashlib.sha256()
+    for part in (scope, upload.sha256, normalize_job_description(job_description), str(use_cache)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+def _discard_duplicate_upload(upload: SavedUpload):
+    # The request joined an equivalent one, whose own copy of the upload is used
+    try:
+        os.remove(upload.path)
+    except OSError:
+        pass
+
+async def _save_upload(resume: UploadFile) -> SavedUpload:
+    """Save the upload under a per-session name (see uploads.save_upload for the limits)."""
     # Create a unique session ID
     session_id = str(uuid.uuid4())[:8]
     
     # Save uploaded resume temporarily with session ID
     temp_pdf_path = f"temp_{session_id}_{resume.filename}"
-    content = await resume.read()
-    with open(temp_pdf_path, "wb") as buffer:
-        buffer.write(content)
-    
-    # 1. Convert PDF to customizable format (DOCX)
-    docx_path = await run_in_threadpool(pdf_to_docx, temp_pdf_path)
-    
-    # 2. Analyze gaps using LLM (Use PDF for reading text)
-    analysis_result = await run_in_threadpool(analyze_gaps, docx_path, job_description, pdf_path=temp_pdf_path)
-    
+    return await save_upload(resume, temp_pdf_path, max_pages=UPLOAD_MAX_PAGES)
+
+def _start_conversion(upload: SavedUpload, job: Job = None) -> asyncio.Task:
+    """Convert the upload to DOCX in the background while its PDF text is analyzed."""
+    conversion = pdf_to_docx_async(upload.path, upload.sha256)
+    if job is not None:
+        conversion = job.track("convert", conversion)
+    task = asyncio.create_task(conversion)
+    # If the analysis fails first nobody awaits the task; retrieve its error so it isn't reported as lost
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return task
+
+def _analysis_response(analysis_result: dict, temp_pdf_path: str, docx_path: str) -> dict:
     # We return the filename (with session ID) so the frontend can send it back for the next step
     return {
         "message": "Analysis complete", 
@@ -117,23 +154,244 @@ async def analyze_resume(
         "temp_docx_path": docx_path 
     }
 
-@router.post("/generate")
-async def generate_resume_endpoint(request: EditsRequest):
+async def _run_analysis_job(job: Job) -> dict:
+    """Job behind POST /analyze: convert the upload and analyze it against the job description."""
+    upload = SavedUpload(**job.payload["upload"])
+    temp_pdf_path = upload.path
+    if not os.path.exists(temp_pdf_path):
+        raise PermanentJobError("Session expired or file not found. Please upload again.")
+    job_description = job.payload["job_description"]
+    use_cache = job.payload["use_cache"]
+
+    # Queued work yields the LLM to interactive /analyze/stream calls of every user class
+    with use_priority(Priority.BACKGROUND):
+        if ANALYSIS_TEXT_SOURCE == "pdf":
+            # 1+2. Analyze the PDF's own text while it is converted to DOCX;
+            # the DOCX is only needed to anchor the proposed edits
+            conversion = _start_conversion(upload, job)
+            try:
+                analysis_result = await job.track("analyze", analyze_gaps_async(
+                    None, job_description, pdf_path=temp_pdf_path, use_cache=use_cache,
+                    docx_conversion=conversion, pdf_hash=upload.sha256
+                ))
+                docx_path = await conversion
+            except BaseException:
+                # No point finishing a conversion nobody will use
+                conversion.cancel()
+                raise
+            return _analysis_response(analysis_result, temp_pdf_path, docx_path)
+
+        # 1. Convert PDF to customizable format (DOCX)
+        docx_path = await job.track("convert", pdf_to_docx_async(temp_pdf_path, upload.sha256))
+
+        # 2. Analyze gaps using LLM (Use PDF for reading text)
+        analysis_result = await job.track("analyze", analyze_gaps_async(
+            docx_path, job_description, pdf_path=temp_pdf_path, use_cache=use_cache
+        ))
+    return _analysis_response(analysis_result, temp_pdf_path, docx_path)
+
+jobs.register("analyze", _run_analysis_job)
+
+@router.post("/analyze", status_code=202)
+async def analyze_resume(
+    request: Request,
+    resume: UploadFile = File(...), 
+    job_description: str = Form(...),
+    bypass_cache: bool = Form(False),
+    idempotency_key: Optional[str] = Header(None),
+    session: Session = Depends(get_session)
+):
+    """
+    Queue an analysis of the upload against the job description.
+
+    Answers at once with the job's id. GET /jobs/{id} reports its progress
+    and, once it has succeeded, the result: the same payload the complete
+    event of /analyze/stream carries.
+
+    A request identical to one still queued or running for the same client
+    (same PDF bytes, job description and cache setting) gets that job
+    instead of a new one. A request carrying an Idempotency-Key header
+    already used by the client gets the job created under it.
+    """
+    user = await _check_usage_limit(request, session)
+    upload = await _save_upload(resume)
+    scope = client_scope(request, user)
+    if idempotency_key is not None:
+        idempotency_key = hashlib.sha256(f"{scope}\x00{idempotency_key}".encode("utf-8")).hexdigest()
+    try:
+        job_id, created = await jobs.enqueue_once(
+            "analyze",
+            {
+                "upload": upload._asdict(),
+                "job_description": job_description,
+                "use_cache": not bypass_cache,
+            },
+            dedup_key=_request_key(scope, upload, job_description, not bypass_cache),
+            idempotency_key=idempotency_key,
+            client=scope,
+        )
+    except IdempotencyConflictError as e:
+        _discard_duplicate_upload(upload)
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if created:
+        await _record_usage(request, session, user)
+        status = "queued"
+    else:
+        _discard_duplicate_upload(upload)
+        status = (await jobs.get(job_id))["status"]
+    return {"job_id": job_id, "status": status, "status_url": f"/jobs/{job_id}", "coalesced": not created}
+
+@router.post("/analyze/stream")
+async def analyze_resume_stream(
+    request: Request,
+    resume: UploadFile = File(...),
+    job_description: str = Form(...),
+    bypass_cache: bool = Form(False),
+    session: Session = Depends(get_session)
+):
+    """
+    Streaming variant of /analyze, run within the request rather than queued.
+
+    Responds with newline-delimited JSON: status events while the PDF is
+    converted (skipped when the PDF's own text is analyzed during the
+    conversion), then role_analysis / diagnosis / section events as the model
+    produces them, a scores event, and finally a complete event carrying the
+    same payload /analyze returns.
+
+    Identical concurrent requests from the same client share one analysis:
+    a duplicate replays the events sent so far, then follows it live.
+    """
+    user = await _check_usage_limit(request, session)
+    # Refuse before taking the upload; queued analyses are retried by the job queue instead
+    conversion_pool.check_admission()
+    upload = await _save_upload(resume)
+    temp_pdf_path = upload.path
+
+    async def event_stream():
+        conversion = None
+        try:
+            if ANALYSIS_TEXT_SOURCE == "pdf":
+                conversion = _start_conversion(upload)
+                docx_path = None
+            else:
+                yield json.dumps({"event": "status", "stage": "converting"}) + "\n"
+                docx_path = await pdf_to_docx_async(temp_pdf_path, upload.sha256)
+
+            yield json.dumps({"event": "status", "stage": "analyzing"}) + "\n"
+            # Set inside the generator: it runs in the response task, not the endpoint's
+            with use_priority(priority_for_user(user)):
+                async for event in analyze_gaps_stream(
+                    docx_path, job_description, use_cache=not bypass_cache,
+                    pdf_path=temp_pdf_path, docx_conversion=conversion, pdf_hash=upload.sha256
+                ):
+                    if event["event"] == "complete":
+                        if conversion is not None:
+                            docx_path = await conversion
+                        event = {"event": "complete", "result": _analysis_response(event["result"], temp_pdf_path, docx_path)}
+                    yield json.dumps(event) + "\n"
+        except (LLMOverloadedError, ExecutorSaturatedError) as e:
+            yield json.dumps({"event": "error", "detail": str(e), "retry_after": round(e.retry_after)}) + "\n"
+        except Exception as e:
+            logger.error(f"Streaming analysis failed: {e}", exc_info=True)
+            yield json.dumps({"event": "error", "detail": str(e)}) + "\n"
+        finally:
+            # Failed, or the client went away: stop the background conversion
+            if conversion is not None and not conversion.done():
+                conversion.cancel()
+
+    key = _request_key(client_scope(request, user), upload, job_description, not bypass_cache)
+    stream, started = flights.join(key, event_stream)
+    if started:
+        await _record_usage(request, session, user)
+    else:
+        _discard_duplicate_upload(upload)
+    return StreamingResponse(stream, media_type="application/x-ndjson")
+
+def _preview_response(preview) -> dict:
+    def download_url(path):
+        return f"/download/{os.path.basename(path)}" if path else None
+
+    return {
+        "token": preview.token,
+        "filename": preview.pdf_path,
+        "pages": preview.pages,
+        "thumbnails": [f"/preview/{preview.token}/pages/{number}" for number in range(1, preview.pages + 1)],
+        "first_page_html": f"/preview/{preview.token}/html",
+        "first_page_docx": download_url(preview.first_page_docx),
+        "docx": download_url(preview.docx_path),
+        "document_ready": preview.docx_path is not None,
+        "error": preview.error,
+    }
+
+@router.post("/preview")
+async def preview_resume(resume: UploadFile = File(...)):
+    """
+    Start previewing an upload as soon as it is picked.
+
+    Answers with the page count and thumbnail URLs right away; the first page
+    and then the whole document are converted to DOCX in the background.
+    Poll GET /preview/{token} for their progress.
+    """
+    conversion_pool.check_admission()
+    upload = await _save_upload(resume)
+    temp_pdf_path = upload.path
+    try:
+        preview = await previews.start(temp_pdf_path, upload.sha256)
+    except PreviewError as e:
+        os.remove(temp_pdf_path)
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExecutorSaturatedError:
+        os.remove(temp_pdf_path)
+        raise
+    return _preview_response(preview)
+
+def _get_preview(token: str):
+    preview = previews.get(token)
+    if preview is None:
+        raise HTTPException(status_code=404, detail="Preview expired or not found. Please upload again.")
+    return preview
+
+@router.get("/preview/{token}")
+async def get_preview(token: str):
+    return _preview_response(_get_preview(token))
+
+@router.get("/preview/{token}/html")
+async def get_preview_html(token: str):
+    return HTMLResponse(_get_preview(token).first_page_html)
+
+@router.get("/preview/{token}/pages/{page}")
+async def get_preview_page(token: str, page: int):
+    preview = _get_preview(token)
+    if not 1 <= page <= preview.pages:
+        raise HTTPException(status_code=404, detail="Page not found")
+    image = await previews.thumbnail(preview, page)
+    # Thumbnails never change for a token, so browsers can keep them
+    return Response(content=image, media_type="image/png", headers={"Cache-Control": "private, max-age=3600"})
+
+def _resolve_docx_handle(filename: str) -> Optional[str]:
+    """Map the file handle given to the frontend back to the converted DOCX, if it still exists."""
     # Reconstruct paths using the filename handle provided by frontend
     # 1. Try temp location first
-    temp_pdf_path = request.filename
+    temp_pdf_path = filename
     docx_path = temp_pdf_path.replace(".pdf", ".docx")
     
     # 2. If not found, try saved_resumes location
     if not os.path.exists(docx_path):
         saved_docx_path = os.path.join("saved_resumes", os.path.basename(docx_path))
         if os.path.exists(saved_docx_path):
-            docx_path = saved_docx_path
-        else:
-            return {"error": "Session expired or file not found. Please upload again."}
+            return saved_docx_path
+        return None
+    return docx_path
+
+@router.post("/generate")
+async def generate_resume_endpoint(request: EditsRequest):
+    docx_path = _resolve_docx_handle(request.filename)
+    if docx_path is None:
+        return {"error": "Session expired or file not found. Please upload again."}
         
     # 3. Apply edits
-    tailored_docx_path = await run_in_threadpool(generate_tailored_resume, docx_path, request.sections)
+    tailored_docx_path, edit_report = await file_io.run(generate_tailored_resume, docx_path, request.sections)
     
     # extract just the filename for the download url
     filename = os.path.basename(tailored_docx_path)
@@ -141,9 +399,29 @@ async def generate_resume_endpoint(request: EditsRequest):
     return {
         "message": "Resume tailored successfully", 
         "pdf_path": tailored_docx_path, 
-        "download_url": f"http://localhost:8000/download/{filename}"
+        "download_url": f"http://localhost:8000/download/{filename}",
+        "edits_applied": sum(1 for entry in edit_report if entry["status"] == "applied"),
+        "edit_report": edit_report,
     }
 
+@router.post("/generate/download")
+async def generate_resume_download(request: EditsRequest):
+    """Same as /generate, but responds with the tailored DOCX itself instead of writing it to disk."""
+    docx_path = _resolve_docx_handle(request.filename)
+    if docx_path is None:
+        raise HTTPException(status_code=404, detail="Session expired or file not found. Please upload again.")
+
+    content, edit_report = await file_io.run(render_tailored_resume, docx_path, request.sections)
+    filename = os.path.basename(docx_path).replace(".docx", "_tailored.docx")
+    return Response(
+        content=content,
+        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Edits-Applied": str(sum(1 for entry in edit_report if entry["status"] == "applied")),
+        },
+    )
+
 @router.post("/api/resume/save")
 async def save_resume(
     req: SaveResumeRequest,
@@ -1,30 +1,24 @@
-import requests
-from bs4 import BeautifulSoup
 import re
-import os
 import json
-import openai
-import mlflow
+import asyncio
 import logging
+import llm_client
+from llm_client import LLM_MODEL
 from prompts import EXTRACT_JOB_METADATA_PROMPT
-
-logger = logging.getLogger(__name__)
-
-# Configure MLflow (ensure consistent DB path)
-MLFLOW_DB_PATH = "sqlite:///mlflow.db"
 # Use a separate experiment for Scraper to avoid cluttering Resume Analysis
-# Or keep same if they are related. Different experiment is cleaner.
-SCRAPER_EXPERIMENT_NAME = "Job Description Extraction"
+from telemetry import RunRecord, log_run, SCRAPER_EXPERIMENT_NAME
 
-# Utility to ensure experiment exists
-# (Doing this setup inside function or global scope? Global is better but be careful with multiple imports setting URI)
-# We will just set URI and name inside the function to be safe if it's running in same process.
+logger = logging.getLogger(__name__)
 
 def fetch_job_description(url: str) -> str:
     """
     Fetches job description text from a given URL.
     Attempts to parse common sites like LinkedIn, Indeed, Naukri, or generic fallbacks.
     """
+    # Only /fetch-jd needs these; keep them off the startup import path
+    import requests
+    from bs4 import BeautifulSoup
+
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
     }
@@ -80,44 +74,37 @@ def fetch_job_description(url: str) -> str:
         logger.error(f"Error fetching JD: {e}")
         return f"Error fetching JD: {str(e)}"
 
-def extract_job_metadata(text: str) -> dict:
+async def extract_job_metadata_async(text: str) -> dict:
     """
     Uses LLM to extract Company Name and Job Role from JD text.
     """
+    if len(text) < 50:
+        return {"company": "", "role": ""}
+
+    prompt = EXTRACT_JOB_METADATA_PROMPT.format(text=text[:2000])
+
+    run = RunRecord(SCRAPER_EXPERIMENT_NAME, "extract_metadata")
+    run.log_param("model", LLM_MODEL)
+    run.set_tag("prompt_template", EXTRACT_JOB_METADATA_PROMPT[:5000])
+    run.log_param("text_length", len(text))
+
     try:
-        if len(text) < 50:
-             return {"company": "", "role": ""}
+        content = await llm_client.chat_completion(prompt, temperature=0)
+        run.log_text(content, "llm_response.json")
+
+        data = json.loads(content)
+
+        run.log_param("extracted_company", data.get("company", ""))
+        run.log_param("extracted_role", data.get("role", ""))
+        return data
 
-        client = openai.OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-        
-        prompt = EXTRACT_JOB_METADATA_PROMPT.format(text=text[:2000])
-        
-        # Setup MLflow for this specific task
-        mlflow.set_tracking_uri(MLFLOW_DB_PATH)
-        mlflow.set_experiment(SCRAPER_EXPERIMENT_NAME)
-        
-        with mlflow.start_run(run_name="extract_metadata"):
-            mlflow.log_param("model", "gpt-4o")
-            mlflow.set_tag("prompt_template", EXTRACT_JOB_METADATA_PROMPT[:5000])
-            mlflow.log_param("text_length", len(text))
-            
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0,
-                response_format={ "type": "json_object" }
-            )
-            
-            content = response.choices[0].message.content
-            mlflow.log_text(content, "llm_response.json")
-            
-            data = json.loads(content)
-            
-            mlflow.log_param("extracted_company", data.get("company", ""))
-            mlflow.log_param("extracted_role", data.get("role", ""))
-            
-            return data
-            
     except Exception as e:
         logger.error(f"Metadata extraction failed: {e}")
+        run.set_error(str(e))
         return {"company": "", "role": ""}
+    finally:
+        log_run(run)
+
+def extract_job_metadata(text: str) -> dict:
+    """Blocking wrapper around extract_job_metadata_async."""
+    return asyncio.run(extract_job_metadata_async(text))
@@ -0,0 +1,109 @@
+"""
+Single-flight sharing of streamed computations.
+
+A double-clicked "Analyze", or a client retrying after a proxy timeout,
+used to start a second conversion and analysis of the same upload while
+the first was still running. SingleFlight runs one producer per key in a
+task of its own. Every request for the key subscribes to that producer:
+it replays what has been produced so far, then follows it live.
+
+The producer belongs to no request, so a subscriber that goes away does
+not stop the others. It is cancelled once its last subscriber has gone.
+Flights are in-process only. Queued analyses are deduplicated durably by
+job_queue.enqueue_once.
+"""
+
+import asyncio
+import logging
+from typing import AsyncIterator, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    def __init__(self):
+        self.items: List = []
+        self.done = False
+        self.subscribers = 0
+        self.changed = asyncio.Condition()
+        self.task: asyncio.Task = None
+
+
+class SingleFlight:
+    """Shares one running async generator per key among all its concurrent subscribers."""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def _pump(self, key: str, flight: _Flight, source: AsyncIterator):
+        try:
+            async for item in source:
+                flight.items.append(item)
+                async with flight.changed:
+                    flight.changed.notify_all()
+        except Exception as e:
+            # The producer is expected to report its own errors as items
+            logger.error(f"Single-flight producer for {key} failed: {e}", exc_info=True)
+        finally:
+            flight.done = True
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            async with flight.changed:
+                flight.changed.notify_all()
+
+    def join(self, key: str, factory: Callable[[], AsyncIterator]) -> Tuple[AsyncIterator, bool]:
+        """
+        Subscribe to the flight for key, starting factory() if none is running.
+
+        Registration happens before this returns, so callers can act on
+        whether they started the flight without racing their duplicates.
+
+        Args:
+            key: Identifies equivalent requests
+            factory: Creates the async generator; only called when no flight is running
+
+        Returns:
+            An iterator over the flight's output, and whether this call started it
+        """
+        flight = self._flights.get(key)
+        started = flight is None
+        if started:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._pump(key, flight, factory()))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        flight.subscribers += 1
+        return self._follow(key, flight), started
+
+    async def _follow(self, key: str, flight: _Flight) -> AsyncIterator:
+        try:
+            position = 0
+            while True:
+                async with flight.changed:
+                    await flight.changed.wait_for(lambda: position < len(flight.items) or flight.done)
+                while position < len(flight.items):
+                    yield flight.items[position]
+                    position += 1
+                if flight.done:
+                    return
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done:
+                # Nobody is listening any more; stop the work
+                flight.task.cancel()
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
+
+
+flights = SingleFlight()
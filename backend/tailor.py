@@ -1,19 +1,61 @@
-import openai
+import asyncio
+import io
 import os
 import json
-import shutil
-from docx import Document
-from typing import List, Dict
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Awaitable, List, Dict, Tuple
 import logging
-import mlflow
-from prompts import ANALYZE_GAPS_PROMPT_TEMPLATE, CALCULATE_SCORES_PROMPT_TEMPLATE
+import llm_client
+from llm_client import LLM_MODEL
+from telemetry import RunRecord, log_run, ANALYSIS_EXPERIMENT_NAME
+from prompts import (
+    ANALYZE_GAPS_PROMPT_TEMPLATE,
+    ANALYZE_GAPS_WITH_ROLE_PROMPT_TEMPLATE,
+    INITIAL_SCORE_PROMPT_TEMPLATE,
+    PROJECTED_SCORE_PROMPT_TEMPLATE,
+    ROLE_ANALYSIS_PROMPT_TEMPLATE,
+    RESUME_OVERVIEW_PROMPT_TEMPLATE,
+    SECTION_REWRITE_PROMPT_TEMPLATE,
+    PROMPT_VERSIONS,
+)
+from analysis_cache import ResultCache, make_cache_key
+from json_stream import IncrementalJSONParser, JSONEvent
+from resume_sections import ResumeSection, split_resume_sections
+import ats_scorer
+from doc_cache import documents
+from executors import file_io
+from edit_engine import anchor_edits, apply_edits_to_docx, reconcile_edits
+from pdf_handler import extract_text_from_pdf
+from edit_session import sessions as edit_sessions
 
 logger = logging.getLogger(__name__)
 
-# Configure MLflow
-MLFLOW_DB_PATH = "sqlite:///mlflow.db"
-mlflow.set_tracking_uri(MLFLOW_DB_PATH)
-mlflow.set_experiment("Resume Tailor Analysis")
+# Repeat analyses of the same resume against the same JD are served from here
+analysis_cache = ResultCache(namespace="analyze_gaps")
+
+# The role analysis depends only on the job description, so it is shared by
+# every user analyzing the same posting and kept longer than full results
+ROLE_CACHE_MAX_ENTRIES = int(os.getenv("ROLE_CACHE_MAX_ENTRIES", "2000"))
+ROLE_CACHE_TTL_HOURS = float(os.getenv("ROLE_CACHE_TTL_HOURS", "168"))
+role_cache = ResultCache(
+    namespace="role_analysis",
+    max_entries=ROLE_CACHE_MAX_ENTRIES,
+    ttl_seconds=ROLE_CACHE_TTL_HOURS * 3600
+)
+ROLE_FIELDS = ("role_analysis", "company_name", "job_title")
+
+# "monolithic" sends the whole resume in one prompt, "sharded" splits it into
+# sections analyzed in parallel, "auto" shards resumes longer than the threshold
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "auto")
+SHARDED_MIN_RESUME_CHARS = int(os.getenv("SHARDED_MIN_RESUME_CHARS", "6000"))
+
+# "pdf" analyzes text read directly from the uploaded PDF while it is converted
+# to DOCX in parallel, "docx" waits for the conversion and analyzes the DOCX text
+ANALYSIS_TEXT_SOURCE = os.getenv("ANALYSIS_TEXT_SOURCE", "pdf")
+
+# "local" scores keyword coverage in-process (ats_scorer), "llm" asks the model
+SCORING_MODE = os.getenv("SCORING_MODE", "local")
 
 # Ensure API key is set
 # Ensure API key is set
@@ -26,6 +68,9 @@ class Edit(BaseModel):
     new_content: str
     action: str
     rationale: str
+    # Filled in after analysis by edit_engine.anchor_edits
+    anchors: List[Dict] = []
+    matched: bool = True
 
 class RoleAnalysis(BaseModel):
     identity: str
@@ -62,291 +107,573 @@ class AnalysisResult(BaseModel):
 
 
 
-import re
+def extract_text_from_docx(docx_path: str) -> str:
+    """Resume text from headers, body (tables and text boxes included) and footers, in document order."""
+    return documents.extract(docx_path).text
 
-def normalize_text(text: str) -> str:
-    """Normalize whitespace for robust matching."""
-    return re.sub(r'\s+', ' ', text).strip()
 
-def safe_replace_text(paragraph, target: str, replacement: str):
-    """
-    Attempts to replace 'target' with 'replacement' in the paragraph while preserving formatting.
-    Uses normalized matching to ignore whitespace differences from PDF conversion.
-    """
-    norm_target = normalize_text(target)
-    norm_para_text = normalize_text(paragraph.text)
-
-    if norm_target not in norm_para_text:
-        return False
-
-    # Check for multi-line or bulleted content
-    # If the LLM returned markdown bullets, we want to strip them because 
-    # pasting "* Item" into a DOCX doesn't make it a bullet list, just text.
-    # We will strip them to keep it clean.
-    clean_replacement = replacement
-    if '\n' in replacement or any(line.strip().startswith(('* ', '- ', '• ')) for line in replacement.split('\n')):
-         clean_replacement = re.sub(r'(^|\n)[\*\-\•]\s+', r'\1', replacement)
-
-    # Use the cleaned replacement for the actual operation
-    final_replacement = clean_replacement
-
-    # 1. Try single run replacement (exact match first)
-    for run in paragraph.runs:
-        if target in run.text:
-            run.text = run.text.replace(target, final_replacement)
-            return True
-
-    # 2. Relaxed match: Check if normalized target is in normalized run text
-    for run in paragraph.runs:
-        if norm_target in normalize_text(run.text):
-            pattern = re.escape(target).replace(r'\ ', r'\s+')
-            run.text = re.sub(pattern, final_replacement, run.text)
-            return True
-
-    # 3. Fallback: Full paragraph reconstruction
-    style_run = paragraph.runs[0] if paragraph.runs else None
-    font_name = style_run.font.name if style_run else None
-    font_size = style_run.font.size if style_run else None
-    bold = style_run.bold if style_run else None
-    italic = style_run.italic if style_run else None
-    
-    pattern = re.escape(target).replace(r'\ ', r'\s+')
-    new_text = re.sub(pattern, final_replacement, paragraph.text)
-    
-    if new_text != paragraph.text:
-        paragraph.text = new_text
-        for run in paragraph.runs:
-            if font_name: run.font.name = font_name
-            if font_size: run.font.size = font_size
-            if bold is not None: run.bold = bold
-            if italic is not None: run.italic = italic
-        return True
-
-    return False
-
-def apply_edits_to_docx(docx_path: str, edits: List[Dict[str, str]], output_path: str):
-    # Copy original to output
-    shutil.copy2(docx_path, output_path)
-    doc = Document(output_path)
-    
-    for edit in edits:
-        if isinstance(edit, dict):
-            action = edit.get("action")
-            target = edit.get("target_text")
-            content = edit.get("new_content")
-        else:
-            action = edit.action
-            target = edit.target_text
-            content = edit.new_content
-        
-        if not target or not content:
-            continue
-            
-        def process_para(para):
-            # We check if the normalized target is in the normalized paragraph text
-            if normalize_text(target) in normalize_text(para.text):
-                if action == "replace":
-                    return safe_replace_text(para, target, content)
-                elif action == "append":
-                     para.add_run(" " + content)
-                     return True
-            return False
-
-        # 1. Check body paragraphs
-        found = False
-        for para in doc.paragraphs:
-            if process_para(para):
-                found = True
-                # Continue searching because the same target might appear multiple times
-                # (e.g. name, contact info)
-        
-        # 2. Check tables
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for para in cell.paragraphs:
-                        if process_para(para):
-                            found = True
-
-    doc.save(output_path)
 
-def extract_text_from_docx(docx_path: str) -> str:
-    from docx.oxml.ns import qn
-    doc = Document(docx_path)
-    full_text = []
-
-    # Track processed elements using the underlying XML element (stable identity)
-    processed_elements = set()
-
-    def add_to_full_text(elements, source_label=""):
-        """Process a list of paragraph/table elements and add unique ones to full_text."""
-        for element in elements:
-            # For paragraphs, we use the _element (stable XML object)
-            # For tables, they also have _element
-            element_id = element._element if hasattr(element, '_element') else element
-            
-            if element_id in processed_elements:
-                continue
-            processed_elements.add(element_id)
-
-            if hasattr(element, 'text'):
-                if element.text.strip():
-                    full_text.append(element.text)
-            elif hasattr(element, 'rows'): # It's a table
-                for row in element.rows:
-                    for cell in row.cells:
-                        # Cell objects are proxies, use the underlying tc (table cell) element
-                        tc_id = cell._element
-                        if tc_id not in processed_elements:
-                            processed_elements.add(tc_id)
-                            # Combine paragraphs in cell with space to avoid word merging
-                            cell_text = " ".join([p.text for p in cell.paragraphs if p.text.strip()])
-                            if cell_text.strip():
-                                full_text.append(cell_text)
-
-    # 1. Headers
-    for section in doc.sections:
-        add_to_full_text(section.header.paragraphs)
-        add_to_full_text(section.header.tables)
-
-    # 2. Body
-    add_to_full_text(doc.paragraphs)
-    add_to_full_text(doc.tables)
-
-    # 3. Footers
-    for section in doc.sections:
-        add_to_full_text(section.footer.paragraphs)
-        add_to_full_text(section.footer.tables)
-
-    # 4. Textboxes (w:txbxContent)
-    for element in doc.element.body.iter():
-       if element.tag.endswith('txbxContent'):
-           for p in element.findall(qn('w:p')):
-               text = ""
-               for r in p.findall(qn('w:r')):
-                   for t in r.findall(qn('w:t')):
-                       if t.text: text += t.text
-               if text.strip():
-                   # Basic text cleaning and check for textboxes
-                   full_text.append(text)
-
-    return '\n'.join(full_text)
-
-
-# Removed extract_text_from_pdf dependency to ensure Sync
-
-def analyze_gaps(docx_path: str, job_description: str, pdf_path: str = None) -> Dict:
-    # Reverting to DOCX extraction to ensure identifying target_text works for replacement.
-    # We improved extract_text_from_docx to include textboxes/tables.
-    resume_text = extract_text_from_docx(docx_path)
-    
-    if not resume_text.strip():
-        logger.warning("Extracted text is empty.")
-    
-    client = openai.OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+class StageTimer:
+    """Collects wall-clock durations (ms) for the stages of one analysis."""
 
-    prompt = ANALYZE_GAPS_PROMPT_TEMPLATE.format(
-        job_description=job_description,
-        resume_text=resume_text
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    async def measure(self, name: str, awaitable):
+        with self.stage(name):
+            return await awaitable
+
+
+def summarize_changes(result: Dict) -> str:
+    """Summarize the proposed section changes for the projected-score stage."""
+    changes_summary = []
+    for section in result.get("sections", []):
+        name = section.get("section_name", "Unknown")
+        gaps = section.get("gaps", [])
+        suggestions = section.get("suggestions", [])
+        edits = section.get("edits", [])
+        changes_summary.append(f"Section {name}: Found {len(gaps)} gaps. {len(suggestions)} suggestions. Suggested {len(edits)} edits.")
+        if suggestions:
+            changes_summary.append(f" - Advice: {'; '.join(suggestions[:3])}")
+    return "\n".join(changes_summary)
+
+
+# Fields of the analysis JSON that are useful to the UI on their own, in the
+# order the prompt asks the model to produce them
+STREAMED_FIELDS = ("role_analysis", "diagnosis", "proposed_title", "proposed_summary", "company_name", "job_title")
+
+
+def role_cache_key(job_description: str) -> str:
+    """Fingerprint of the normalized job description for the shared role cache."""
+    return make_cache_key(
+        "", job_description, LLM_MODEL, [PROMPT_VERSIONS["role_analysis"], PROMPT_VERSIONS["analyze_gaps"]]
     )
-    
-    with mlflow.start_run(run_name="analyze_gaps"):
-        mlflow.log_param("model", "gpt-4o")
+
+
+class _AnalysisPipeline:
+    """Stages shared by the blocking and streaming analyze_gaps paths."""
+
+    def __init__(
+        self, docx_path: str, job_description: str, use_cache: bool = True, mode: str = None,
+        pdf_path: str = None, docx_conversion: Awaitable[str] = None, pdf_hash: str = None
+    ):
+        self.docx_path = docx_path
+        # Pipelined: the analysis starts from pdf_path's text while docx_conversion
+        # produces the DOCX, which is only needed once edits are anchored
+        self.pdf_path = pdf_path
+        self.pdf_hash = pdf_hash
+        self.docx_conversion = docx_conversion
+        self.text_source = "docx"
+        self.job_description = job_description
+        self.use_cache = use_cache
+        self.mode = mode or ANALYSIS_MODE
+        self.sections: List[ResumeSection] = []
+        self.sharded = False
+        # Cached JD-only fields (ROLE_FIELDS), or None when they must be generated
+        self.role: Dict = None
+        self.timer = StageTimer()
+        self.started = time.perf_counter()
+        self.resume_text = ""
+        self.cache_key = ""
+        self.run: RunRecord = None
+        self.initial_task: asyncio.Task = None
+        # Only complete, successful analyses are worth serving again
+        self.cacheable = True
+
+    async def load(self) -> Dict:
+        """Extract the resume text and return a cached result if there is one."""
+        if self.docx_conversion is not None:
+            self.resume_text = await self.timer.measure(
+                "extract_text", file_io.run(extract_text_from_pdf, self.pdf_path, self.pdf_hash)
+            )
+            self.text_source = "pdf"
+            if not self.resume_text.strip():
+                # Scanned PDFs have no text layer; the converted DOCX is no better but is what edits apply to
+                logger.warning("PDF has no extractable text, waiting for the DOCX conversion")
+                await self.wait_for_docx()
+        if self.docx_conversion is None:
+            # Reverting to DOCX extraction to ensure identifying target_text works for replacement.
+            # We improved extract_text_from_docx to include textboxes/tables.
+            self.resume_text = await self.timer.measure(
+                "extract_text", file_io.run(extract_text_from_docx, self.docx_path)
+            )
+            self.text_source = "docx"
+
+        if not self.resume_text.strip():
+            logger.warning("Extracted text is empty.")
+
+        if self.mode == "sharded" or (self.mode == "auto" and len(self.resume_text) >= SHARDED_MIN_RESUME_CHARS):
+            self.sections = split_resume_sections(self.resume_text)
+            # A resume without recognizable headings gains nothing from sharding
+            self.sharded = len(self.sections) >= 2
+
+        if self.sharded:
+            prompt_versions = ["sharded", PROMPT_VERSIONS["role_analysis"], PROMPT_VERSIONS["resume_overview"],
+                               PROMPT_VERSIONS["section_rewrite"]]
+        else:
+            prompt_versions = [PROMPT_VERSIONS["analyze_gaps"], PROMPT_VERSIONS["analyze_gaps_with_role"]]
+        if self.text_source == "pdf":
+            prompt_versions.append("pdf_text")
+        if SCORING_MODE == "local":
+            prompt_versions += ["local_scorer", ats_scorer.SCORER_VERSION]
+        else:
+            prompt_versions += [PROMPT_VERSIONS["initial_score"], PROMPT_VERSIONS["projected_score"]]
+        self.cache_key = make_cache_key(self.resume_text, self.job_description, LLM_MODEL, prompt_versions)
+        if self.use_cache:
+            cached = await file_io.run(analysis_cache.get, self.cache_key)
+            if cached is not None:
+                logger.info("Serving analyze_gaps result from cache")
+                return cached
+            self.role = await file_io.run(role_cache.get, role_cache_key(self.job_description))
+        return None
+
+    async def wait_for_docx(self):
+        """Wait for the pipelined DOCX conversion; the wait is all it adds to the critical path."""
+        self.docx_path = await self.timer.measure("conversion_wait", self.docx_conversion)
+        self.docx_conversion = None
+
+    def start(self):
+        """Open the run record and, when scoring with the LLM, kick off the initial score."""
+        self.run = RunRecord(ANALYSIS_EXPERIMENT_NAME, "analyze_gaps")
+        self.run.log_param("model", LLM_MODEL)
+        self.run.log_param("mode", "sharded" if self.sharded else "monolithic")
+        self.run.log_param("scoring_mode", SCORING_MODE)
+        self.run.log_param("text_source", self.text_source)
+        self.run.log_param("role_cache", "hit" if self.role else "miss")
         # Store prompt in DB via Tags (limit 5000 chars)
-        mlflow.set_tag("prompt_template", ANALYZE_GAPS_PROMPT_TEMPLATE[:5000])
-        mlflow.log_param("jd_length", len(job_description))
-        mlflow.log_param("resume_length", len(resume_text))
-        
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-            response_format={ "type": "json_object" }
+        if self.sharded:
+            self.run.set_tag("role_analysis_prompt_template", ROLE_ANALYSIS_PROMPT_TEMPLATE[:5000])
+            self.run.set_tag("resume_overview_prompt_template", RESUME_OVERVIEW_PROMPT_TEMPLATE[:5000])
+            self.run.set_tag("section_rewrite_prompt_template", SECTION_REWRITE_PROMPT_TEMPLATE[:5000])
+            self.run.log_param("num_shards", len(self.sections))
+        else:
+            template = ANALYZE_GAPS_WITH_ROLE_PROMPT_TEMPLATE if self.role else ANALYZE_GAPS_PROMPT_TEMPLATE
+            self.run.set_tag("prompt_template", template[:5000])
+        self.run.log_param("jd_length", len(self.job_description))
+        self.run.log_param("resume_length", len(self.resume_text))
+        if SCORING_MODE == "local":
+            return
+
+        self.run.set_tag("initial_score_prompt_template", INITIAL_SCORE_PROMPT_TEMPLATE[:5000])
+        self.run.set_tag("projected_score_prompt_template", PROJECTED_SCORE_PROMPT_TEMPLATE[:5000])
+
+        # 1. The initial score only needs the resume and JD, so it runs
+        # concurrently with the gap analysis instead of after it.
+        self.initial_task = asyncio.create_task(
+            self.timer.measure(
+                "initial_score", calculate_initial_score_async(self.resume_text, self.job_description)
+            )
         )
-        
+
+    def monolithic_prompt(self) -> str:
+        if self.role:
+            return ANALYZE_GAPS_WITH_ROLE_PROMPT_TEMPLATE.format(
+                role_analysis=json.dumps(self.role["role_analysis"], indent=2),
+                job_description=self.job_description,
+                resume_text=self.resume_text
+            )
+        return ANALYZE_GAPS_PROMPT_TEMPLATE.format(
+            job_description=self.job_description,
+            resume_text=self.resume_text
+        )
+
+    async def sharded_events(self) -> AsyncIterator[JSONEvent]:
+        """
+        Run the section-sharded analysis, yielding fields as shards finish.
+
+        The JD-only role analysis runs first; the resume overview and one
+        rewrite per section then fan out in parallel. Sections are yielded in
+        resume order, and self.sharded_result collects the merged result in
+        the same shape the monolithic prompt produces.
+        """
+        result: Dict = {"sections": []}
+        self.sharded_result = result
+
+        role = self.role or await self.timer.measure("role_analysis", analyze_role_async(self.job_description))
+        for key in ROLE_FIELDS:
+            if key in role:
+                result[key] = role[key]
+                yield JSONEvent(key, None, role[key])
+        role_analysis = role.get("role_analysis", {})
+
+        overview_task = asyncio.create_task(
+            analyze_overview_async(self.resume_text, self.job_description, role_analysis)
+        )
+        section_tasks = [
+            asyncio.create_task(rewrite_section_async(section, self.job_description, role_analysis))
+            for section in self.sections
+        ]
+        pending = {overview_task, *section_tasks}
+        finished: Dict[int, Dict] = {}
+        next_index = 0
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        logger.error(f"Analysis shard failed: {task.exception()}")
+                        self.run.log_param("shard_error", str(task.exception()))
+                        self.cacheable = False
+                    if task is overview_task:
+                        overview = task.result() if task.exception() is None else {}
+                        for key in ("diagnosis", "proposed_title", "proposed_summary"):
+                            if key in overview:
+                                result[key] = overview[key]
+                                yield JSONEvent(key, None, overview[key])
+                    else:
+                        finished[section_tasks.index(task)] = task.result() if task.exception() is None else None
+
+                # Emit in resume order so clients can append sections as they arrive
+                while next_index in finished:
+                    section = finished.pop(next_index)
+                    next_index += 1
+                    if section is not None:
+                        yield JSONEvent("sections", len(result["sections"]), section)
+                        result["sections"].append(section)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        result.setdefault("company_name", "Unknown Company")
+        result.setdefault("job_title", "Unknown Role")
+        self.run.log_metric("num_sections", len(result["sections"]))
+
+    async def run_sharded(self) -> Dict:
+        async for _ in self.sharded_events():
+            pass
+        return self.sharded_result
+
+    def parse(self, content: str) -> Dict:
         try:
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(content)
+            for key, value in (self.role or {}).items():
+                result.setdefault(key, value)
             # Ensure extracted metadata exists
             result.setdefault("company_name", "Unknown Company")
             result.setdefault("job_title", "Unknown Role")
-            
+
             # Log some basic metrics if available
             if "sections" in result:
-                mlflow.log_metric("num_sections", len(result["sections"]))
-            
+                self.run.log_metric("num_sections", len(result["sections"]))
+
         except json.JSONDecodeError:
             logger.error("Failed to decode JSON from LLM")
             result = {"sections": [], "company_name": "Unknown", "job_title": "Unknown"}
-            mlflow.log_param("error", "JSONDecodeError")
+            self.run.log_param("error", "JSONDecodeError")
+            self.run.set_error("JSONDecodeError")
+            self.cacheable = False
+        return result
+
+    def fail(self, error: Exception):
+        """Abandon the analysis after the LLM call itself failed."""
+        self.cancel()
+        self.run.set_error(str(error))
+        log_run(self.run)
+
+    def cancel(self):
+        if self.initial_task is not None:
+            self.initial_task.cancel()
+
+    async def score(self, result: Dict) -> Dict:
+        """Compute initial and projected scores for the proposed changes."""
+        if SCORING_MODE == "local":
+            with self.timer.stage("scoring"):
+                return ats_scorer.score_analysis(self.resume_text, self.job_description, result)
+
+        # 2. Only the projected score has to wait for the proposed changes
+        changes_text = summarize_changes(result)
+        initial = await self.initial_task
+        projected = await self.timer.measure(
+            "projected_score",
+            calculate_projected_score_async(
+                self.resume_text,
+                self.job_description,
+                changes_text,
+                initial.get("initial_score", 0)
+            )
+        )
+        scores = {
+            "initial_score": initial.get("initial_score", 0),
+            "projected_score": projected.get("projected_score", 0),
+            "reasoning": projected.get("reasoning", initial.get("reasoning", "")),
+        }
+        if "error" in initial or "error" in projected:
+            scores["error"] = initial.get("error") or projected.get("error")
+        return scores
+
+    async def finish(self, result: Dict) -> Dict:
+        """Anchor and score the proposed changes, then record and cache the result."""
+        if self.docx_conversion is not None:
+            try:
+                await self.wait_for_docx()
+            except Exception as e:
+                self.fail(e)
+                raise
 
-        # 2. Separate Robust Scoring Step
         try:
-            # Summarize proposed changes for the scorer
-            changes_summary = []
-            if "sections" in result:
-                for section in result["sections"]:
-                    name = section.get("section_name", "Unknown")
-                    gaps = section.get("gaps", [])
-                    suggestions = section.get("suggestions", [])
-                    edits = section.get("edits", [])
-                    changes_summary.append(f"Section {name}: Found {len(gaps)} gaps. {len(suggestions)} suggestions. Suggested {len(edits)} edits.")
-                    if suggestions:
-                        changes_summary.append(f" - Advice: {'; '.join(suggestions[:3])}")
-            
-            changes_text = "\n".join(changes_summary)
-            scores = calculate_scores(resume_text, job_description, changes_text)
-            result["initial_score"] = scores.get("initial_score", 0)
-            result["projected_score"] = scores.get("projected_score", 0)
-            result["score_reasoning"] = scores.get("reasoning", "")
-            
-            mlflow.log_metric("initial_score", result["initial_score"])
-            mlflow.log_metric("projected_score", result["projected_score"])
-            
+            sections = result.get("sections", [])
+            unmatched = await self.timer.measure(
+                "anchor_edits", file_io.run(anchor_edits, self.docx_path, sections)
+            )
+            if unmatched and self.text_source == "pdf":
+                # Targets quoted from the PDF text may differ from the DOCX in glyphs and spacing
+                reconciled = await self.timer.measure(
+                    "reconcile_edits", file_io.run(reconcile_edits, self.docx_path, sections)
+                )
+                self.run.log_metric("reconciled_edits", reconciled)
+                unmatched = sum(
+                    1 for section in sections for edit in section.get("edits", [])
+                    if isinstance(edit, dict) and not edit.get("matched", True)
+                )
+            self.run.log_metric("unmatched_edits", unmatched)
+            if unmatched:
+                logger.warning(f"{unmatched} proposed edits do not match any text in the resume")
+        except Exception as e:
+            # Unanchored edits are still located by search when the resume is generated
+            logger.error(f"Anchoring edits failed: {e}")
+
+        try:
+            scores = await self.score(result)
+            result["initial_score"] = scores["initial_score"]
+            result["projected_score"] = scores["projected_score"]
+            result["score_reasoning"] = scores["reasoning"]
+            if "error" in scores:
+                self.run.log_param("scoring_error", scores["error"])
+                self.cacheable = False
+
+            self.run.log_metric("initial_score", result["initial_score"])
+            self.run.log_metric("projected_score", result["projected_score"])
+
         except Exception as e:
             logger.error(f"Scoring failed: {e}")
             result["initial_score"] = 0
             result["projected_score"] = 0
-            mlflow.log_param("scoring_error", str(e))
+            self.run.log_param("scoring_error", str(e))
+            self.cacheable = False
+
+        for stage, duration_ms in self.timer.timings.items():
+            self.run.log_metric(f"{stage}_ms", duration_ms)
+        logger.info(f"analyze_gaps stage timings (ms): {self.timer.timings}")
+
+        log_run(self.run)
+        if self.cacheable:
+            await file_io.run(analysis_cache.set, self.cache_key, result)
+        if self.role is None and result.get("role_analysis"):
+            role = {key: result[key] for key in ROLE_FIELDS if key in result}
+            await file_io.run(role_cache.set, role_cache_key(self.job_description), role)
 
         return result
 
-def calculate_scores(resume_text: str, job_description: str, changes_summary: str) -> Dict:
-    client = openai.OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-    
-    prompt = CALCULATE_SCORES_PROMPT_TEMPLATE.format(
-        job_description=job_description[:2000], # Truncated in original too, keeping consistent but cleaner
+
+async def analyze_gaps_async(
+    docx_path: str, job_description: str, pdf_path: str = None, use_cache: bool = True, mode: str = None,
+    docx_conversion: Awaitable[str] = None, pdf_hash: str = None
+) -> Dict:
+    """
+    Analyze the resume against the job description.
+
+    Args:
+        docx_path: Converted DOCX, or None when docx_conversion is given
+        job_description: Job posting text
+        pdf_path: Uploaded PDF; with docx_conversion, its text is analyzed
+        use_cache: Serve and store results in analysis_cache
+        mode: Overrides ANALYSIS_MODE
+        docx_conversion: Pending pdf_to_docx result. The model starts on the
+            PDF's text right away and the DOCX is awaited only to anchor edits.
+        pdf_hash: SHA-256 of the PDF from the upload, so its text can be
+            looked up in the conversion cache without hashing the file again
+    """
+    pipeline = _AnalysisPipeline(
+        docx_path, job_description, use_cache=use_cache, mode=mode, pdf_path=pdf_path, docx_conversion=docx_conversion,
+        pdf_hash=pdf_hash
+    )
+    cached = await pipeline.load()
+    if cached is not None:
+        return cached
+
+    pipeline.start()
+    try:
+        if pipeline.sharded:
+            result = await pipeline.timer.measure("gap_analysis", pipeline.run_sharded())
+        else:
+            content = await pipeline.timer.measure(
+                "gap_analysis", llm_client.chat_completion(pipeline.monolithic_prompt(), temperature=0.2)
+            )
+            result = pipeline.parse(content)
+    except Exception as e:
+        pipeline.fail(e)
+        raise
+
+    return await pipeline.finish(result)
+
+def _score_event(result: Dict) -> Dict:
+    return {
+        "event": "scores",
+        "initial_score": result.get("initial_score", 0),
+        "projected_score": result.get("projected_score", 0),
+        "score_reasoning": result.get("score_reasoning", ""),
+    }
+
+async def _monolithic_events(pipeline: "_AnalysisPipeline", chunks: List[str]) -> AsyncIterator[JSONEvent]:
+    # A cached role analysis is available before the model produces anything
+    for key, value in (pipeline.role or {}).items():
+        yield JSONEvent(key, None, value)
+    parser = IncrementalJSONParser(stream_arrays=["sections"])
+    async for delta in llm_client.stream_chat_completion(pipeline.monolithic_prompt(), temperature=0.2):
+        chunks.append(delta)
+        for event in parser.feed(delta):
+            yield event
+
+async def analyze_gaps_stream(
+    docx_path: str, job_description: str, use_cache: bool = True, mode: str = None,
+    pdf_path: str = None, docx_conversion: Awaitable[str] = None, pdf_hash: str = None
+) -> AsyncIterator[Dict]:
+    """
+    Streaming variant of analyze_gaps_async.
+
+    Yields event dicts as soon as each part of the analysis is available:
+    one event per field in STREAMED_FIELDS, a "section" event per completed
+    section, a "scores" event once scoring finishes and finally a "complete"
+    event carrying the full result (same shape analyze_gaps_async returns).
+    pdf_path, docx_conversion and pdf_hash work as in analyze_gaps_async.
+    """
+    pipeline = _AnalysisPipeline(
+        docx_path, job_description, use_cache=use_cache, mode=mode, pdf_path=pdf_path, docx_conversion=docx_conversion,
+        pdf_hash=pdf_hash
+    )
+    cached = await pipeline.load()
+    if cached is not None:
+        for field in STREAMED_FIELDS:
+            if field in cached:
+                yield {"event": field, "data": cached[field]}
+        for index, section in enumerate(cached.get("sections", [])):
+            yield {"event": "section", "index": index, "data": section}
+        yield _score_event(cached)
+        yield {"event": "complete", "result": cached}
+        return
+
+    pipeline.start()
+    chunks: List[str] = []
+    source = pipeline.sharded_events() if pipeline.sharded else _monolithic_events(pipeline, chunks)
+    first_event_logged = False
+    try:
+        with pipeline.timer.stage("gap_analysis"):
+            async for key, index, value in source:
+                if key == "sections" and index is not None:
+                    event = {"event": "section", "index": index, "data": value}
+                elif key in STREAMED_FIELDS:
+                    event = {"event": key, "data": value}
+                else:
+                    continue
+                if not first_event_logged:
+                    pipeline.run.log_metric(
+                        "first_event_ms", round((time.perf_counter() - pipeline.started) * 1000, 1)
+                    )
+                    first_event_logged = True
+                yield event
+    except (asyncio.CancelledError, GeneratorExit):
+        # Client went away mid-stream; don't leave the scoring call running
+        pipeline.cancel()
+        raise
+    except Exception as e:
+        pipeline.fail(e)
+        raise
+
+    result = pipeline.sharded_result if pipeline.sharded else pipeline.parse("".join(chunks))
+    result = await pipeline.finish(result)
+    yield _score_event(result)
+    yield {"event": "complete", "result": result}
+
+def analyze_gaps(docx_path: str, job_description: str, pdf_path: str = None, use_cache: bool = True) -> Dict:
+    """Blocking wrapper around analyze_gaps_async for scripts and tests."""
+    return asyncio.run(analyze_gaps_async(docx_path, job_description, pdf_path=pdf_path, use_cache=use_cache))
+
+async def analyze_role_async(job_description: str) -> Dict:
+    """JD-only stage: role analysis plus company name and job title."""
+    prompt = ROLE_ANALYSIS_PROMPT_TEMPLATE.format(job_description=job_description)
+    return await llm_client.chat_json(prompt, temperature=0.2)
+
+async def analyze_overview_async(resume_text: str, job_description: str, role_analysis: Dict) -> Dict:
+    """Whole-resume stage: diagnosis, proposed title and summary."""
+    prompt = RESUME_OVERVIEW_PROMPT_TEMPLATE.format(
+        role_analysis=json.dumps(role_analysis, indent=2),
+        job_description=job_description,
+        resume_text=resume_text
+    )
+    return await llm_client.chat_json(prompt, temperature=0.2)
+
+async def rewrite_section_async(section: ResumeSection, job_description: str, role_analysis: Dict) -> Dict:
+    """Per-section stage: gaps, suggestions and edits for a single resume section."""
+    prompt = SECTION_REWRITE_PROMPT_TEMPLATE.format(
+        role_analysis=json.dumps(role_analysis, indent=2),
+        job_description=job_description,
+        section_name=section.name,
+        section_type=section.section_type,
+        section_text=section.text
+    )
+    result = await llm_client.chat_json(prompt, temperature=0.2)
+    result.setdefault("section_name", section.name)
+    result.setdefault("section_type", section.section_type)
+    result.setdefault("original_text", section.text)
+    result.setdefault("gaps", [])
+    result.setdefault("suggestions", [])
+    result.setdefault("edits", [])
+    return result
+
+async def calculate_initial_score_async(resume_text: str, job_description: str) -> Dict:
+    """Score the original resume against the JD (independent of any proposed changes)."""
+    prompt = INITIAL_SCORE_PROMPT_TEMPLATE.format(
+        job_description=job_description[:2000],
+        resume_text=resume_text[:3000]
+    )
+    try:
+        return await llm_client.chat_json(prompt, temperature=0.1)
+    except Exception as e:
+        logger.error(f"Error in calculate_initial_score: {e}")
+        return {"initial_score": 0, "error": str(e)}
+
+async def calculate_projected_score_async(resume_text: str, job_description: str, changes_summary: str, initial_score: int) -> Dict:
+    """Estimate the score once the proposed changes are applied, anchored on the initial score."""
+    prompt = PROJECTED_SCORE_PROMPT_TEMPLATE.format(
+        job_description=job_description[:2000],
         resume_text=resume_text[:3000],
+        initial_score=initial_score,
         changes_summary=changes_summary
     )
-    
-    # We create a nested run or a separate run? Usually scoring is part of the parent task.
-    # For simplicity, we'll just log this as part of the parent run if it's active.
-    # But calculate_scores might be called independently? The current flow calls it FROM analyze_gaps.
-    # To be safe, checking active run.
-    
-    active_run = mlflow.active_run()
-    if not active_run:
-        # If called independently, start a run.
-        # But here it's helper. Let's just log params to active run if exists.
-        pass
-    
-    # Note: If we want to log the SCORING prompt specifically, we can log it as a param too.
-    if active_run:
-        mlflow.set_tag("scoring_prompt_template", CALCULATE_SCORES_PROMPT_TEMPLATE[:5000])
-
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1,
-            response_format={ "type": "json_object" }
-        )
-        return json.loads(response.choices[0].message.content)
+        return await llm_client.chat_json(prompt, temperature=0.1)
     except Exception as e:
-        logger.error(f"Error in calculate_scores: {e}")
-        return {"initial_score": 0, "projected_score": 0}
+        logger.error(f"Error in calculate_projected_score: {e}")
+        return {"projected_score": 0, "error": str(e)}
+
+async def calculate_scores_async(resume_text: str, job_description: str, changes_summary: str) -> Dict:
+    """Run both scoring stages back to back for callers outside analyze_gaps."""
+    initial = await calculate_initial_score_async(resume_text, job_description)
+    projected = await calculate_projected_score_async(
+        resume_text, job_description, changes_summary, initial.get("initial_score", 0)
+    )
+    scores = {
+        "initial_score": initial.get("initial_score", 0),
+        "projected_score": projected.get("projected_score", 0),
+        "reasoning": projected.get("reasoning", initial.get("reasoning", "")),
+    }
+    if "error" in initial or "error" in projected:
+        scores["error"] = initial.get("error") or projected.get("error")
+    return scores
 
-def generate_tailored_resume(docx_path: str, sections: List[Dict]) -> str:
+def calculate_scores(resume_text: str, job_description: str, changes_summary: str) -> Dict:
+    return asyncio.run(calculate_scores_async(resume_text, job_description, changes_summary))
+
+def _tailor_into(docx_path: str, sections: List[Dict], dest) -> List[Dict]:
+    """Apply exactly the given sections' edits to the DOCX and write the result to dest."""
     # Flatten edits from all sections
     all_edits = []
     
@@ -361,7 +688,34 @@ def generate_tailored_resume(docx_path: str, sections: List[Dict]) -> str:
         else:
              all_edits.extend(section.edits)
             
+    # Regenerating after toggling a few edits only re-applies the paragraphs they touch
+    session = edit_sessions.get(docx_path)
+    with session.lock:
+        report = session.update(all_edits)
+        session.save(dest)
+    missed = [entry for entry in report if entry["status"] in ("not_found", "failed")]
+    if missed:
+        logger.warning(f"{len(missed)} of {len(report)} edits were not applied to {os.path.basename(docx_path)}")
+    return report
+
+def generate_tailored_resume(docx_path: str, sections: List[Dict]) -> Tuple[str, List[Dict]]:
+    """
+    Write a copy of the DOCX with exactly the given sections' edits applied.
+
+    Returns:
+        Tuple of (tailored DOCX path, per-edit report from edit_engine.apply_edits)
+    """
     output_path = docx_path.replace(".docx", "_tailored.docx")
-    apply_edits_to_docx(docx_path, all_edits, output_path)
-    return output_path
+    report = _tailor_into(docx_path, sections, output_path)
+    return output_path, report
 
+def render_tailored_resume(docx_path: str, sections: List[Dict]) -> Tuple[bytes, List[Dict]]:
+    """
+    Like generate_tailored_resume, but returns the DOCX bytes instead of writing a file.
+
+    Returns:
+        Tuple of (tailored DOCX bytes, per-edit report from edit_engine.apply_edits)
+    """
+    buffer = io.BytesIO()
+    report = _tailor_into(docx_path, sections, buffer)
+    return buffer.getvalue(), report
@@ -0,0 +1,222 @@
+"""
+Experiment tracking helpers.
+
+LLM call sites collect params, tags, metrics and text artifacts into a
+RunRecord while they work, then hand the finished record to log_run. log_run
+only samples the record and queues it; a background thread writes queued
+records to MLflow in batches, so request latency never waits on the
+tracking store. Writing goes through an explicit MlflowClient instead of the
+fluent mlflow API, whose thread-local active run cannot be shared.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MLFLOW_DB_PATH = "sqlite:///mlflow.db"
+ANALYSIS_EXPERIMENT_NAME = "Resume Tailor Analysis"
+SCRAPER_EXPERIMENT_NAME = "Job Description Extraction"
+
+# Fraction of successful runs recorded; failed runs are always recorded
+TELEMETRY_SAMPLE_RATE = float(os.getenv("TELEMETRY_SAMPLE_RATE", "1.0"))
+TELEMETRY_QUEUE_SIZE = int(os.getenv("TELEMETRY_QUEUE_SIZE", "1000"))
+TELEMETRY_BATCH_SIZE = int(os.getenv("TELEMETRY_BATCH_SIZE", "50"))
+TELEMETRY_FLUSH_SECONDS = float(os.getenv("TELEMETRY_FLUSH_SECONDS", "5"))
+
+
+class RunRecord:
+    """In-memory record of one tracked run, mirroring the mlflow logging API."""
+
+    def __init__(self, experiment_name: str, run_name: str):
+        self.experiment_name = experiment_name
+        self.run_name = run_name
+        self.start_time = int(time.time() * 1000)
+        self.params: Dict[str, str] = {}
+        self.tags: Dict[str, str] = {}
+        self.metrics: Dict[str, float] = {}
+        self.texts: Dict[str, str] = {}
+        self.error: Optional[str] = None
+
+    def log_param(self, key: str, value: Any):
+        self.params[key] = str(value)
+
+    def set_tag(self, key: str, value: Any):
+        self.tags[key] = str(value)
+
+    def log_metric(self, key: str, value: float):
+        self.metrics[key] = float(value)
+
+    def log_text(self, text: str, artifact_file: str):
+        self.texts[artifact_file] = text
+
+    def set_error(self, error: str):
+        self.error = error
+
+    @property
+    def has_errors(self) -> bool:
+        """Failed runs, and runs that logged a partial failure such as scoring_error."""
+        return self.error is not None or any(key.endswith("error") for key in self.params)
+
+
+class TelemetrySink:
+    """Bounded in-memory queue drained by a daemon thread that writes to MLflow in batches."""
+
+    def __init__(
+        self,
+        sample_rate: float = TELEMETRY_SAMPLE_RATE,
+        queue_size: int = TELEMETRY_QUEUE_SIZE,
+        batch_size: int = TELEMETRY_BATCH_SIZE,
+        flush_seconds: float = TELEMETRY_FLUSH_SECONDS,
+        tracking_uri: str = MLFLOW_DB_PATH,
+    ):
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.tracking_uri = tracking_uri
+        self._queue: "queue.Queue[Optional[RunRecord]]" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._client = None
+        self._experiment_ids: Dict[str, str] = {}
+        self.queued = 0
+        self.written = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def submit(self, record: RunRecord):
+        """Sample and enqueue a finished record without blocking."""
+        if not record.has_errors and random.random() >= self.sample_rate:
+            self.sampled_out += 1
+            return
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(record)
+            self.queued += 1
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"Telemetry queue full, dropping run {record.run_name}")
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until everything queued so far is written (for scripts, tests and shutdown)."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def stats(self) -> Dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "pending": self._queue.qsize(),
+            "queued": self.queued,
+            "written": self.written,
+            "sampled_out": self.sampled_out,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="telemetry-sink", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        batch: List[RunRecord] = []
+        waiters: List[threading.Event] = []
+        deadline = time.monotonic() + self.flush_seconds
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+            except queue.Empty:
+                pass
+
+            if waiters or len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                if batch:
+                    self._write_batch(batch)
+                    batch = []
+                for waiter in waiters:
+                    waiter.set()
+                waiters = []
+                deadline = time.monotonic() + self.flush_seconds
+
+    def _write_batch(self, records: List[RunRecord]):
+        try:
+            from mlflow import MlflowClient
+
+            if self._client is None:
+                self._client = MlflowClient(tracking_uri=self.tracking_uri)
+        except Exception as e:
+            logger.error(f"Telemetry unavailable, dropping {len(records)} runs: {e}")
+            self.failed += len(records)
+            return
+
+        for record in records:
+            try:
+                self._write_run(record)
+                self.written += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Failed to log run {record.run_name}: {e}")
+
+    def _experiment_id(self, name: str) -> str:
+        if name not in self._experiment_ids:
+            experiment = self._client.get_experiment_by_name(name)
+            self._experiment_ids[name] = experiment.experiment_id if experiment else self._client.create_experiment(name)
+        return self._experiment_ids[name]
+
+    def _write_run(self, record: RunRecord):
+        from mlflow.entities import Metric, Param, RunTag
+
+        client = self._client
+        run = client.create_run(
+            self._experiment_id(record.experiment_name), start_time=record.start_time, run_name=record.run_name
+        )
+        run_id = run.info.run_id
+        timestamp = int(time.time() * 1000)
+        client.log_batch(
+            run_id,
+            metrics=[Metric(key, value, timestamp, 0) for key, value in record.metrics.items()],
+            params=[Param(key, value) for key, value in record.params.items()],
+            tags=[RunTag(key, value) for key, value in record.tags.items()],
+        )
+        for artifact_file, text in record.texts.items():
+            client.log_text(run_id, text, artifact_file)
+        client.set_terminated(run_id, status="FAILED" if record.error else "FINISHED")
+
+
+sink = TelemetrySink()
+# Scripts calling the sync wrappers exit right after their last run
+atexit.register(lambda: sink.flush(timeout=5.0))
+
+
+def log_run(record: RunRecord):
+    """
+    Hand a finished RunRecord to the background sink.
+
+    Never blocks and never raises; tracking must not slow down or fail a request.
+    """
+    try:
+        sink.submit(record)
+    except Exception as e:
+        logger.error(f"Failed to queue run {record.run_name}: {e}")
+
+
+def flush(timeout: float = 10.0) -> bool:
+    """Wait for queued runs to be written."""
+    return sink.flush(timeout)
@@ -39,9 +39,18 @@ def run_analysis_trigger():
     # This triggers analyze_gaps -> mlflow logging
     response = requests.post(f"{BASE_URL}/analyze", headers=headers, files=files, data=data)
     
-    if response.status_code == 200:
-        print("Analysis Success!")
-        print(json.dumps(response.json(), indent=2)[:200] + "...")
+    if response.status_code == 202:
+        # The analysis runs as a queued job
+        status_url = f"{BASE_URL}{response.json()['status_url']}"
+        job = {"status": "queued"}
+        while job["status"] not in ("succeeded", "failed"):
+            time.sleep(1)
+            job = requests.get(status_url).json()
+        if job["status"] == "succeeded":
+            print("Analysis Success!")
+            print(json.dumps(job["result"], indent=2)[:200] + "...")
+        else:
+            print(f"Analysis Failed: {job['error']}")
     else:
         print(f"Analysis Failed: {response.text}")
 
@@ -0,0 +1,120 @@
+"""
+Streaming upload sink.
+
+Starlette spools each uploaded file while the request is parsed (in memory
+up to 1 MB, on disk beyond). The endpoints used to read the whole upload
+back into memory with `await resume.read()` and write it out from the event
+loop. save_upload instead copies the spooled file to its destination in
+UPLOAD_CHUNK_BYTES chunks on the file_io pool (see executors), hashing as it goes, so the
+SHA-256 that keys the conversion cache (see conversion_cache) costs no
+extra read of the file.
+
+Uploads over UPLOAD_MAX_MB, and PDFs over UPLOAD_MAX_PAGES pages, are
+rejected with nothing left on disk.
+"""
+
+import hashlib
+import logging
+import os
+from typing import NamedTuple, Optional
+
+from fastapi import UploadFile
+
+from executors import file_io
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_MAX_MB = float(os.getenv("UPLOAD_MAX_MB", "10"))
+UPLOAD_MAX_PAGES = int(os.getenv("UPLOAD_MAX_PAGES", "20"))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class UploadError(Exception):
+    """Raised when an upload is rejected; status_code is the HTTP status to answer with."""
+
+    status_code = 400
+
+
+class UploadTooLargeError(UploadError):
+    status_code = 413
+
+
+class SavedUpload(NamedTuple):
+    path: str
+    sha256: str
+    size: int
+    # None unless the page count was checked
+    pages: Optional[int]
+
+
+def _count_pages(path: str) -> int:
+    import pymupdf
+
+    try:
+        with pymupdf.open(path, filetype="pdf") as pdf:
+            if pdf.needs_pass:
+                raise UploadError("PDF is password protected")
+            return len(pdf)
+    except UploadError:
+        raise
+    except Exception as e:
+        raise UploadError(f"Not a readable PDF: {e}")
+
+
+def _copy(source, dest_path: str, max_bytes: int, max_pages: Optional[int]) -> SavedUpload:
+    digest = hashlib.sha256()
+    size = 0
+    source.seek(0)
+    try:
+        with open(dest_path, "wb") as dest:
+            while True:
+                chunk = source.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"Upload is larger than {max_bytes // (1024 * 1024)} MB")
+                digest.update(chunk)
+                dest.write(chunk)
+        pages = None
+        if max_pages is not None:
+            pages = _count_pages(dest_path)
+            if pages > max_pages:
+                raise UploadError(f"PDF has {pages} pages; at most {max_pages} are supported")
+    except BaseException:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+    return SavedUpload(dest_path, digest.hexdigest(), size, pages)
+
+
+async def save_upload(
+    upload: UploadFile,
+    dest_path: str,
+    max_mb: float = UPLOAD_MAX_MB,
+    max_pages: Optional[int] = None,
+) -> SavedUpload:
+    """
+    Copy an uploaded file to dest_path off the event loop, hashing it on the way.
+
+    Args:
+        upload: The request's file
+        dest_path: Where to write it
+        max_mb: Size limit
+        max_pages: Page limit; when set, the upload must be a PDF
+
+    Returns:
+        SavedUpload with the path, SHA-256, size and page count
+
+    Raises:
+        UploadTooLargeError: Over the size limit
+        UploadError: Not a readable PDF, or over the page limit
+        ExecutorSaturatedError: The file_io pool is saturated
+    """
+    max_bytes = int(max_mb * 1024 * 1024)
+    # Starlette knows the size once the body is parsed; refuse before writing anything
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLargeError(f"Upload is larger than {max_bytes // (1024 * 1024)} MB")
+    saved = await file_io.run(_copy, upload.file, dest_path, max_bytes, max_pages)
+    logger.info(f"Saved upload {os.path.basename(dest_path)} ({saved.size} bytes)")
+    return saved
@@ -1,8 +1,9 @@
 import os
 import shutil
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 import mlflow
 import json
+import telemetry
 
 # Set dummy env var to pass initialization checks
 os.environ["OPENAI_API_KEY"] = "sk-dummy-key"
@@ -38,18 +39,21 @@ def verify_logging():
     # Actually, using sqlite.
     
     with patch("tailor.extract_text_from_docx", side_effect=mock_extract_text):
-        with patch("openai.OpenAI") as MockClient:
+        with patch("llm_client.get_client") as MockClient:
             # Setup mock client
             mock_instance = MockClient.return_value
             mock_response = MagicMock()
             mock_response.choices[0].message.content = json.dumps(DUMMY_LLM_RESPONSE)
-            mock_instance.chat.completions.create.return_value = mock_response
+            mock_instance.chat.completions.create = AsyncMock(return_value=mock_response)
             
             # Run analysis
             print("Running analyze_gaps...")
             result = analyze_gaps("dummy.docx", "Job Description here")
             
             print("Result:", result)
+
+            # Runs are written by a background thread
+            telemetry.flush()
             
             # Check MLflow
             print("Checking MLflow...")
@@ -19,6 +19,7 @@ export default function TailorPage() {
 
     const {
         file, setFile,
+        preview,
         jobDescription, setJobDescription,
         isLoading, status,
         downloadUrl,
@@ -80,6 +81,7 @@ export default function TailorPage() {
                             {/* Step 1: Upload */}
                             <UploadStep
                                 file={file}
+                                preview={preview}
                                 onFileChange={handleFileChange}
                                 fileInputRef={fileInputRef}
                                 disabled={isLoading || !!sections || !!downloadUrl}
@@ -247,8 +247,13 @@ export const AnalysisReview: React.FC<AnalysisReviewProps> = ({
                                                     <span className={`text-xs font-bold uppercase tracking-wider ${edit.status === 'accepted' ? 'text-green-600' : edit.status === 'rejected' ? 'text-slate-500' : 'text-indigo-500'}`}>
                                                         {edit.status === 'accepted' ? '✓ Accepted' : edit.status === 'rejected' ? '✕ Rejected' : 'Suggestion'}
                                                     </span>
+                                                    {edit.matched === false && (
+                                                        <span className="text-xs font-bold text-amber-600" title="The text this suggestion replaces was not found in your resume, so it cannot be applied">
+                                                            ⚠ Not found in resume
+                                                        </span>
+                                                    )}
                                                     <div className="flex space-x-1">
-                                                        {edit.status !== 'accepted' && (
+                                                        {edit.status !== 'accepted' && edit.matched !== false && (
                                                             <button
                                                                 onClick={() => onSuggestionStatus(sectionIdx, editIdx, 'accepted')}
                                                                 className="p-1 hover:bg-green-100 text-green-600 rounded"
@@ -296,7 +301,7 @@ export const AnalysisReview: React.FC<AnalysisReviewProps> = ({
                                 const sortedEdits = [...section.edits].map((e, i) => {
                                     const pos = text.indexOf(e.target_text);
                                     return { ...e, origIdx: i, pos };
-                                }).filter(e => e.pos !== -1).sort((a, b) => a.pos - b.pos);
+                                }).filter(e => e.pos !== -1 && e.matched !== false).sort((a, b) => a.pos - b.pos);
 
                                 // Filter overlapping edits
                                 const validEdits = [];
@@ -334,6 +339,18 @@ export const AnalysisReview: React.FC<AnalysisReviewProps> = ({
                                     elements.push(<span key="end">{text.substring(lastIndex)}</span>);
                                 }
 
+                                const unmatched = section.edits.filter(e => e.matched === false);
+                                if (unmatched.length > 0) {
+                                    elements.push(
+                                        <div key="unmatched" className="mt-4 p-3 rounded-lg bg-amber-50 border border-amber-200 text-amber-800 text-xs">
+                                            <p className="font-bold mb-1">⚠ {unmatched.length} suggestion{unmatched.length > 1 ? 's' : ''} could not be found in your resume and will not be applied:</p>
+                                            {unmatched.map((e, i) => (
+                                                <p key={i} className="line-through opacity-70">{e.target_text}</p>
+                                            ))}
+                                        </div>
+                                    );
+                                }
+
                                 return elements;
                             })()}
                         </div>
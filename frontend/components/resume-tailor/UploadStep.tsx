@@ -1,13 +1,16 @@
 import React from 'react';
+import { api } from '../../services/api';
+import { PreviewResponse } from '../../types';
 
 interface UploadStepProps {
     file: File | null;
+    preview?: PreviewResponse | null;
     onFileChange: (e: React.ChangeEvent<HTMLInputElement>) => void;
     fileInputRef: React.RefObject<HTMLInputElement | null>;
     disabled: boolean;
 }
 
-export const UploadStep: React.FC<UploadStepProps> = ({ file, onFileChange, fileInputRef, disabled }) => {
+export const UploadStep: React.FC<UploadStepProps> = ({ file, preview, onFileChange, fileInputRef, disabled }) => {
     return (
         <div className={`transition-all duration-300 ${disabled ? 'opacity-50 pointer-events-none' : ''}`}>
             <div className="flex items-center mb-4">
@@ -36,6 +39,20 @@ export const UploadStep: React.FC<UploadStepProps> = ({ file, onFileChange, file
                 {file && (
                     <p className="mt-2 text-sm text-green-600 pl-2 font-medium">✓ {file.name}</p>
                 )}
+                {file && preview && (
+                    <div className="mt-4 flex gap-3 overflow-x-auto pb-2">
+                        {preview.thumbnails.map((url, index) => (
+                            // eslint-disable-next-line @next/next/no-img-element
+                            <img
+                                key={url}
+                                src={api.previewUrl(url)}
+                                alt={`Page ${index + 1} of ${file.name}`}
+                                loading={index === 0 ? 'eager' : 'lazy'}
+                                className="h-48 rounded-lg border border-slate-200 shadow-sm"
+                            />
+                        ))}
+                    </div>
+                )}
             </div>
         </div>
     );
@@ -1,9 +1,10 @@
 import { useState, useRef, useEffect } from 'react';
 import { useRouter } from 'next/navigation';
 import { api } from '../services/api';
-import { SectionAnalysis, ToastState, RoleAnalysis, ResumeDiagnosis } from '../types';
+import { SectionAnalysis, ToastState, RoleAnalysis, ResumeDiagnosis, PreviewResponse } from '../types';
 
 const TEMP_STATE_KEY = 'tailor_temp_state';
+const PREVIEW_POLL_MS = 1000;
 
 interface UseResumeAnalysisProps {
     isAuthenticated: boolean;
@@ -14,6 +15,7 @@ interface UseResumeAnalysisProps {
 export const useResumeAnalysis = ({ isAuthenticated, usageCount, setUsageCount }: UseResumeAnalysisProps) => {
     const router = useRouter();
     const [file, setFile] = useState<File | null>(null);
+    const [preview, setPreview] = useState<PreviewResponse | null>(null);
     const [jobDescription, setJobDescription] = useState('');
     const [isLoading, setIsLoading] = useState(false);
     const [downloadUrl, setDownloadUrl] = useState('');
@@ -78,6 +80,37 @@ export const useResumeAnalysis = ({ isAuthenticated, usageCount, setUsageCount }
         }
     }, []);
 
+    // Show the document as soon as it is picked; the backend converts it while the JD is entered
+    useEffect(() => {
+        setPreview(null);
+        if (!file) return;
+
+        let cancelled = false;
+        let timer: ReturnType<typeof setTimeout> | undefined;
+        const poll = async (token: string) => {
+            try {
+                const next = await api.getPreview(token);
+                if (cancelled) return;
+                setPreview(next);
+                if (!next.document_ready && !next.error) timer = setTimeout(() => poll(token), PREVIEW_POLL_MS);
+            } catch (error) {
+                console.error('Error polling preview:', error);
+            }
+        };
+        api.previewResume(file)
+            .then((first) => {
+                if (cancelled) return;
+                setPreview(first);
+                if (!first.document_ready) timer = setTimeout(() => poll(first.token), PREVIEW_POLL_MS);
+            })
+            .catch((error) => console.error('Error previewing file:', error));
+
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [file]);
+
     const handleFileChange = (e: React.ChangeEvent<HTMLInputElement>) => {
         if (e.target.files) {
             setFile(e.target.files[0]);
@@ -122,24 +155,75 @@ export const useResumeAnalysis = ({ isAuthenticated, usageCount, setUsageCount }
 
         try {
             const token = localStorage.getItem('auth_token');
-            const data = await api.analyzeResume(file, jobDescription, token);
+            // Render each part of the analysis as soon as the backend streams it
+            const data = await api.analyzeResumeStream(file, jobDescription, (event) => {
+                switch (event.event) {
+                    case 'status':
+                        setStatus(event.stage === 'converting' ? 'Reading your resume...' : 'Analyzing against the job description...');
+                        break;
+                    case 'role_analysis':
+                        setRoleAnalysis(event.data);
+                        setSections(prev => prev ?? []);
+                        break;
+                    case 'diagnosis':
+                        setDiagnosis(event.data);
+                        break;
+                    case 'proposed_title':
+                        setProposedTitle(event.data);
+                        break;
+                    case 'proposed_summary':
+                        setProposedSummary(event.data);
+                        break;
+                    case 'section': {
+                        const section = {
+                            ...event.data,
+                            edits: (event.data.edits || []).map((edit) => ({ ...edit, status: 'pending' as const }))
+                        };
+                        setSections(prev => {
+                            const next = [...(prev ?? [])];
+                            next[event.index] = section;
+                            return next;
+                        });
+                        break;
+                    }
+                    case 'scores':
+                        setInitialScore(event.initial_score || 0);
+                        setProjectedScore(event.projected_score || 0);
+                        break;
+                }
+            }, token);
 
             if (data.sections) {
                 const initializedSections = data.sections.map((sec) => ({
                     ...sec,
                     edits: sec.edits.map((edit) => ({ ...edit, status: 'pending' as const }))
                 }));
-                setSections(initializedSections);
+                // Keep any accept/reject choices made while sections were streaming in, but take
+                // each edit's target, content and anchors from the final result: its targets
+                // were reconciled and anchored against the DOCX that /generate edits
+                setSections(prev => initializedSections.map((sec, sectionIdx) => {
+                    const kept = prev?.[sectionIdx];
+                    if (!kept) return sec;
+                    return {
+                        ...kept,
+                        edits: sec.edits.map((edit, editIdx) => {
+                            const keptEdit = kept.edits?.[editIdx];
+                            return keptEdit
+                                ? {
+                                    ...keptEdit,
+                                    target_text: edit.target_text,
+                                    new_content: edit.new_content,
+                                    anchors: edit.anchors,
+                                    matched: edit.matched
+                                }
+                                : edit;
+                        })
+                    };
+                }));
                 setUploadedFilename(data.filename);
                 setInitialScore(data.initial_score || 0);
                 setProjectedScore(data.projected_score || 0);
 
-                // Set new fields
-                setRoleAnalysis(data.role_analysis);
-                setDiagnosis(data.diagnosis);
-                setProposedTitle(data.proposed_title);
-                setProposedSummary(data.proposed_summary);
-
                 if (data.company_name && data.company_name !== "Unknown Company") {
                     if (!companyName || companyName === "Unknown Company") setCompanyName(data.company_name);
                 }
@@ -280,6 +364,7 @@ export const useResumeAnalysis = ({ isAuthenticated, usageCount, setUsageCount }
 
     return {
         file, setFile,
+        preview,
         jobDescription, setJobDescription,
         isLoading, status,
         downloadUrl, setDownloadUrl,
@@ -1,7 +1,9 @@
-import { AnalyzeResponse, GenerateResponse, JdResponse, ResumeSaveData, UsageResponse, SectionAnalysis } from '../types';
+import { AnalyzeResponse, AnalyzeStreamEvent, GenerateResponse, JdResponse, JobResponse, PreviewResponse, ResumeSaveData, UsageResponse, SectionAnalysis } from '../types';
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
+const JOB_POLL_MS = 1000;
+
 const getHeaders = (token?: string | null, isMultipart: boolean = false): HeadersInit => {
     const headers: HeadersInit = {};
     if (token) {
@@ -35,6 +37,25 @@ export const api = {
         return res.json();
     },
 
+    previewResume: async (file: File): Promise<PreviewResponse> => {
+        const formData = new FormData();
+        formData.append('resume', file);
+        const res = await fetch(`${API_BASE_URL}/preview`, {
+            method: 'POST',
+            body: formData,
+        });
+        if (!res.ok) throw new Error('Preview failed');
+        return res.json();
+    },
+
+    getPreview: async (token: string): Promise<PreviewResponse> => {
+        const res = await fetch(`${API_BASE_URL}/preview/${token}`);
+        if (!res.ok) throw new Error('Preview expired');
+        return res.json();
+    },
+
+    previewUrl: (path: string): string => `${API_BASE_URL}${path}`,
+
     analyzeResume: async (file: File, jobDescription: string, token?: string | null): Promise<AnalyzeResponse> => {
         const formData = new FormData();
         formData.append('resume', file);
@@ -50,9 +71,76 @@ export const api = {
             throw new Error('LIMIT_REACHED');
         }
         if (!res.ok) throw new Error('Analysis failed');
+
+        // The analysis runs as a queued job; poll it until it finishes
+        const { job_id } = await res.json();
+        while (true) {
+            const job = await api.getJob<AnalyzeResponse>(job_id, token);
+            if (job.status === 'succeeded' && job.result) return job.result;
+            if (job.status === 'failed') throw new Error(job.error || 'Analysis failed');
+            await new Promise((resolve) => setTimeout(resolve, JOB_POLL_MS));
+        }
+    },
+
+    getJob: async <T>(jobId: string, token?: string | null): Promise<JobResponse<T>> => {
+        // Jobs are only visible to the account (or anonymous client) that submitted them
+        const res = await fetch(`${API_BASE_URL}/jobs/${jobId}`, {
+            headers: token ? { 'Authorization': `Bearer ${token}` } : {},
+        });
+        if (!res.ok) throw new Error('Job not found');
         return res.json();
     },
 
+    analyzeResumeStream: async (
+        file: File,
+        jobDescription: string,
+        onEvent: (event: AnalyzeStreamEvent) => void,
+        token?: string | null
+    ): Promise<AnalyzeResponse> => {
+        const formData = new FormData();
+        formData.append('resume', file);
+        formData.append('job_description', jobDescription);
+
+        const res = await fetch(`${API_BASE_URL}/analyze/stream`, {
+            method: 'POST',
+            headers: token ? { 'Authorization': `Bearer ${token}` } : {},
+            body: formData,
+        });
+
+        if (res.status === 403) {
+            throw new Error('LIMIT_REACHED');
+        }
+        if (!res.ok || !res.body) throw new Error('Analysis failed');
+
+        // Newline-delimited JSON: one event per line
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        // Assigned from inside handleLine, so keep TS from narrowing it to null
+        let result = null as AnalyzeResponse | null;
+
+        const handleLine = (line: string) => {
+            if (!line.trim()) return;
+            const event = JSON.parse(line) as AnalyzeStreamEvent;
+            if (event.event === 'error') throw new Error(event.detail || 'Analysis failed');
+            if (event.event === 'complete') result = event.result;
+            onEvent(event);
+        };
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop() || '';
+            lines.forEach(handleLine);
+        }
+        handleLine(buffer);
+
+        if (!result) throw new Error('Analysis failed');
+        return result;
+    },
+
     generateResume: async (filename: string, sections: SectionAnalysis[]): Promise<GenerateResponse> => {
         const res = await fetch(`${API_BASE_URL}/generate`, {
             method: 'POST',
@@ -1,9 +1,21 @@
+export interface EditAnchor {
+    part: string;
+    paragraph: number;
+    start: number | null;
+    end: number | null;
+    hash: string;
+}
+
 export interface EditSuggestion {
     target_text: string;
     new_content: string;
     action: string;
     rationale?: string;
     status?: 'pending' | 'accepted' | 'rejected';
+    // Where the target occurs in the DOCX; /generate looks anchored edits up directly
+    anchors?: EditAnchor[];
+    // False when the target text could not be found in the resume
+    matched?: boolean;
 }
 
 export interface ToastState {
@@ -71,6 +83,38 @@ export interface AnalyzeResponse {
     job_title?: string;
 }
 
+export interface JobResponse<T> {
+    id: string;
+    status: 'queued' | 'running' | 'succeeded' | 'failed';
+    stage: string | null;
+    stages: Record<string, { status: string; started_at: number; seconds?: number }>;
+    attempts: number;
+    result: T | null;
+    error: string | null;
+}
+
+export interface PreviewResponse {
+    token: string;
+    filename: string;
+    pages: number;
+    thumbnails: string[];
+    first_page_html: string;
+    first_page_docx: string | null;
+    docx: string | null;
+    document_ready: boolean;
+    error: string | null;
+}
+
+export type AnalyzeStreamEvent =
+    | { event: 'status'; stage: string }
+    | { event: 'role_analysis'; data: RoleAnalysis }
+    | { event: 'diagnosis'; data: ResumeDiagnosis }
+    | { event: 'proposed_title' | 'proposed_summary' | 'company_name' | 'job_title'; data: string }
+    | { event: 'section'; index: number; data: SectionAnalysis }
+    | { event: 'scores'; initial_score: number; projected_score: number; score_reasoning?: string }
+    | { event: 'complete'; result: AnalyzeResponse }
+    | { event: 'error'; detail: string };
+
 export interface GenerateResponse {
     download_url?: string;
     pdf_path?: string;
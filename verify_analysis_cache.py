@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from analysis_cache import ResultCache, make_cache_key
+
+class TestAnalysisCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "cache.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_key_ignores_whitespace_in_jd(self):
+        key_a = make_cache_key("resume", "Senior  Engineer\n\nPython", "gpt-4o", ["1", "1"])
+        key_b = make_cache_key("resume", " Senior Engineer Python ", "gpt-4o", ["1", "1"])
+        self.assertEqual(key_a, key_b)
+
+    def test_key_changes_with_model_and_prompt_version(self):
+        base = make_cache_key("resume", "jd", "gpt-4o", ["1", "1"])
+        self.assertNotEqual(base, make_cache_key("resume", "jd", "gpt-4o-mini", ["1", "1"]))
+        self.assertNotEqual(base, make_cache_key("resume", "jd", "gpt-4o", ["2", "1"]))
+
+    def test_hit_and_miss_counters(self):
+        cache = ResultCache(namespace="test", path=self.db_path)
+        self.assertIsNone(cache.get("k"))
+        cache.set("k", {"initial_score": 55})
+        self.assertEqual(cache.get("k"), {"initial_score": 55})
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_ttl_expiry(self):
+        cache = ResultCache(namespace="test", path=self.db_path, ttl_seconds=60)
+        with patch("analysis_cache.time.time", return_value=1000.0):
+            cache.set("k", {"v": 1})
+        with patch("analysis_cache.time.time", return_value=1061.0):
+            self.assertIsNone(cache.get("k"))
+
+    def test_size_eviction_keeps_recently_used(self):
+        cache = ResultCache(namespace="test", path=self.db_path, max_entries=2)
+        with patch("analysis_cache.time.time", return_value=1.0):
+            cache.set("a", {"v": "a"})
+        with patch("analysis_cache.time.time", return_value=2.0):
+            cache.set("b", {"v": "b"})
+        with patch("analysis_cache.time.time", return_value=3.0):
+            cache.get("a")
+        with patch("analysis_cache.time.time", return_value=4.0):
+            cache.set("c", {"v": "c"})
+
+        with patch("analysis_cache.time.time", return_value=5.0):
+            self.assertIsNone(cache.get("b"))
+            self.assertIsNotNone(cache.get("a"))
+            self.assertIsNotNone(cache.get("c"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_disabled_cache_is_a_no_op(self):
+        cache = ResultCache(namespace="test", path=self.db_path, enabled=False)
+        cache.set("k", {"v": 1})
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["misses"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from ats_scorer import apply_edits_to_text, extract_keyword_clusters, score_analysis, score_text, tokenize
+
+JD = """Senior Backend Engineer
+We are looking for a backend engineer with strong Python and AWS skills.
+Experience with Kubernetes, CI/CD pipelines and distributed systems is required.
+You will design distributed systems and own CI/CD pipelines for our payments platform."""
+
+RESUME = """Jane Doe
+Backend engineer building payment services in Java.
+Maintained CI/CD pipelines on Jenkins."""
+
+class TestATSScorer(unittest.TestCase):
+
+    def test_tokenize_keeps_tech_terms(self):
+        self.assertEqual(tokenize("C++, C#, Node.js and CI/CD."), ["c++", "c#", "node.js", "and", "ci/cd"])
+
+    def test_clusters_merge_forms_and_keep_repeated_phrases(self):
+        clusters = {c.key: c for c in extract_keyword_clusters(JD)}
+        self.assertIn("python", clusters)
+        self.assertIn("distribut system", clusters)
+        self.assertEqual(clusters["pipelin"].terms, ("pipelines",))
+        # Boilerplate does not become a keyword
+        self.assertNotIn("strong", clusters)
+        self.assertGreater(clusters["ci/cd"].weight, clusters["python"].weight)
+
+    def test_score_is_deterministic_and_bounded(self):
+        clusters = extract_keyword_clusters(JD)
+        first, missing = score_text(RESUME, clusters)
+        self.assertEqual(first, score_text(RESUME, clusters)[0])
+        self.assertTrue(0 < first < 100)
+        self.assertIn("kubernet", [c.key for c in missing])
+        self.assertEqual(score_text(JD, clusters)[0], 100)
+
+    def test_projected_score_applies_edits(self):
+        result = {"sections": [{"edits": [
+            {"action": "replace", "target_text": "building payment services in Java.",
+             "new_content": "building distributed systems for payments in Python on AWS and Kubernetes."},
+            {"action": "replace", "target_text": "not in resume", "new_content": "Designed distributed systems"}
+        ]}]}
+        text = apply_edits_to_text(RESUME, result["sections"])
+        self.assertIn("in Python on AWS", text)
+        self.assertTrue(text.endswith("Designed distributed systems"))
+
+        scores = score_analysis(RESUME, JD, result)
+        self.assertGreater(scores["projected_score"], scores["initial_score"])
+        self.assertIn("keyword clusters", scores["reasoning"])
+
+    def test_append_edits_keep_their_target(self):
+        sections = [{"edits": [
+            {"action": "append", "target_text": "Built APIs in Python.", "new_content": "Led Kubernetes migration."}
+        ]}]
+        text = apply_edits_to_text("Jane Doe. Built APIs in Python. Knows SQL.", sections)
+        self.assertEqual(text, "Jane Doe. Built APIs in Python. Led Kubernetes migration. Knows SQL.")
+
+    def test_edits_without_an_action_are_skipped(self):
+        # edit_engine.apply_edit leaves them out of the generated DOCX too
+        sections = [{"edits": [{"target_text": "Knows SQL.", "new_content": "Knows SQL and Go."}]}]
+        text = apply_edits_to_text("Jane Doe. Knows SQL.", sections)
+        self.assertEqual(text, "Jane Doe. Knows SQL.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from docx import Document
+from conversion_cache import ConversionCache
+import pdf_handler
+
+
+def fake_convert(pdf_path, docx_path, *args, **kwargs):
+    doc = Document()
+    doc.add_paragraph("Converted resume")
+    doc.save(docx_path)
+
+
+class TestConversionCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ConversionCache(directory=os.path.join(self.tmpdir.name, "cache"), max_mb=1)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _path(self, name, content=b"docx"):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_hits_copy_an_independent_file(self):
+        dest = os.path.join(self.tmpdir.name, "session.docx")
+        self.assertFalse(self.cache.fetch_docx("abc", dest))
+        self.cache.store_docx("abc", self._path("converted.docx"))
+        self.assertTrue(self.cache.fetch_docx("abc", dest))
+
+        # Editing the session's copy must not touch the cached conversion
+        with open(dest, "wb") as f:
+            f.write(b"edited")
+        other = os.path.join(self.tmpdir.name, "other.docx")
+        self.assertTrue(self.cache.fetch_docx("abc", other))
+        with open(other, "rb") as f:
+            self.assertEqual(f.read(), b"docx")
+
+        self.assertIsNone(self.cache.pdf_text("abc"))
+        self.cache.store_pdf_text("abc", "Jane Doe")
+        self.assertEqual(self.cache.pdf_text("abc"), "Jane Doe")
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["docx_hits"], stats["docx_misses"]), (2, 1))
+        self.assertEqual((stats["text_hits"], stats["text_misses"]), (1, 1))
+        self.assertEqual(stats["entries"], 1)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        blob = b"x" * (400 * 1024)
+        for digest in ("a", "b"):
+            self.cache.store_docx(digest, self._path(f"{digest}.docx", blob))
+        # Touch "a" so "b" is the least recently used when "c" goes over budget
+        self.assertTrue(self.cache.fetch_docx("a", os.path.join(self.tmpdir.name, "out.docx")))
+        self.cache.store_docx("c", self._path("c.docx", blob))
+
+        self.assertFalse(self.cache.fetch_docx("b", os.path.join(self.tmpdir.name, "out.docx")))
+        self.assertFalse(os.path.exists(os.path.join(self.cache.directory, "b.docx")))
+        stats = self.cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertLessEqual(stats["bytes"], stats["max_bytes"])
+
+
+class TestCachedPdfToDocx(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ConversionCache(directory=os.path.join(self.tmpdir.name, "cache"))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _upload(self, name):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "wb") as f:
+            f.write(b"%PDF-1.4 same resume")
+        return path
+
+    @patch('pdf_handler.sanitize_docx_layout')
+    @patch('conversion_pool.pool.convert', side_effect=fake_convert)
+    def test_second_upload_of_the_same_pdf_skips_conversion(self, mock_convert, mock_sanitize):
+        with patch('pdf_handler.conversions', self.cache):
+            first = pdf_handler.pdf_to_docx(self._upload("temp_a_resume.pdf"))
+            second = pdf_handler.pdf_to_docx(self._upload("temp_b_resume.pdf"))
+
+        self.assertEqual(mock_convert.call_count, 1)
+        self.assertEqual(mock_sanitize.call_count, 1)
+        self.assertNotEqual(first, second)
+        self.assertEqual(Document(second).paragraphs[0].text, "Converted resume")
+
+
+if __name__ == '__main__':
+    unittest.main()
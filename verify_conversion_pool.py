@@ -0,0 +1,111 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from conversion_pool import (
+    ConversionCancelledError,
+    ConversionError,
+    ConversionPool,
+    ConversionTimeoutError,
+    split_pages,
+)
+
+
+# Jobs run in worker processes, so they must be importable module-level functions
+def worker_pid(*_):
+    return os.getpid()
+
+
+def sleep_then_pid(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+class TestConversionPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = ConversionPool(workers=2, timeout_seconds=30, max_jobs_per_worker=3)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_split_pages(self):
+        self.assertEqual(split_pages(5, 2), [[0, 1, 2], [3, 4]])
+        self.assertEqual(split_pages(2, 4), [[0], [1]])
+
+    def test_runs_in_another_process_and_recycles(self):
+        pids = [self.pool.run(worker_pid) for _ in range(4)]
+        self.assertNotIn(os.getpid(), pids)
+        # Three jobs on the first worker, then a fresh one
+        self.assertEqual(len(set(pids[:3])), 1)
+        self.assertNotEqual(pids[3], pids[0])
+        self.assertEqual(self.pool.stats()["recycled"], 1)
+
+    def test_job_errors_keep_the_worker(self):
+        first = self.pool.run(worker_pid)
+        with self.assertRaisesRegex(ConversionError, "ValueError: bad page"):
+            self.pool.run(fail, "bad page")
+        self.assertEqual(self.pool.run(worker_pid), first)
+
+    def test_timeout_and_cancel_kill_the_worker(self):
+        first = self.pool.run(worker_pid)
+        started = time.monotonic()
+        with self.assertRaises(ConversionTimeoutError):
+            self.pool.run(sleep_then_pid, 30, deadline=time.monotonic() + 0.5)
+        self.assertLess(time.monotonic() - started, 5)
+
+        cancel = threading.Event()
+        threading.Timer(0.3, cancel.set).start()
+        with self.assertRaises(ConversionCancelledError):
+            self.pool.run(sleep_then_pid, 30, cancel=cancel)
+
+        self.assertNotEqual(self.pool.run(worker_pid), first)
+        stats = self.pool.stats()
+        self.assertEqual(stats["busy"], 0)
+        self.assertLessEqual(stats["alive"], 2)
+
+
+class TestPageParallelConversion(unittest.TestCase):
+    def test_pages_convert_in_parallel_and_stay_in_order(self):
+        import pymupdf
+        from docx import Document
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pdf_path = os.path.join(tmpdir, "resume.pdf")
+            pdf = pymupdf.open()
+            for number in range(5):
+                pdf.new_page().insert_text((72, 72), f"Page marker {number}")
+            pdf.save(pdf_path)
+
+            pool = ConversionPool(workers=2, parallel_min_pages=2)
+            try:
+                docx_path = os.path.join(tmpdir, "resume.docx")
+                with patch.object(pool._fanout, "submit", wraps=pool._fanout.submit) as submit:
+                    asyncio.run(pool.convert_async(pdf_path, docx_path))
+                parsed_on = {call.args[1].__name__ for call in submit.call_args_list}
+            finally:
+                pool.shutdown()
+
+            # Each worker parsed a page range and one more job merged them into the DOCX
+            self.assertEqual(submit.call_count, 2)
+            self.assertEqual(parsed_on, {"_parse_pages"})
+            text = "\n".join(p.text for p in Document(docx_path).paragraphs)
+            positions = [text.index(f"Page marker {number}") for number in range(5)]
+            self.assertEqual(positions, sorted(positions))
+            self.assertEqual(len(Document(docx_path).sections), 5)
+            self.assertEqual(pool.stats()["conversions"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from docx import Document
+import doc_cache
+from doc_cache import ParsedDocumentCache
+from edit_engine import iter_paragraphs
+
+
+def make_docx(path, lines):
+    doc = Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+class TestParsedDocumentCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.docx_path = os.path.join(self.tmpdir.name, "resume.docx")
+        make_docx(self.docx_path, ["Jane Doe", "Built data pipelines in Python"])
+        self.cache = ParsedDocumentCache(max_mb=64)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_repeat_reads_skip_the_parse(self):
+        with patch.object(doc_cache, "DocxPackage", wraps=doc_cache.DocxPackage) as opened:
+            first = self.cache.extract(self.docx_path)
+            self.cache.extract(self.docx_path)
+            package = self.cache.checkout(self.docx_path)
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual(first.text, "Jane Doe\nBuilt data pipelines in Python")
+        self.assertEqual(self.cache.stats()["hits"], 2)
+
+        # A checkout is private: editing it leaves the cached copy alone
+        para = [p for _, _, p in iter_paragraphs(package)][1]
+        para.text = "Edited"
+        self.assertEqual(self.cache.extract(self.docx_path).text, first.text)
+        fresh = [p.text for _, _, p in iter_paragraphs(self.cache.checkout(self.docx_path))]
+        self.assertEqual(fresh, ["Jane Doe", "Built data pipelines in Python"])
+
+    def test_changed_file_is_parsed_again(self):
+        self.cache.extract(self.docx_path)
+        make_docx(self.docx_path, ["John Roe", "Led a platform team"])
+        self.assertEqual(self.cache.extract(self.docx_path).text, "John Roe\nLed a platform team")
+
+        # Identical content under another path is the same entry
+        copy_path = os.path.join(self.tmpdir.name, "copy.docx")
+        shutil.copy2(self.docx_path, copy_path)
+        self.cache.extract(copy_path)
+        self.assertEqual(self.cache.stats()["misses"], 2)
+
+    def test_checkout_reads_from_its_own_file(self):
+        # Another session uploaded the same document first, then its file was cleaned up
+        other_path = os.path.join(self.tmpdir.name, "other.docx")
+        shutil.copy2(self.docx_path, other_path)
+        self.cache.extract(other_path)
+        package = self.cache.checkout(self.docx_path)
+        os.remove(other_path)
+
+        para = [p for _, _, p in iter_paragraphs(package)][1]
+        para.text = "Built streaming pipelines in Python"
+        package.mark_changed("word/document.xml")
+        out_path = os.path.join(self.tmpdir.name, "tailored.docx")
+        package.write(out_path)
+        self.assertEqual([p.text for p in Document(out_path).paragraphs],
+                         ["Jane Doe", "Built streaming pipelines in Python"])
+
+    def test_memory_budget_evicts_least_recently_used(self):
+        # Room for one small document but not two
+        cache = ParsedDocumentCache(max_mb=0.03)
+        paths = []
+        for i in range(3):
+            path = os.path.join(self.tmpdir.name, f"resume_{i}.docx")
+            make_docx(path, [f"Candidate {i}"])
+            paths.append(path)
+            cache.extract(path)
+        stats = cache.stats()
+        self.assertLessEqual(stats["bytes"], stats["max_bytes"])
+        self.assertEqual(stats["evictions"], 2)
+        cache.extract(paths[-1])
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_sanitized_document_is_cached(self):
+        from pdf_handler import sanitize_docx_layout
+        with patch("pdf_handler.documents", self.cache):
+            sanitize_docx_layout(self.docx_path)
+            self.cache.extract(self.docx_path)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from docx_extract import extract_document
+from docx_package import DocxPackage
+from edit_engine import iter_paragraphs
+from extract_benchmark import _TEXTBOX_RUN
+
+
+class TestExtractDocument(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.docx_path = os.path.join(self.tmpdir.name, "resume.docx")
+        doc = Document()
+        doc.sections[0].header.paragraphs[0].text = "Jane Doe | jane@example.com"
+        doc.sections[0].footer.paragraphs[0].text = "References on request"
+        doc.add_paragraph("SUMMARY")
+        table = doc.add_table(rows=3, cols=2)
+        table.cell(0, 0).text = "Skills"
+        table.cell(0, 1).text = "Python"
+        table.cell(0, 1).add_paragraph("SQL")
+        table.cell(1, 0).text = "Tools"
+        table.cell(2, 0).text = "Certified"
+        # Vertically merged into the row above, and horizontally merged across a row
+        table.cell(0, 1).merge(table.cell(1, 1))
+        table.cell(2, 0).merge(table.cell(2, 1))
+        nested = table.cell(0, 0).add_table(rows=1, cols=1)
+        nested.cell(0, 0).text = "Nested cell"
+        doc.add_paragraph("Body after table")._p.append(
+            parse_xml(_TEXTBOX_RUN.format(w=nsdecls("w"), text="Sidebar note"))
+        )
+        doc.save(self.docx_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_document_order_without_duplicates(self):
+        extracted = extract_document(self.docx_path)
+        self.assertEqual(extracted.text.split("\n"), [
+            "Jane Doe | jane@example.com",
+            "SUMMARY",
+            "Skills",
+            "Nested cell",
+            "Python SQL",
+            "Tools",
+            "Certified",
+            "Body after table",
+            # Only the mc:Choice copy of the text box
+            "Sidebar note",
+            "References on request",
+        ])
+
+    def test_offset_map_matches_edit_engine_paragraphs(self):
+        extracted = extract_document(self.docx_path)
+        paragraphs = {(part, index): para.text for part, index, para in iter_paragraphs(DocxPackage(self.docx_path))}
+        for key, text in extracted.paragraph_texts():
+            self.assertEqual(paragraphs[key], text)
+
+        offset = extracted.text.index("SQL")
+        span = extracted.locate(offset)
+        self.assertEqual(extracted.text[span.start:span.end], "SQL")
+        self.assertEqual(paragraphs[(span.part, span.paragraph)], "SQL")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+import io
+import base64
+import tempfile
+import zipfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from docx import Document
+from docx.enum.text import WD_BREAK
+from docx_package import DOCUMENT_PART, DocxPackage
+from pdf_handler import sanitize_docx_layout
+
+PIXEL_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+class _WriteOnly(io.RawIOBase):
+    """A response-like stream that cannot seek or tell."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+
+class TestDocxPackage(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.docx_path = os.path.join(self.tmpdir.name, "resume.docx")
+        image_path = os.path.join(self.tmpdir.name, "pixel.png")
+        with open(image_path, "wb") as f:
+            f.write(PIXEL_PNG)
+        doc = Document()
+        heading = doc.add_paragraph("Experience")
+        heading.paragraph_format.keep_with_next = True
+        heading.add_run().add_break(WD_BREAK.PAGE)
+        doc.add_paragraph("Built payment APIs")
+        doc.add_picture(image_path)
+        doc.save(self.docx_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def entries(self, path_or_bytes):
+        source = io.BytesIO(path_or_bytes) if isinstance(path_or_bytes, bytes) else path_or_bytes
+        with zipfile.ZipFile(source) as zf:
+            self.assertIsNone(zf.testzip())
+            return {info.filename: (info.CRC, info.compress_size) for info in zf.infolist()}
+
+    def test_sanitize_rewrites_only_the_document_part(self):
+        before = self.entries(self.docx_path)
+        sanitize_docx_layout(self.docx_path)
+        after = self.entries(self.docx_path)
+
+        self.assertEqual(list(before), list(after))
+        changed = [name for name in before if before[name] != after[name]]
+        self.assertEqual(changed, [DOCUMENT_PART])
+
+        doc = Document(self.docx_path)
+        self.assertFalse(doc.paragraphs[0].paragraph_format.keep_with_next)
+        self.assertNotIn("w:br", doc.paragraphs[0]._p.xml)
+        image_part = [rel.target_part for rel in doc.part.rels.values() if "image" in rel.reltype][0]
+        self.assertEqual(image_part.blob, PIXEL_PNG)
+
+    def test_write_to_unseekable_stream(self):
+        package = DocxPackage(self.docx_path)
+        package.xml_part(DOCUMENT_PART)
+        package.mark_changed(DOCUMENT_PART)
+        stream = _WriteOnly()
+        package.write(stream)
+
+        data = b"".join(stream.chunks)
+        self.assertEqual(list(self.entries(data)), list(self.entries(self.docx_path)))
+        self.assertEqual(Document(io.BytesIO(data)).paragraphs[1].text, "Built payment APIs")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from docx import Document
+from edit_engine import AhoCorasick, anchor_edits, apply_edits, apply_edits_to_docx, iter_paragraphs
+
+
+class TestAhoCorasick(unittest.TestCase):
+    def test_overlapping_and_nested_patterns(self):
+        matcher = AhoCorasick(["he", "she", "his", "hers", "python"])
+        self.assertEqual(matcher.find("ushers"), [0, 1, 3])
+        self.assertEqual(matcher.find("this"), [2])
+        self.assertEqual(matcher.find("java"), [])
+
+
+class TestApplyEdits(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.docx_path = os.path.join(self.tmpdir.name, "resume.docx")
+        doc = Document()
+        doc.add_paragraph("Jane Doe")
+        doc.add_paragraph("Built   payment APIs in Java.")
+        table = doc.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "Skills: Java, SQL"
+        table.cell(0, 1).text = "Jane Doe"
+        doc.save(self.docx_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_report_and_application_in_one_walk(self):
+        edits = [
+            {"action": "replace", "target_text": "Built payment APIs in Java.",
+             "new_content": "Built payment APIs in Python.", "rationale": ""},
+            {"action": "append", "target_text": "Skills: Java, SQL", "new_content": "Kubernetes", "rationale": ""},
+            {"action": "replace", "target_text": "Jane Doe", "new_content": "Jane Q. Doe", "rationale": ""},
+            {"action": "replace", "target_text": "Led a team of 40", "new_content": "x", "rationale": ""},
+            {"action": "replace", "target_text": "  ", "new_content": "x", "rationale": ""},
+        ]
+        output_path = os.path.join(self.tmpdir.name, "out.docx")
+        report = apply_edits_to_docx(self.docx_path, edits, output_path)
+
+        self.assertEqual([entry["status"] for entry in report],
+                         ["applied", "applied", "applied", "not_found", "skipped"])
+        # The name appears in the body and in a table cell
+        self.assertEqual(report[2]["applied"], 2)
+
+        texts = [para.text for _, _, para in iter_paragraphs(Document(output_path))]
+        self.assertIn("Built payment APIs in Python.", texts)
+        self.assertIn("Skills: Java, SQL Kubernetes", texts)
+        self.assertEqual(texts.count("Jane Q. Doe"), 2)
+
+    def test_many_edits_match_their_own_paragraphs(self):
+        doc = Document()
+        for i in range(300):
+            doc.add_paragraph(f"Accomplishment number {i} delivered")
+        edits = [{"action": "replace", "target_text": f"number {i} delivered",
+                  "new_content": f"number {i} shipped"} for i in range(300)]
+        report = apply_edits(doc, edits)
+
+        self.assertTrue(all(entry["status"] == "applied" and entry["applied"] == 1 for entry in report))
+        self.assertEqual(doc.paragraphs[123].text, "Accomplishment number 123 shipped")
+
+    def test_anchored_edits_apply_by_lookup_and_fall_back_on_mismatch(self):
+        sections = [{"section_name": "Experience", "edits": [
+            {"action": "replace", "target_text": "Built payment APIs in Java.",
+             "new_content": "Built payment APIs in Python.", "rationale": ""},
+            {"action": "replace", "target_text": "Jane Doe", "new_content": "Jane Q. Doe", "rationale": ""},
+            {"action": "replace", "target_text": "Designed payment APIs in Java", "new_content": "x", "rationale": ""},
+        ]}]
+        unmatched = anchor_edits(self.docx_path, sections)
+        edits = sections[0]["edits"]
+
+        self.assertEqual(unmatched, 1)
+        self.assertEqual([edit["matched"] for edit in edits], [True, True, False])
+        anchor = edits[0]["anchors"][0]
+        self.assertEqual((anchor["part"], anchor["paragraph"]), ("/word/document.xml", 1))
+        self.assertEqual((anchor["start"], anchor["end"]), (0, 29))
+        self.assertEqual(len(edits[1]["anchors"]), 2)
+
+        # The name paragraph changes after analysis, so its anchor no longer verifies
+        doc = Document(self.docx_path)
+        doc.paragraphs[0].text = "Jane Doe, MSc"
+        report = apply_edits(doc, edits)
+
+        self.assertEqual([entry["located_by"] for entry in report], ["anchor", "search", None])
+        self.assertEqual([entry["status"] for entry in report], ["applied", "applied", "not_found"])
+        self.assertEqual(doc.paragraphs[0].text, "Jane Q. Doe, MSc")
+        self.assertEqual(doc.paragraphs[1].text, "Built payment APIs in Python.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from docx import Document
+import edit_session
+from edit_engine import apply_edits_to_docx, iter_paragraphs
+from edit_session import EditSessionStore
+
+
+class TestEditSession(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.docx_path = os.path.join(self.tmpdir.name, "resume.docx")
+        doc = Document()
+        doc.add_paragraph("Jane Doe")
+        doc.add_paragraph("Built payment APIs in Java.")
+        doc.add_paragraph("Maintained CI pipelines on Jenkins.")
+        doc.save(self.docx_path)
+        self.edits = [
+            {"action": "replace", "target_text": "in Java", "new_content": "in Python"},
+            {"action": "append", "target_text": "Jenkins.", "new_content": "Migrated them to GitHub Actions."},
+            {"action": "replace", "target_text": "Built payment", "new_content": "Designed payment"},
+        ]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def texts(self, session):
+        return [para.text for _, _, para in iter_paragraphs(session.doc)]
+
+    def test_toggling_only_reapplies_affected_paragraphs(self):
+        store = EditSessionStore()
+        session = store.get(self.docx_path)
+        report = session.update(self.edits)
+        self.assertTrue(all(entry["status"] == "applied" for entry in report))
+        self.assertEqual(self.texts(session), [
+            "Jane Doe",
+            "Designed payment APIs in Python.",
+            "Maintained CI pipelines on Jenkins. Migrated them to GitHub Actions.",
+        ])
+
+        # Reject the first edit: only the paragraph it touched is rebuilt
+        with patch('edit_session.apply_edit', wraps=edit_session.apply_edit) as spy:
+            session = store.get(self.docx_path)
+            report = session.update([self.edits[1], self.edits[2]])
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual(store.stats()["hits"], 1)
+        self.assertEqual(self.texts(session)[1], "Designed payment APIs in Java.")
+        self.assertEqual([entry["status"] for entry in report], ["applied", "applied"])
+
+        # Rejecting everything returns the original document
+        session.update([])
+        self.assertEqual(self.texts(session), [p.text for p in Document(self.docx_path).paragraphs])
+
+    def test_session_output_matches_full_regeneration(self):
+        session = EditSessionStore().get(self.docx_path)
+        session.update(self.edits[:1])
+        session.update(self.edits)
+        session_path = os.path.join(self.tmpdir.name, "session.docx")
+        session.save(session_path)
+
+        full_path = os.path.join(self.tmpdir.name, "full.docx")
+        apply_edits_to_docx(self.docx_path, self.edits, full_path)
+        self.assertEqual([p.text for p in Document(session_path).paragraphs],
+                         [p.text for p in Document(full_path).paragraphs])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import sys
+import os
+import threading
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from fastapi.testclient import TestClient
+from executors import Admission, BoundedExecutor, ExecutorSaturatedError
+from conversion_pool import ConversionPool
+
+
+class TestAdmission(unittest.TestCase):
+    def test_retry_after_scales_with_the_work_ahead(self):
+        admission = Admission("test", workers=2, max_queue=2, message="busy")
+        for _ in range(4):
+            admission.admit()
+        admission.release(elapsed=3.0)
+        admission.admit()
+        with self.assertRaises(ExecutorSaturatedError) as rejected:
+            admission.admit()
+        # Four admitted on two workers: two waves of ~3s each
+        self.assertEqual(rejected.exception.retry_after, 6.0)
+        self.assertEqual(str(rejected.exception), "busy")
+        self.assertEqual((admission.pending, admission.rejected), (4, 1))
+
+
+class TestBoundedExecutor(unittest.TestCase):
+    def test_rejects_beyond_its_queue_and_reports_utilization(self):
+        pool = BoundedExecutor("test", workers=1, max_queue=1)
+        release = threading.Event()
+
+        async def run():
+            running = asyncio.ensure_future(pool.run(release.wait, 5))
+            queued = asyncio.ensure_future(pool.run(lambda: "queued"))
+            await asyncio.sleep(0.05)
+            busy = pool.stats()
+            with self.assertRaises(ExecutorSaturatedError) as rejected:
+                await pool.run(lambda: "rejected")
+            release.set()
+            return busy, rejected.exception, await running, await queued
+
+        busy, error, first, second = asyncio.run(run())
+        self.assertEqual((busy["running"], busy["queued"], busy["utilization"]), (1, 1, 1.0))
+        self.assertGreaterEqual(error.retry_after, 1)
+        self.assertEqual((first, second), (True, "queued"))
+
+        stats = pool.stats()
+        self.assertEqual((stats["running"], stats["queued"]), (0, 0))
+        self.assertEqual((stats["completed"], stats["rejected"]), (2, 1))
+        pool.shutdown()
+
+    def test_cancelling_a_queued_call_gives_its_place_back(self):
+        pool = BoundedExecutor("test", workers=1, max_queue=1)
+        release = threading.Event()
+
+        async def run():
+            running = asyncio.ensure_future(pool.run(release.wait, 5))
+            queued = asyncio.ensure_future(pool.run(lambda: "queued"))
+            await asyncio.sleep(0.05)
+            queued.cancel()
+            await asyncio.sleep(0.05)
+            cancelled = pool.stats()
+            release.set()
+            await running
+            return cancelled
+
+        cancelled = asyncio.run(run())
+        self.assertEqual((cancelled["running"], cancelled["queued"]), (1, 0))
+        self.assertEqual(pool._admission.pending, 0)
+        self.assertEqual(pool.stats()["completed"], 1)
+        pool.shutdown()
+
+    def test_a_saturated_pool_does_not_hold_up_another(self):
+        network = BoundedExecutor("network", workers=2, max_queue=0)
+        files = BoundedExecutor("files", workers=1, max_queue=0)
+        release = threading.Event()
+
+        async def run():
+            slow = [asyncio.ensure_future(network.run(release.wait, 5)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            with self.assertRaises(ExecutorSaturatedError):
+                await network.run(lambda: None)
+            result = await asyncio.wait_for(files.run(lambda: "written"), timeout=1)
+            release.set()
+            await asyncio.gather(*slow)
+            return result
+
+        self.assertEqual(asyncio.run(run()), "written")
+        network.shutdown()
+        files.shutdown()
+
+
+class TestConversionAdmission(unittest.TestCase):
+    def test_conversions_beyond_the_queue_are_rejected(self):
+        # No worker process is started until a conversion actually runs
+        pool = ConversionPool(workers=1, max_queue=1)
+        pool._admission.admit()
+        pool._admission.admit()
+        with self.assertRaises(ExecutorSaturatedError):
+            pool.check_admission()
+        with self.assertRaises(ExecutorSaturatedError):
+            pool._admission.admit()
+        stats = pool.stats()
+        self.assertEqual((stats["queued"], stats["rejected"]), (1, 1))
+
+        # convert_async is refused on the loop, before it takes a waiter thread
+        with patch.object(pool._waiters, "submit") as submit:
+            with self.assertRaises(ExecutorSaturatedError):
+                asyncio.run(pool.convert_async("resume.pdf", "resume.docx"))
+        submit.assert_not_called()
+
+        # Converting in-process (CONVERSION_WORKERS=0) is never refused
+        ConversionPool(workers=0, max_queue=0).check_admission()
+
+
+class TestServiceBusyResponse(unittest.TestCase):
+    def test_saturated_pool_answers_503_with_retry_after(self):
+        import main
+        from routers import applications
+
+        saturated = BoundedExecutor("network", workers=1, max_queue=0)
+        saturated._admission.pending = 1
+        with patch.object(applications, "network_io", saturated):
+            response = TestClient(main.app).post("/fetch-jd", data={"url": "https://example.com/job"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "1")
+        saturated.shutdown()
+
+    def test_metrics_read_sqlite_stats_off_the_event_loop(self):
+        import main
+        from routers import metrics
+
+        threads = []
+
+        def job_stats():
+            threads.append(threading.current_thread().name)
+            return {"queued": 0}
+
+        with patch.object(metrics.jobs, "stats", side_effect=job_stats):
+            response = TestClient(main.app).get("/api/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["jobs"], {"queued": 0})
+        self.assertTrue(threads[0].startswith("file-io"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+import httpx
+import openai
+from fastapi.testclient import TestClient
+from fake_llm_server import classify_prompt, create_app
+from load_test import percentile
+from prompts import EXTRACT_JOB_METADATA_PROMPT, ROLE_ANALYSIS_PROMPT_TEMPLATE
+from analysis_cache import ResultCache
+from tailor import AnalysisResult, analyze_gaps_async, analyze_gaps_stream
+
+_cache_patches = []
+_cache_dir = None
+
+
+def setUpModule():
+    # Keep the analysis and role caches out of the working tree
+    global _cache_dir
+    _cache_dir = tempfile.TemporaryDirectory()
+    path = os.path.join(_cache_dir.name, "analysis_cache.db")
+    for name, namespace in (("analysis_cache", "analyze_gaps"), ("role_cache", "role_analysis")):
+        _cache_patches.append(patch(f"tailor.{name}", ResultCache(namespace, path=path)))
+    for cache_patch in _cache_patches:
+        cache_patch.start()
+
+
+def tearDownModule():
+    for cache_patch in _cache_patches:
+        cache_patch.stop()
+    _cache_dir.cleanup()
+
+RESUME = """Jane Doe
+SUMMARY
+Backend engineer building payment services.
+EXPERIENCE
+Built payment APIs in Java.
+SKILLS
+Java, SQL"""
+
+JD = "Senior Backend Engineer. Python, AWS, Kubernetes and SQL. Own CI/CD pipelines."
+
+def fake_client(app):
+    """AsyncOpenAI client whose HTTP requests are served in-process by the fake app."""
+    return openai.AsyncOpenAI(
+        api_key="fake",
+        base_url="http://fake-llm/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=app)),
+    )
+
+class TestFakeLLMServer(unittest.TestCase):
+
+    def test_classifies_prompt_templates(self):
+        self.assertEqual(classify_prompt(EXTRACT_JOB_METADATA_PROMPT.format(text=JD)), "job_metadata")
+        self.assertEqual(classify_prompt(ROLE_ANALYSIS_PROMPT_TEMPLATE.format(job_description=JD)), "role_analysis")
+
+    def test_replays_recorded_job_metadata(self):
+        client = TestClient(create_app(latency_ms=0, jitter_ms=0))
+        response = client.post("/v1/chat/completions", json={
+            "model": "gpt-4o",
+            "messages": [{"role": "user", "content": EXTRACT_JOB_METADATA_PROMPT.format(text=JD)}]
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(response.json()["choices"][0]["message"]["content"], [
+            '{"company": "Thermo Fisher Scientific Inc.", "role": ""}',
+            '{"company": "Lilly", "role": "Digital Health – Data Science Engineer"}',
+        ])
+
+    def test_error_injection(self):
+        client = TestClient(create_app(latency_ms=0, jitter_ms=0, error_rate=1.0))
+        response = client.post("/v1/chat/completions", json={"messages": [{"role": "user", "content": "hi"}]})
+        self.assertIn(response.status_code, (429, 500, 503))
+        self.assertIn("error", response.json())
+
+    @patch('tailor.extract_text_from_docx', return_value=RESUME)
+    def test_analysis_pipeline_against_fake_server(self, mock_extract):
+        app = create_app(latency_ms=0, jitter_ms=0)
+
+        async def run():
+            with patch('llm_client.get_client', return_value=fake_client(app)):
+                result = await analyze_gaps_async("dummy.docx", JD, use_cache=False)
+                events = [e async for e in analyze_gaps_stream("dummy.docx", JD, use_cache=False)]
+            return result, events
+
+        result, events = asyncio.run(run())
+
+        AnalysisResult(**result)
+        self.assertEqual([s["section_name"] for s in result["sections"]], ["Header", "SUMMARY", "EXPERIENCE", "SKILLS"])
+        for section in result["sections"]:
+            for edit in section["edits"]:
+                self.assertIn(edit["target_text"], RESUME)
+        self.assertEqual([e["event"] for e in events if e["event"] == "section"], ["section"] * 4)
+        self.assertEqual(events[-1]["event"], "complete")
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertEqual(percentile([], 95), 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import sys
+import os
+import tempfile
+import time
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from job_queue import FAILED, QUEUED, SUCCEEDED, JobQueue, PermanentJobError
+
+
+class Overloaded(Exception):
+    retry_after = 0.05
+
+
+async def wait_for(queue, job_id, statuses=(SUCCEEDED, FAILED), timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = await queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} stuck in {job['status']}")
+
+
+@patch('job_queue._POLL_SECONDS', 0.02)
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "jobs.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_queue(self, **kwargs):
+        kwargs.setdefault("workers", 2)
+        kwargs.setdefault("retry_base_seconds", 0.01)
+        return JobQueue(path=self.path, **kwargs)
+
+    def test_runs_jobs_and_reports_stages(self):
+        queue = self.make_queue()
+
+        async def handler(job):
+            first = await job.track("convert", asyncio.sleep(0, result="resume.docx"))
+            return {"docx": first, "text": job.payload["text"]}
+
+        queue.register("analyze", handler)
+
+        async def run():
+            queue.start()
+            try:
+                job_id = await queue.enqueue("analyze", {"text": "hello"})
+                return await wait_for(queue, job_id)
+            finally:
+                await queue.stop()
+
+        job = asyncio.run(run())
+        self.assertEqual(job["status"], SUCCEEDED)
+        self.assertEqual(job["result"], {"docx": "resume.docx", "text": "hello"})
+        self.assertEqual(job["stages"]["convert"]["status"], SUCCEEDED)
+        self.assertEqual(job["attempts"], 1)
+
+    def test_retries_until_success_or_permanent_failure(self):
+        queue = self.make_queue(max_attempts=3)
+        calls = []
+
+        async def flaky(job):
+            calls.append(job.attempts)
+            if job.attempts < 3:
+                raise Overloaded("try later")
+            return {"ok": True}
+
+        async def broken(job):
+            raise PermanentJobError("Upload no longer available")
+
+        queue.register("flaky", flaky)
+        queue.register("broken", broken)
+
+        async def run():
+            queue.start()
+            try:
+                flaky_id = await queue.enqueue("flaky", {})
+                broken_id = await queue.enqueue("broken", {})
+                return await wait_for(queue, flaky_id), await wait_for(queue, broken_id)
+            finally:
+                await queue.stop()
+
+        flaky_job, broken_job = asyncio.run(run())
+        self.assertEqual(calls, [1, 2, 3])
+        self.assertEqual((flaky_job["status"], flaky_job["attempts"]), (SUCCEEDED, 3))
+        self.assertEqual((broken_job["status"], broken_job["attempts"]), (FAILED, 1))
+        self.assertEqual(broken_job["error"], "Upload no longer available")
+        self.assertEqual(queue.stats()["retried"], 2)
+
+    def test_jobs_survive_a_lost_worker_and_shutdown(self):
+        # A process that claimed a job and died: its lease runs out
+        dead = self.make_queue(lease_seconds=0.05)
+        dead.register("analyze", None)
+        lost_id = dead._insert("analyze", {})
+        self.assertEqual(dead._claim().id, lost_id)
+
+        # A clean shutdown mid-job puts the job back without using up an attempt
+        interrupted = self.make_queue()
+
+        async def slow(job):
+            await asyncio.sleep(30)
+
+        interrupted.register("slow", slow)
+
+        async def interrupt():
+            interrupted.start()
+            job_id = await interrupted.enqueue("slow", {})
+            await wait_for(interrupted, job_id, statuses=("running",))
+            await interrupted.stop()
+            return await interrupted.get(job_id)
+
+        released = asyncio.run(interrupt())
+        self.assertEqual((released["status"], released["attempts"]), (QUEUED, 0))
+
+        # After a restart both jobs run to completion
+        time.sleep(0.1)
+        restarted = self.make_queue()
+
+        async def done(job):
+            return {"attempt": job.attempts}
+
+        restarted.register("analyze", done)
+        restarted.register("slow", done)
+
+        async def run():
+            restarted.start()
+            try:
+                return [await wait_for(restarted, job_id) for job_id in (lost_id, released["id"])]
+            finally:
+                await restarted.stop()
+
+        lost, resumed = asyncio.run(run())
+        self.assertEqual((lost["status"], lost["result"]), (SUCCEEDED, {"attempt": 2}))
+        self.assertEqual((resumed["status"], resumed["result"]), (SUCCEEDED, {"attempt": 1}))
+        self.assertEqual(restarted.stats()["recovered"], 1)
+
+    def test_jobs_are_only_visible_to_their_client(self):
+        queue = self.make_queue()
+        queue.register("analyze", None)
+
+        async def run():
+            job_id = await queue.enqueue("analyze", {}, client="user:1")
+            return job_id, [await queue.get(job_id, client=client) for client in ("user:1", "user:2", "ip:10.0.0.1")]
+
+        job_id, seen = asyncio.run(run())
+        self.assertEqual(seen[0]["id"], job_id)
+        self.assertEqual(seen[1:], [None, None])
+
+        # Through the API: the anonymous test client is ip:testclient
+        from fastapi.testclient import TestClient
+        import main
+        from routers import jobs as jobs_router
+
+        async def submit():
+            return await queue.enqueue("analyze", {}, client="ip:testclient")
+
+        own_id = asyncio.run(submit())
+        with patch.object(jobs_router, "jobs", queue):
+            client = TestClient(main.app)
+            self.assertEqual(client.get(f"/jobs/{own_id}").status_code, 200)
+            self.assertEqual(client.get(f"/jobs/{job_id}").status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import json
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from json_stream import IncrementalJSONParser
+
+ANALYSIS = {
+    "role_analysis": {"identity": "Backend engineer", "keywords": ["python", "aws"]},
+    "diagnosis": {"strong_matches": ["APIs"], "gaps": ["Kubernetes \"k8s\""]},
+    "proposed_title": "Senior Backend Engineer",
+    "sections": [
+        {"section_name": "Summary", "edits": [{"target_text": "a, b]", "new_content": "{c}"}]},
+        {"section_name": "Experience", "edits": []}
+    ],
+    "initial_score": 55,
+    "ratio": -1.5e2,
+    "flag": True,
+    "missing": None,
+    "tags": ["x", 2, {"y": [1]}]
+}
+
+def feed_in_chunks(parser, text, size):
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i:i + size]))
+    return events
+
+class TestIncrementalJSONParser(unittest.TestCase):
+
+    def test_emits_every_top_level_field(self):
+        text = json.dumps(ANALYSIS, indent=2)
+        for size in (1, 3, 17, len(text)):
+            parser = IncrementalJSONParser()
+            events = feed_in_chunks(parser, text, size)
+            self.assertEqual({key: value for key, _, value in events}, ANALYSIS)
+            self.assertTrue(parser.done)
+
+    def test_streams_array_elements_before_array_closes(self):
+        text = json.dumps(ANALYSIS)
+        parser = IncrementalJSONParser(stream_arrays=["sections", "tags"])
+
+        # Feed everything up to (but excluding) the end of the sections array
+        cut = text.index('"initial_score"')
+        events = parser.feed(text[:cut - 3])
+        sections = [(index, value) for key, index, value in events if key == "sections"]
+        self.assertEqual(sections, [(0, ANALYSIS["sections"][0]), (1, ANALYSIS["sections"][1])])
+
+        events = parser.feed(text[cut - 3:])
+        tags = [value for key, index, value in events if key == "tags" and index is not None]
+        self.assertEqual(tags, ANALYSIS["tags"])
+
+    def test_fields_emitted_in_order_of_completion(self):
+        parser = IncrementalJSONParser()
+        text = json.dumps(ANALYSIS)
+        events = parser.feed(text[:text.index('"proposed_title"')])
+        self.assertEqual([key for key, _, _ in events], ["role_analysis", "diagnosis"])
+
+    def test_ignores_text_before_object(self):
+        parser = IncrementalJSONParser()
+        events = parser.feed('```json\n{"a": "b"}')
+        self.assertEqual(events[0].value, "b")
+
+if __name__ == '__main__':
+    unittest.main()
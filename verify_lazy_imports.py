@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+import unittest
+
+BACKEND_DIR = os.path.join(os.getcwd(), 'backend')
+sys.path.append(BACKEND_DIR)
+
+import import_benchmark
+
+# Cold-start budgets; generous enough for a loaded CI runner, tighten via env
+MAX_IMPORT_MS = float(os.getenv("COLD_START_MAX_IMPORT_MS", "2500"))
+MAX_FIRST_REQUEST_MS = float(os.getenv("COLD_START_MAX_FIRST_REQUEST_MS", "5000"))
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_heavy_dependencies_not_imported_at_startup(self):
+        """Importing the app must not pull in the LLM SDK, converters, scraper or MLflow."""
+        code = (
+            "import sys, main\n"
+            "heavy = ['openai', 'pdf2docx', 'pymupdf', 'docx2pdf', 'mlflow', 'bs4', 'requests']\n"
+            "print('loaded:' + ','.join(m for m in heavy if m in sys.modules))\n"
+        )
+        env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=BACKEND_DIR, env=env)
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "loaded:")
+
+    def test_cold_start_within_budget(self):
+        import_ms, children = import_benchmark.measure_import("main")
+        slowest = sorted(children, key=lambda item: -item[1])[:5]
+        self.assertLessEqual(import_ms, MAX_IMPORT_MS, f"import main took {import_ms:.0f} ms; slowest: {slowest}")
+
+        first = import_benchmark.measure_first_request("/api/usage")
+        self.assertEqual(first["status"], 200)
+        self.assertEqual(first["deferred_modules_loaded"], [])
+        self.assertLessEqual(first["first_request_ms"], MAX_FIRST_REQUEST_MS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -42,7 +42,7 @@ def analyze_anonymous(filename):
         data = {'job_description': 'Software Engineer'}
         resp = requests.post(f"{BASE_URL}/analyze", files=files, data=data)
         print(f"  Status: {resp.status_code}")
-        if resp.status_code == 200:
+        if resp.status_code == 202:  # Queued
             print("  Success")
         elif resp.status_code == 403:
             print("  Limit Reached (Expected for #3)")
@@ -60,7 +60,7 @@ def analyze_authenticated(token, filename):
         data = {'job_description': 'Software Engineer'}
         resp = requests.post(f"{BASE_URL}/analyze", files=files, data=data, headers=headers)
         print(f"  Status: {resp.status_code}")
-        if resp.status_code == 200:
+        if resp.status_code == 202:  # Queued
             print("  Success")
         else:
             print("  Failed:", resp.text)
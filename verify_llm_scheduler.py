@@ -0,0 +1,130 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+import asyncio
+import sys
+import os
+import tempfile
+from types import SimpleNamespace
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from llm_scheduler import LLMOverloadedError, LLMScheduler, Priority, current_priority, use_priority
+
+class TestLLMScheduler(unittest.TestCase):
+
+    def test_admits_immediately_within_budget(self):
+        async def run():
+            scheduler = LLMScheduler(rpm_limit=60, tpm_limit=10000)
+            for _ in range(3):
+                await scheduler.acquire(100)
+            return scheduler.stats()
+
+        stats = asyncio.run(run())
+        self.assertEqual(stats["admitted"], 3)
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertEqual(stats["wait_ms_max"], 0.0)
+
+    def test_priority_order_when_rate_limited(self):
+        async def run():
+            # 600 RPM refills one request every 0.1s; the burst capacity is used up first
+            scheduler = LLMScheduler(rpm_limit=600, tpm_limit=1e9)
+            scheduler.requests.balance = 0
+            order = []
+
+            async def call(name, priority):
+                await scheduler.acquire(10, priority=priority)
+                order.append(name)
+
+            tasks = [asyncio.create_task(call("background", Priority.BACKGROUND)),
+                     asyncio.create_task(call("anonymous", Priority.ANONYMOUS))]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(call("authenticated", Priority.AUTHENTICATED)))
+            await asyncio.sleep(0)
+            depth = scheduler.stats()["queue_depth"]
+            await asyncio.gather(*tasks)
+            return order, depth, scheduler.stats()
+
+        order, depth, stats = asyncio.run(run())
+        self.assertEqual(order, ["authenticated", "anonymous", "background"])
+        self.assertEqual(depth, 3)
+        self.assertGreater(stats["wait_ms_max"], 0)
+
+    def test_sheds_when_wait_exceeds_deadline(self):
+        async def run():
+            scheduler = LLMScheduler(rpm_limit=60, tpm_limit=1e9)
+            scheduler.requests.balance = 0
+            with self.assertRaises(LLMOverloadedError) as ctx:
+                await scheduler.acquire(10, deadline=0.5)
+            return ctx.exception, scheduler.stats()
+
+        error, stats = asyncio.run(run())
+        self.assertAlmostEqual(error.retry_after, 1.0, delta=0.1)
+        self.assertEqual(stats["shed"], 1)
+
+    def test_token_budget_and_settle(self):
+        async def run():
+            scheduler = LLMScheduler(rpm_limit=1000, tpm_limit=6000)
+            await scheduler.acquire(5000)
+            # The call used far fewer tokens than estimated, which frees budget
+            scheduler.settle(5000, 1000)
+            await scheduler.acquire(4000, deadline=0.1)
+            with self.assertRaises(LLMOverloadedError):
+                await scheduler.acquire(4000, deadline=0.1)
+
+        asyncio.run(run())
+
+    def test_context_priority_propagates_to_tasks(self):
+        async def run():
+            scheduler = LLMScheduler(rpm_limit=600, tpm_limit=1e9)
+            scheduler.requests.balance = 0
+            with use_priority(Priority.AUTHENTICATED):
+                task = asyncio.create_task(scheduler.acquire(10))
+            await asyncio.sleep(0)
+            queued = [w.priority for w in scheduler._queue]
+            await task
+            return queued
+
+        self.assertEqual(asyncio.run(run()), [Priority.AUTHENTICATED])
+
+    def test_queued_analysis_yields_to_interactive_calls(self):
+        from routers import resume
+
+        seen = []
+
+        async def analyze(*args, **kwargs):
+            seen.append(current_priority())
+            return {}
+
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as pdf:
+            upload = {"path": pdf.name, "sha256": "0" * 64, "size": 0, "pages": 1}
+            job = SimpleNamespace(
+                payload={"upload": upload, "job_description": "JD", "use_cache": False},
+                track=lambda stage, awaitable: awaitable,
+            )
+            with patch.object(resume, "ANALYSIS_TEXT_SOURCE", "docx"), \
+                 patch.object(resume, "pdf_to_docx_async", AsyncMock(return_value="resume.docx")), \
+                 patch.object(resume, "analyze_gaps_async", analyze):
+                asyncio.run(resume._run_analysis_job(job))
+        self.assertEqual(seen, [Priority.BACKGROUND])
+
+        # Even an anonymous interactive call is admitted ahead of it
+        async def run():
+            scheduler = LLMScheduler(rpm_limit=600, tpm_limit=1e9)
+            scheduler.requests.balance = 0
+            order = []
+
+            async def call(name, priority):
+                await scheduler.acquire(10, priority=priority)
+                order.append(name)
+
+            queued = asyncio.create_task(call("queued analysis", Priority.BACKGROUND))
+            await asyncio.sleep(0)
+            interactive = asyncio.create_task(call("interactive", Priority.ANONYMOUS))
+            await asyncio.gather(queued, interactive)
+            return order
+
+        self.assertEqual(asyncio.run(run()), ["interactive", "queued analysis"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import json
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from docx import Document
+from docx_extract import extract_document
+from edit_engine import anchor_edits, reconcile_edits
+from analysis_cache import ResultCache
+from tailor import analyze_gaps_async
+
+_cache_patches = []
+_cache_dir = None
+
+
+def setUpModule():
+    # Keep the analysis and role caches out of the working tree
+    global _cache_dir
+    _cache_dir = tempfile.TemporaryDirectory()
+    path = os.path.join(_cache_dir.name, "analysis_cache.db")
+    for name, namespace in (("analysis_cache", "analyze_gaps"), ("role_cache", "role_analysis")):
+        _cache_patches.append(patch(f"tailor.{name}", ResultCache(namespace, path=path)))
+    for cache_patch in _cache_patches:
+        cache_patch.start()
+
+
+def tearDownModule():
+    for cache_patch in _cache_patches:
+        cache_patch.stop()
+    _cache_dir.cleanup()
+
+DOCX_LINES = ["Jane Doe", "Configured CI workflows for 12 services", "Led a team of five engineers"]
+# The same resume as PyMuPDF reads it from the PDF: ligatures, a hyphenated line break, bullet glyphs
+PDF_TEXT = "Jane Doe\n• Conﬁgured CI work-\nﬂows for 12 services\n• Led a team of ﬁve engineers"
+
+
+def make_docx(path):
+    doc = Document()
+    for line in DOCX_LINES:
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+class TestReconcileEdits(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.docx_path = os.path.join(self.tmpdir.name, "resume.docx")
+        make_docx(self.docx_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_pdf_targets_are_retargeted_at_docx_text(self):
+        sections = [{"edits": [
+            {"action": "replace", "target_text": "• Conﬁgured CI work- ﬂows", "new_content": "x"},
+            # Misquoted by the model, but close to a whole DOCX paragraph
+            {"action": "replace", "target_text": "Led a team of ﬁve enginers", "new_content": "y"},
+            {"action": "replace", "target_text": "Managed a restaurant", "new_content": "z"},
+        ]}]
+        extracted = extract_document(self.docx_path)
+        self.assertEqual(anchor_edits(extracted, sections), 3)
+        self.assertEqual(reconcile_edits(extracted, sections), 2)
+
+        edits = sections[0]["edits"]
+        self.assertEqual(edits[0]["target_text"], "Configured CI workflows")
+        self.assertEqual(edits[1]["target_text"], "Led a team of five engineers")
+        self.assertEqual([edit["matched"] for edit in edits], [True, True, False])
+        self.assertEqual(edits[0]["anchors"][0]["paragraph"], 1)
+
+
+class TestPipelinedAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.docx_path = os.path.join(self.tmpdir.name, "resume.docx")
+        make_docx(self.docx_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    @patch('tailor.SCORING_MODE', 'local')
+    @patch('llm_client.get_client')
+    @patch('tailor.extract_text_from_pdf', return_value=PDF_TEXT)
+    def test_analysis_starts_before_conversion_finishes(self, mock_pdf_text, mock_get_client):
+        analysis_json = {
+            "sections": [{
+                "section_name": "Experience",
+                "gaps": [],
+                "suggestions": [],
+                "edits": [{
+                    "target_text": "Conﬁgured CI work- ﬂows for 12 services",
+                    "new_content": "Configured GitHub Actions for 12 services",
+                    "action": "replace",
+                    "rationale": "JD names GitHub Actions",
+                }],
+            }]
+        }
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            conversion = loop.create_future()
+            converted_when_called = []
+
+            def mock_create(**kwargs):
+                converted_when_called.append(conversion.done())
+                # The DOCX only becomes available after the model has started
+                loop.call_soon(conversion.set_result, self.docx_path)
+                response = MagicMock()
+                response.choices = [MagicMock(message=MagicMock(content=json.dumps(analysis_json)))]
+                return response
+
+            mock_client = MagicMock()
+            mock_client.chat.completions.create = AsyncMock(side_effect=mock_create)
+            mock_get_client.return_value = mock_client
+            result = await analyze_gaps_async(
+                None, "Job Description", pdf_path="resume.pdf", use_cache=False, docx_conversion=conversion
+            )
+            return result, converted_when_called
+
+        result, converted_when_called = asyncio.run(run())
+        self.assertEqual(converted_when_called, [False])
+        mock_pdf_text.assert_called_once_with("resume.pdf", None)
+        edit = result["sections"][0]["edits"][0]
+        self.assertTrue(edit["matched"])
+        self.assertEqual(edit["target_text"], "Configured CI workflows for 12 services")
+
+
+if __name__ == '__main__':
+    unittest.main()
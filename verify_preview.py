@@ -0,0 +1,115 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import hashlib
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from docx import Document
+from conversion_cache import ConversionCache
+from preview import PreviewError, PreviewStore
+
+
+def make_pdf(path, pages):
+    import pymupdf
+
+    pdf = pymupdf.open()
+    for number in range(pages):
+        pdf.new_page().insert_text((72, 72), f"Page marker {number}")
+    pdf.save(path)
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def fake_convert(pdf_path, docx_path, timeout=None, cancel=None, start=0, end=None):
+    doc = Document()
+    doc.add_paragraph(f"Pages {start} to {end}")
+    doc.save(docx_path)
+
+
+class TestPreviewStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        cache = ConversionCache(directory=os.path.join(self.tmpdir.name, "cache"))
+        self.patches = [
+            patch('preview.conversions', cache),
+            patch('pdf_handler.conversions', cache),
+            patch('pdf_handler.sanitize_docx_layout'),
+        ]
+        for p in self.patches:
+            p.start()
+        self.convert = patch('conversion_pool.pool._convert', side_effect=fake_convert).start()
+        self.patches.append(self.convert)
+
+    def tearDown(self):
+        patch.stopall()
+        self.tmpdir.cleanup()
+
+    def _upload(self, name, pages=3):
+        path = os.path.join(self.tmpdir.name, name)
+        return path, make_pdf(path, pages)
+
+    def test_first_page_is_converted_before_the_document(self):
+        store = PreviewStore()
+        pdf_path, digest = self._upload("temp_a_resume.pdf")
+
+        async def run():
+            preview = await store.start(pdf_path, digest)
+            await preview.task
+            first = await store.thumbnail(preview, 1)
+            again = await store.thumbnail(preview, 1)
+            return preview, first, again
+
+        preview, first, again = asyncio.run(run())
+        self.assertEqual(preview.pages, 3)
+        self.assertIn("Page marker 0", preview.first_page_html)
+        self.assertNotIn("Page marker 1", preview.first_page_html)
+        # Page one alone, then the whole document
+        self.assertEqual([c.args[4:] for c in self.convert.call_args_list], [(0, 1), (0, None)])
+        self.assertTrue(os.path.exists(preview.first_page_docx))
+        self.assertEqual(preview.docx_path, pdf_path.replace(".pdf", ".docx"))
+        self.assertTrue(first.startswith(b"\x89PNG"))
+        self.assertIs(first, again)
+        self.assertEqual(store.stats()["thumbnail_hits"], 1)
+
+    def test_cached_uploads_skip_conversion_and_bad_uploads_fail(self):
+        store = PreviewStore()
+        first_path, digest = self._upload("temp_a_resume.pdf")
+        second_path, _ = self._upload("temp_b_resume.pdf")
+        bad_path = os.path.join(self.tmpdir.name, "temp_c_resume.pdf")
+        with open(bad_path, "wb") as f:
+            f.write(b"not a pdf")
+
+        async def run():
+            for path in (first_path, second_path):
+                preview = await store.start(path, digest)
+                await preview.task
+            with self.assertRaises(PreviewError):
+                await store.start(bad_path, "bad")
+            return preview
+
+        preview = asyncio.run(run())
+        self.assertEqual(self.convert.call_count, 2)
+        self.assertIsNone(preview.first_page_docx)
+        self.assertTrue(os.path.exists(preview.docx_path))
+
+    def test_previews_expire(self):
+        store = PreviewStore(ttl_seconds=0)
+        pdf_path, digest = self._upload("temp_a_resume.pdf", pages=1)
+
+        async def run():
+            preview = await store.start(pdf_path, digest)
+            await asyncio.sleep(0)
+            return preview, store.get(preview.token)
+
+        preview, found = asyncio.run(run())
+        self.assertIsNone(found)
+        self.assertEqual(store.stats()["expired"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from resume_sections import classify_heading, split_resume_sections
+
+RESUME = """Jane Doe
+jane@example.com | Singapore
+PROFESSIONAL SUMMARY
+Backend engineer with 8 years of experience.
+Work Experience
+Senior Engineer, Acme (2019 - 2024)
+Built payment APIs used by 2M customers.
+Skills:
+Python, AWS, Kubernetes
+EDUCATION
+BSc Computer Science"""
+
+class TestResumeSections(unittest.TestCase):
+
+    def test_classify_heading(self):
+        self.assertEqual(classify_heading("Work Experience"), "Experience")
+        self.assertEqual(classify_heading("TECHNICAL SKILLS & TOOLS"), "Skills")
+        self.assertEqual(classify_heading("Skills & Tools"), "Skills")
+        self.assertEqual(classify_heading("Projects:"), "Projects")
+        # Body lines that merely mention a keyword are not headings
+        self.assertEqual(classify_heading("Experience leading teams of 5 engineers"), "")
+        self.assertEqual(classify_heading(""), "")
+
+    def test_split_resume_sections(self):
+        sections = split_resume_sections(RESUME)
+        self.assertEqual(
+            [(s.name, s.section_type) for s in sections],
+            [("Header", "Other"), ("PROFESSIONAL SUMMARY", "Summary"), ("Work Experience", "Experience"),
+             ("Skills", "Skills"), ("EDUCATION", "Education")]
+        )
+        self.assertEqual(sections[3].text, "Python, AWS, Kubernetes")
+        self.assertIn("Built payment APIs", sections[2].text)
+
+    def test_empty_sections_are_dropped(self):
+        sections = split_resume_sections("SUMMARY\n\nEXPERIENCE\nDid things")
+        self.assertEqual([s.section_type for s in sections], ["Experience"])
+
+if __name__ == '__main__':
+    unittest.main()
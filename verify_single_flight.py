@@ -0,0 +1,121 @@
+import unittest
+import asyncio
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from single_flight import SingleFlight
+from job_queue import IdempotencyConflictError, JobQueue
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_duplicates_share_one_producer(self):
+        flights = SingleFlight()
+        runs = []
+        release = None
+
+        async def produce():
+            runs.append(1)
+            yield "status"
+            await release.wait()
+            yield "complete"
+
+        async def collect(stream):
+            return [item async for item in stream]
+
+        async def run():
+            nonlocal release
+            release = asyncio.Event()
+            first, started_first = flights.join("key", produce)
+            first_task = asyncio.create_task(collect(first))
+            await asyncio.sleep(0.01)
+
+            # A late joiner replays what has been produced so far
+            second, started_second = flights.join("key", produce)
+            second_task = asyncio.create_task(collect(second))
+            await asyncio.sleep(0.01)
+            release.set()
+            return started_first, started_second, await first_task, await second_task
+
+        started_first, started_second, first, second = asyncio.run(run())
+        self.assertEqual((started_first, started_second), (True, False))
+        self.assertEqual(first, ["status", "complete"])
+        self.assertEqual(second, ["status", "complete"])
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(flights.stats(), {"in_flight": 0, "started": 1, "coalesced": 1})
+
+    def test_producer_is_cancelled_when_everyone_leaves(self):
+        flights = SingleFlight()
+        cancelled = []
+
+        async def produce():
+            try:
+                yield "status"
+                await asyncio.sleep(30)
+                yield "complete"
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def run():
+            first, _ = flights.join("key", produce)
+            second, _ = flights.join("key", produce)
+            self.assertEqual(await first.__anext__(), "status")
+            self.assertEqual(await second.__anext__(), "status")
+            await first.aclose()
+            await asyncio.sleep(0.01)
+            self.assertEqual(cancelled, [])
+            await second.aclose()
+            await asyncio.sleep(0.01)
+
+        asyncio.run(run())
+        self.assertEqual(cancelled, [True])
+        self.assertEqual(flights.stats()["in_flight"], 0)
+
+
+class TestEnqueueOnce(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.queue = JobQueue(path=os.path.join(self.tmpdir.name, "jobs.db"))
+        self.queue.register("analyze", None)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_in_flight_duplicates_get_the_same_job(self):
+        async def run():
+            return await asyncio.gather(*[
+                self.queue.enqueue_once("analyze", {"n": n}, dedup_key="same") for n in range(3)
+            ])
+
+        results = asyncio.run(run())
+        self.assertEqual(len({job_id for job_id, _ in results}), 1)
+        self.assertEqual(sorted(created for _, created in results), [False, False, True])
+        self.assertEqual(self.queue.stats()["coalesced"], 2)
+
+        # Once the job has finished, the same request is new work again
+        job_id = results[0][0]
+        self.queue._finish(self.queue._claim().id, {"ok": True})
+        new_id, created = asyncio.run(self.queue.enqueue_once("analyze", {}, dedup_key="same"))
+        self.assertTrue(created)
+        self.assertNotEqual(new_id, job_id)
+
+    def test_idempotency_key_returns_the_stored_job(self):
+        async def run():
+            first = await self.queue.enqueue_once("analyze", {}, dedup_key="a", idempotency_key="k1")
+            self.queue._finish(self.queue._claim().id, {"ok": True})
+            replay = await self.queue.enqueue_once("analyze", {}, dedup_key="a", idempotency_key="k1")
+            with self.assertRaises(IdempotencyConflictError):
+                await self.queue.enqueue_once("analyze", {}, dedup_key="b", idempotency_key="k1")
+            return first, replay
+
+        (first_id, first_created), (replay_id, replay_created) = asyncio.run(run())
+        self.assertTrue(first_created)
+        self.assertEqual((replay_id, replay_created), (first_id, False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 import json
 import sys
 import os
@@ -7,21 +7,47 @@ import os
 # Add backend to path
 sys.path.append(os.path.join(os.getcwd(), 'backend'))
 
-from tailor import analyze_gaps
+import asyncio
+import tempfile
+from analysis_cache import ResultCache
+from tailor import analyze_gaps, analyze_gaps_async, analyze_gaps_stream
+
+_cache_patches = []
+_cache_dir = None
+
+
+def setUpModule():
+    # Keep the analysis and role caches out of the working tree
+    global _cache_dir
+    _cache_dir = tempfile.TemporaryDirectory()
+    path = os.path.join(_cache_dir.name, "analysis_cache.db")
+    for name, namespace in (("analysis_cache", "analyze_gaps"), ("role_cache", "role_analysis")):
+        _cache_patches.append(patch(f"tailor.{name}", ResultCache(namespace, path=path)))
+    for cache_patch in _cache_patches:
+        cache_patch.start()
+
+
+def tearDownModule():
+    for cache_patch in _cache_patches:
+        cache_patch.stop()
+    _cache_dir.cleanup()
+
 
 class TestTailorAnalysis(unittest.TestCase):
 
-    @patch('tailor.openai.OpenAI')
+    @patch('tailor.SCORING_MODE', 'llm')
+    @patch('llm_client.get_client')
     @patch('tailor.extract_text_from_docx')
-    def test_analyze_gaps_with_suggestions(self, mock_extract, mock_openai_class):
+    def test_analyze_gaps_with_suggestions(self, mock_extract, mock_get_client):
         # Mock DOCX text extraction
         mock_extract.return_value = "Sample Resume Content"
 
         # Mock OpenAI Response
         mock_client = MagicMock()
-        mock_openai_class.return_value = mock_client
+        mock_get_client.return_value = mock_client
         
-        # We need two responses: one for analyze_gaps (sections) and one for calculate_scores
+        # We need three responses: one for analyze_gaps (sections), one for the
+        # initial score and one for the projected score
         
         # 1. Mock Analysis Response
         analysis_json = {
@@ -46,29 +72,34 @@ class TestTailorAnalysis(unittest.TestCase):
             ]
         }
         
-        # 2. Mock Score Response
-        score_json = {
+        # 2. Mock Score Responses
+        initial_score_json = {
             "initial_score": 55,
+            "reasoning": "Decent match"
+        }
+        projected_score_json = {
             "projected_score": 90,
             "reasoning": "Great improvements"
         }
-        
-        # Set up side effects for the mocked create calls
-        # We expect 2 calls. 
-        # Call 1: Analysis
-        # Call 2: Scoring
-        
-        mock_response_1 = MagicMock()
-        mock_response_1.choices = [MagicMock(message=MagicMock(content=json.dumps(analysis_json)))]
-        
-        mock_response_2 = MagicMock()
-        mock_response_2.choices = [MagicMock(message=MagicMock(content=json.dumps(score_json)))]
 
-        # Determine which call returns what. This is tricky with simple side_effect if args differ, but side_effect iterator works.
-        mock_client.chat.completions.create.side_effect = [mock_response_1, mock_response_2]
+        # The initial score runs concurrently with the analysis, so route
+        # responses by prompt content instead of relying on call order.
+        def mock_create(**kwargs):
+            prompt = kwargs["messages"][0]["content"]
+            if "currently scores" in prompt:
+                payload = projected_score_json
+            elif "ATS Score" in prompt:
+                payload = initial_score_json
+            else:
+                payload = analysis_json
+            response = MagicMock()
+            response.choices = [MagicMock(message=MagicMock(content=json.dumps(payload)))]
+            return response
+
+        mock_client.chat.completions.create = AsyncMock(side_effect=mock_create)
 
         # ACT
-        result = analyze_gaps("dummy.docx", "Job Description Here")
+        result = analyze_gaps("dummy.docx", "Job Description Here", use_cache=False)
 
         # ASSERT
         print("Result Keys:", result.keys())
@@ -77,8 +108,164 @@ class TestTailorAnalysis(unittest.TestCase):
         self.assertIn("suggestions", section)
         self.assertEqual(section["suggestions"], ["Add quant results", "mention leadership"])
         self.assertEqual(result["initial_score"], 55) # Should come from the robust scoring step
+        self.assertEqual(result["projected_score"], 90)
+        self.assertEqual(mock_client.chat.completions.create.call_count, 3)
         
         print("Verification Successful: Suggestions field parsed correctly.")
 
+    @patch('tailor.SCORING_MODE', 'llm')
+    @patch('llm_client.get_client')
+    @patch('tailor.extract_text_from_docx')
+    def test_analyze_gaps_stream_emits_sections_incrementally(self, mock_extract, mock_get_client):
+        mock_extract.return_value = "Sample Resume Content"
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+
+        analysis_json = {
+            "role_analysis": {"identity": "Engineer", "keywords": [], "seniority_signals": [],
+                              "industry_context": "", "geographic_expectations": ""},
+            "sections": [
+                {"section_name": "Summary", "gaps": [], "suggestions": [], "edits": []},
+                {"section_name": "Experience", "gaps": [], "suggestions": [], "edits": []}
+            ],
+            "company_name": "Acme",
+            "job_title": "Engineer"
+        }
+        content = json.dumps(analysis_json)
+
+        class FakeStream:
+            def __init__(self, text):
+                self.chunks = [text[i:i + 7] for i in range(0, len(text), 7)]
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                if not self.chunks:
+                    raise StopAsyncIteration
+                delta = MagicMock(content=self.chunks.pop(0))
+                return MagicMock(choices=[MagicMock(delta=delta)])
+
+            async def close(self):
+                pass
+
+        def mock_create(**kwargs):
+            if kwargs.get("stream"):
+                return FakeStream(content)
+            prompt = kwargs["messages"][0]["content"]
+            payload = {"projected_score": 80} if "currently scores" in prompt else {"initial_score": 60}
+            return MagicMock(choices=[MagicMock(message=MagicMock(content=json.dumps(payload)))])
+
+        mock_client.chat.completions.create = AsyncMock(side_effect=mock_create)
+
+        async def collect():
+            return [event async for event in analyze_gaps_stream("dummy.docx", "JD", use_cache=False)]
+
+        events = asyncio.run(collect())
+        names = [event["event"] for event in events]
+
+        self.assertEqual(names[0], "role_analysis")
+        self.assertEqual([e["data"]["section_name"] for e in events if e["event"] == "section"],
+                         ["Summary", "Experience"])
+        self.assertEqual(names[-2:], ["scores", "complete"])
+        self.assertEqual(events[-1]["result"]["initial_score"], 60)
+        self.assertEqual(events[-1]["result"]["projected_score"], 80)
+
+    @patch('tailor.SCORING_MODE', 'llm')
+    @patch('llm_client.get_client')
+    @patch('tailor.extract_text_from_docx')
+    def test_sharded_analysis_merges_sections_in_order(self, mock_extract, mock_get_client):
+        mock_extract.return_value = "Jane Doe\nSUMMARY\nOld Summary\nEXPERIENCE\nBuilt APIs\nSKILLS\nPython"
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+
+        async def mock_create(**kwargs):
+            prompt = kwargs["messages"][0]["content"]
+            if "currently scores" in prompt:
+                payload = {"projected_score": 80}
+            elif "ATS Score" in prompt:
+                payload = {"initial_score": 60}
+            elif "Also extract the hiring company" in prompt:
+                payload = {"role_analysis": {"identity": "Engineer"}, "company_name": "Acme", "job_title": "Engineer"}
+            elif "STEP 1" in prompt:
+                payload = {"diagnosis": {"gaps": ["k8s"]}, "proposed_title": "Backend Engineer"}
+            else:
+                name = prompt.rsplit('Section "', 1)[1].split('"', 1)[0]
+                # Finish later sections first to check the merged order
+                await asyncio.sleep({"Header": 0.03, "SUMMARY": 0.02, "EXPERIENCE": 0.01}.get(name, 0))
+                payload = {"section_name": name, "edits": []}
+            return MagicMock(choices=[MagicMock(message=MagicMock(content=json.dumps(payload)))])
+
+        mock_client.chat.completions.create = AsyncMock(side_effect=mock_create)
+
+        result = asyncio.run(analyze_gaps_async("dummy.docx", "JD", use_cache=False, mode="sharded"))
+
+        self.assertEqual([s["section_name"] for s in result["sections"]], ["Header", "SUMMARY", "EXPERIENCE", "SKILLS"])
+        self.assertEqual(result["sections"][1]["original_text"], "Old Summary")
+        self.assertEqual(result["company_name"], "Acme")
+        self.assertEqual(result["proposed_title"], "Backend Engineer")
+        self.assertEqual(result["initial_score"], 60)
+        self.assertEqual(result["projected_score"], 80)
+        # role + overview + 4 sections + 2 scores
+        self.assertEqual(mock_client.chat.completions.create.call_count, 8)
+
+    @patch('tailor.SCORING_MODE', 'local')
+    @patch('llm_client.get_client')
+    @patch('tailor.extract_text_from_docx')
+    def test_local_scoring_skips_score_llm_calls(self, mock_extract, mock_get_client):
+        mock_extract.return_value = "Engineer with Java and SQL experience"
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        analysis_json = {
+            "sections": [{
+                "section_name": "Summary",
+                "edits": [{"action": "replace", "target_text": "Java and SQL", "new_content": "Python, Kubernetes and SQL"}]
+            }]
+        }
+        mock_client.chat.completions.create = AsyncMock(return_value=MagicMock(
+            choices=[MagicMock(message=MagicMock(content=json.dumps(analysis_json)))]
+        ))
+
+        result = analyze_gaps("dummy.docx", "Python engineer. Kubernetes, SQL, Python.", use_cache=False)
+
+        self.assertEqual(mock_client.chat.completions.create.call_count, 1)
+        self.assertGreater(result["projected_score"], result["initial_score"])
+        self.assertIn("score_reasoning", result)
+
+    @patch('tailor.SCORING_MODE', 'local')
+    @patch('llm_client.get_client')
+    @patch('tailor.extract_text_from_docx')
+    def test_role_analysis_shared_across_resumes(self, mock_extract, mock_get_client):
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        prompts = []
+
+        def mock_create(**kwargs):
+            prompt = kwargs["messages"][0]["content"]
+            prompts.append(prompt)
+            payload = {"sections": [], "proposed_title": "Engineer"}
+            if "STEP 1 — ROLE" in prompt:
+                payload.update({"role_analysis": {"identity": "Engineer"}, "company_name": "Acme", "job_title": "SWE"})
+            return MagicMock(choices=[MagicMock(message=MagicMock(content=json.dumps(payload)))])
+
+        mock_client.chat.completions.create = AsyncMock(side_effect=mock_create)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.db")
+            with patch('tailor.analysis_cache', ResultCache("analyze_gaps", path=path)), \
+                 patch('tailor.role_cache', ResultCache("role_analysis", path=path)):
+                mock_extract.return_value = "First resume"
+                first = analyze_gaps("dummy.docx", "Backend   engineer at Acme", use_cache=True)
+                # Same posting pasted with different whitespace by another user
+                mock_extract.return_value = "Second resume"
+                second = analyze_gaps("dummy.docx", "Backend engineer at Acme\n", use_cache=True)
+
+        self.assertIn("STEP 1 — ROLE", prompts[0])
+        self.assertNotIn("STEP 1 — ROLE", prompts[1])
+        self.assertIn('"identity": "Engineer"', prompts[1])
+        self.assertEqual(second["role_analysis"], first["role_analysis"])
+        self.assertEqual(second["company_name"], "Acme")
+        self.assertEqual(second["job_title"], "SWE")
+
 if __name__ == '__main__':
     unittest.main()
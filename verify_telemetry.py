@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import patch
+import threading
+import time
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from telemetry import RunRecord, TelemetrySink
+
+def make_sink(**kwargs):
+    sink = TelemetrySink(**kwargs)
+    sink.batches = []
+    sink.thread_names = []
+
+    def write_batch(records):
+        sink.batches.append([r.run_name for r in records])
+        sink.thread_names.append(threading.current_thread().name)
+        sink.written += len(records)
+
+    sink._write_batch = write_batch
+    return sink
+
+class TestTelemetrySink(unittest.TestCase):
+
+    def test_samples_successes_but_keeps_errors(self):
+        sink = make_sink(sample_rate=0.0)
+        sink.submit(RunRecord("exp", "ok"))
+        failed = RunRecord("exp", "failed")
+        failed.set_error("boom")
+        partial = RunRecord("exp", "partial")
+        partial.log_param("scoring_error", "timeout")
+        sink.submit(failed)
+        sink.submit(partial)
+        self.assertTrue(sink.flush(timeout=5))
+
+        self.assertEqual(sink.batches, [["failed", "partial"]])
+        self.assertEqual(sink.stats()["sampled_out"], 1)
+
+    def test_writes_in_background_batches(self):
+        sink = make_sink(batch_size=3, flush_seconds=60)
+        started = time.perf_counter()
+        for i in range(3):
+            sink.submit(RunRecord("exp", f"run{i}"))
+        # submit never waits on the tracking store
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+        deadline = time.time() + 5
+        while not sink.batches and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(sink.batches, [["run0", "run1", "run2"]])
+        self.assertEqual(sink.thread_names, ["telemetry-sink"])
+
+    def test_drops_when_queue_full(self):
+        sink = make_sink(queue_size=1, flush_seconds=60)
+        with patch.object(sink, "_ensure_worker"):
+            sink.submit(RunRecord("exp", "a"))
+            sink.submit(RunRecord("exp", "b"))
+        self.assertEqual(sink.stats()["dropped"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
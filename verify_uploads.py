@@ -0,0 +1,65 @@
+import unittest
+import asyncio
+import hashlib
+import io
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from fastapi import UploadFile
+from uploads import UploadError, UploadTooLargeError, save_upload
+
+
+def make_pdf(pages):
+    import pymupdf
+
+    pdf = pymupdf.open()
+    for number in range(pages):
+        pdf.new_page().insert_text((72, 72), f"Page {number}")
+    return pdf.tobytes()
+
+
+def upload_of(content, name="resume.pdf", known_size=True):
+    return UploadFile(io.BytesIO(content), filename=name, size=len(content) if known_size else None)
+
+
+class TestSaveUpload(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.tmpdir.name, "temp_a_resume.pdf")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_copies_and_hashes_in_one_pass(self):
+        content = make_pdf(2)
+        saved = asyncio.run(save_upload(upload_of(content), self.dest, max_pages=5))
+        self.assertEqual(saved.sha256, hashlib.sha256(content).hexdigest())
+        self.assertEqual((saved.size, saved.pages), (len(content), 2))
+        with open(self.dest, "rb") as f:
+            self.assertEqual(f.read(), content)
+
+    def test_limits_leave_nothing_on_disk(self):
+        big = b"%PDF" + b"0" * (2 * 1024 * 1024)
+        # Rejected from the declared size, and while copying when the size is unknown
+        for known_size in (True, False):
+            with self.assertRaises(UploadTooLargeError):
+                asyncio.run(save_upload(upload_of(big, known_size=known_size), self.dest, max_mb=1))
+            self.assertFalse(os.path.exists(self.dest))
+
+        with self.assertRaisesRegex(UploadError, "3 pages"):
+            asyncio.run(save_upload(upload_of(make_pdf(3)), self.dest, max_pages=2))
+        with self.assertRaisesRegex(UploadError, "Not a readable PDF"):
+            asyncio.run(save_upload(upload_of(b"hello"), self.dest, max_pages=2))
+        self.assertFalse(os.path.exists(self.dest))
+
+        # Without a page limit any file is accepted
+        saved = asyncio.run(save_upload(upload_of(b"hello"), self.dest))
+        self.assertIsNone(saved.pages)
+
+
+if __name__ == '__main__':
+    unittest.main()